@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Offline benchmark of the KWOK path: runs Simulator.run_simulation on a
+# KWOKCluster backed by the in-process FakeCoreV1Api (with injected request
+# latency and binding delay) and reports the API round-trips per deployed pod,
+# pods/s and events/s, with and without the informer cache.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join(ROOT, "configs", "config.yaml")
+
+PODS_PER_TASK = 4
+
+# Scheduler -> batch pods arriving at the same time (DEFAULT relies on the
+# pipelined submission of KWOKCluster.deploy_pods)
+SCHEDULERS = {"ROUNDROBIN": False, "DEFAULT": True}
+
+
+def case_config(base_config, scheduler, nodes, pods, informer, output_dir, seed):
+    config = dict(base_config)
+    config.update({
+        "cluster_type": "KWOK",
+        "cluster_reset": True,
+        "cluster_nodes": nodes,
+        "cluster_kwok_informer": informer,
+        "cluster_kwok_reset_mode": "light",
+        "workload_source": "synthetic",
+        "workload_tasks": max(1, pods // PODS_PER_TASK),
+        "workload_pods_number_dist": {"type": "fixed", "value": PODS_PER_TASK},
+        "workload_pods_interarrival_dist": {"type": "poisson", "mean": 1, "min": 0, "max": 4},
+        "workload_pods_duration_dist": {"type": "uniform", "min": max(1, nodes // 4), "max": max(2, nodes * 3 // 4)},
+        "workload_streaming": True,
+        "scheduler_type": scheduler,
+        "simulation_speedup": 0,
+        "simulation_detail_statistics": False,
+        "simulation_save_trace": False,
+        "simulation_batch_arrivals": SCHEDULERS[scheduler],
+        "simulation_profile": True,
+        "simulation_seed": seed,
+        "simulation_cache_dir": None,
+        "simulation_output_dir": output_dir,
+    })
+    return config
+
+
+def run_case(config, latency, bind_delay):
+    from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
+    from cutsimulator.cluster.fake_kube_api import FakeCoreV1Api, FakeWatch
+    from cutsimulator.cluster.kwok_cluster import KWOKCluster
+    from cutsimulator.scheduler.scheduler_selector import SchedulerSelector
+    from cutsimulator.simulator.simulator import Simulator
+    from cutsimulator.workload.workload_selector import WorkloadSelector
+
+    api = FakeCoreV1Api(latency=latency, bind_delay=bind_delay)
+    synthesizer = ClusterSynthesizer(config)
+    cluster = KWOKCluster(config, api=api, watch_factory=FakeWatch)
+    try:
+        started = time.perf_counter()
+        cluster.reset()
+        cluster.deploy_nodes(synthesizer.create_nodes())
+        setup_s = time.perf_counter() - started
+
+        scheduler = SchedulerSelector(config).create_scheduler(cluster)
+        try:
+            tasks = WorkloadSelector(config).create_workload()
+            simulator = Simulator(config)
+            api.reset_counters()
+            simulator.run_simulation(cluster, scheduler, tasks)
+        finally:
+            scheduler.close()
+    finally:
+        cluster.close()
+        api.close()
+
+    profiler = simulator.profiler
+    metrics = simulator.stats.compute_final_metrics()
+    submitted = api.calls["create_namespaced_pod"]
+    wall_s = profiler.run_ns / 1e9
+    return {
+        "pods": metrics["total_pods"],
+        "completed_pods": metrics["completed_pods"],
+        "setup_s": round(setup_s, 3),
+        "wall_s": round(wall_s, 3),
+        "pods_per_sec": round(submitted / wall_s, 1) if wall_s > 0 else 0,
+        "events_per_sec": round(profiler.events_per_second(), 1),
+        "api_calls": api.total_calls,
+        "api_calls_per_pod": round(api.total_calls / submitted, 2) if submitted else 0,
+        "api_calls_by_method": dict(sorted(api.calls.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the KWOK cluster path")
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--pods", type=int, default=400)
+    parser.add_argument("--schedulers", default=",".join(SCHEDULERS), help="Comma separated scheduler types")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Injected latency per API request")
+    parser.add_argument("--bind-delay-ms", type=float, default=5.0, help="Delay before the fake scheduler binds a pod")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Base simulation config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    from cutsimulator.utils.utility import load_configs
+    base_config = load_configs([args.config])
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for scheduler in args.schedulers.split(","):
+            if scheduler not in SCHEDULERS:
+                parser.error(f"Unsupported scheduler {scheduler}")
+            for informer in (False, True):
+                config = case_config(base_config, scheduler, args.nodes, args.pods, informer, output_dir, args.seed)
+                print(f"Running {scheduler} with informer={informer} ({args.nodes} nodes, {args.pods} pods)...", file=sys.stderr)
+                metrics = run_case(config, args.latency_ms / 1e3, args.bind_delay_ms / 1e3)
+                result = {"scheduler": scheduler, "informer": informer, "nodes": args.nodes, **metrics}
+                print(f"  {result['api_calls_per_pod']} API calls/pod, {result['pods_per_sec']} pods/s, "
+                      f"{result['completed_pods']}/{result['pods']} pods deployed", file=sys.stderr)
+                results.append(result)
+
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count()},
+        "latency_ms": args.latency_ms,
+        "bind_delay_ms": args.bind_delay_ms,
+        "seed": args.seed,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Scale benchmark of the simulator core: runs Simulator.run_simulation on a
+# PythonCluster with each scheduler at escalating scales, every case in a fresh
+# process, and reports events/s, peak RSS (above the imports) and per-decision
+# latency as JSON.
+# Results can be compared against a stored baseline to catch regressions.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join(ROOT, "configs", "config.yaml")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Scale name -> (nodes, pods)
+SCALES = {
+    "xs": (10, 100),
+    "s": (100, 10000),
+    "m": (1000, 100000),
+    "l": (10000, 1000000),
+}
+
+PODS_PER_TASK = 4
+
+RSS_SLACK_MB = 8
+
+# DEFAULT leaves every decision to KWOK and places no pod on a PythonCluster;
+# it is benchmarked by bench_kwok.py instead
+SCHEDULERS = ["ROUNDROBIN", "DAROTRAIN"]
+
+
+def case_config(base_config, scheduler, nodes, pods, output_dir, seed):
+    config = dict(base_config)
+    config.update({
+        "cluster_type": "Python",
+        "cluster_reset": True,
+        "cluster_nodes": nodes,
+        "workload_source": "synthetic",
+        "workload_tasks": pods // PODS_PER_TASK,
+        "workload_pods_number_dist": {"type": "fixed", "value": PODS_PER_TASK},
+        "workload_pods_interarrival_dist": {"type": "poisson", "mean": 1, "min": 0, "max": 4},
+        # Keep roughly two running pods per node at every scale
+        "workload_pods_duration_dist": {"type": "uniform", "min": max(1, nodes // 4), "max": max(2, nodes * 3 // 4)},
+        "workload_streaming": True,
+        "scheduler_type": scheduler,
+        "simulation_speedup": 0,
+        "simulation_detail_statistics": False,
+        "simulation_save_trace": False,
+        "simulation_batch_arrivals": False,
+        "simulation_profile": True,
+        "simulation_seed": seed,
+        "simulation_cache_dir": None,
+        "simulation_output_dir": output_dir,
+    })
+    return config
+
+
+def max_rss_mb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(config, pods):
+    """
+    Runs one benchmark case (inside a fresh worker process) and returns its
+    metrics. Raises a RuntimeError if not all pods completed or failed.
+    """
+    import logging
+    import random
+    import numpy as np
+
+    from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
+    from cutsimulator.scheduler.scheduler_selector import SchedulerSelector
+    from cutsimulator.simulator.simulator import Simulator
+    from cutsimulator.workload.workload_selector import WorkloadSelector
+
+    logging.disable(logging.CRITICAL)
+    random.seed(config["simulation_seed"])
+    np.random.seed(config["simulation_seed"])
+    if config["scheduler_type"] == "DAROTRAIN":
+        import torch
+        torch.set_num_threads(1)
+        torch.manual_seed(config["simulation_seed"])
+
+    # Peak RSS is reported above the footprint of the imports
+    import_rss_mb = max_rss_mb()
+
+    started = time.perf_counter()
+    cluster = ClusterSynthesizer(config).create_cluster()
+    scheduler = SchedulerSelector(config).create_scheduler(cluster)
+    tasks = WorkloadSelector(config).create_workload()
+    simulator = Simulator(config)
+    setup_s = time.perf_counter() - started
+
+    try:
+        simulator.run_simulation(cluster, scheduler, tasks)
+    finally:
+        scheduler.close()
+
+    metrics = simulator.stats.compute_final_metrics()
+    if metrics["total_pods"] != pods:
+        raise RuntimeError(f"{metrics['completed_pods']} pods completed and "
+                           f"{metrics['total_pods'] - metrics['completed_pods']} failed out of {pods} requested")
+
+    profiler = simulator.profiler
+    schedule = next(row for row in profiler.summary() if row["phase"] == "schedule")
+    return {
+        "events": profiler.events,
+        "pods": metrics["total_pods"],
+        "completed_pods": metrics["completed_pods"],
+        "setup_s": round(setup_s, 3),
+        "wall_s": round(profiler.run_ns / 1e9, 3),
+        "events_per_sec": round(profiler.events_per_second(), 1),
+        "import_rss_mb": round(import_rss_mb, 1),
+        "peak_rss_mb": round(max_rss_mb() - import_rss_mb, 1),
+        "decision_latency_us": {key: schedule[key] for key in ["mean_us", "p50_us", "p90_us", "p99_us", "max_us"]},
+    }
+
+
+def run_benchmarks(scales, schedulers, config_path, daro_max_scale, seed):
+    from cutsimulator.utils.utility import load_configs
+    base_config = load_configs([config_path])
+    scale_names = list(SCALES)
+
+    results = []
+    context = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for scheduler in schedulers:
+            for scale in scales:
+                if scheduler == "DAROTRAIN" and scale_names.index(scale) > scale_names.index(daro_max_scale):
+                    continue  # Training on every decision makes the large scales impractical
+
+                nodes, pods = SCALES[scale]
+                config = case_config(base_config, scheduler, nodes, pods, output_dir, seed)
+                print(f"Running {scheduler} at scale {scale} ({nodes} nodes, {pods} pods)...", file=sys.stderr)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    metrics = pool.submit(run_case, config, pods).result()
+
+                result = {"scheduler": scheduler, "scale": scale, "nodes": nodes, **metrics}
+                print(f"  {result['events_per_sec']} events/s, {result['peak_rss_mb']} MB peak RSS, "
+                      f"{result['decision_latency_us']['mean_us']} us/decision", file=sys.stderr)
+                results.append(result)
+
+    return {
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    Returns the list of regressions of report against baseline: events/s
+    lower, or peak RSS / mean decision latency higher, by more than tolerance.
+    Peak RSS gets RSS_SLACK_MB on top, as small cases barely grow over the imports.
+    """
+    expected = {(r["scheduler"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        base = expected.get((result["scheduler"], result["scale"]))
+        if base is None:
+            continue
+
+        case = f"{result['scheduler']}/{result['scale']}"
+        if result["events_per_sec"] < base["events_per_sec"] * (1 - tolerance):
+            regressions.append(f"{case}: events/s {result['events_per_sec']} < baseline {base['events_per_sec']}")
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance) + RSS_SLACK_MB:
+            regressions.append(f"{case}: peak RSS {result['peak_rss_mb']} MB > baseline {base['peak_rss_mb']} MB")
+        latency, base_latency = result["decision_latency_us"]["mean_us"], base["decision_latency_us"]["mean_us"]
+        if latency > base_latency * (1 + tolerance):
+            regressions.append(f"{case}: decision latency {latency} us > baseline {base_latency} us")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale benchmark of the simulator core")
+    parser.add_argument("--scales", default="xs,s,m", help=f"Comma separated scales out of {','.join(SCALES)}")
+    parser.add_argument("--schedulers", default=",".join(SCHEDULERS), help="Comma separated scheduler types")
+    parser.add_argument("--daro-max-scale", default="s", choices=list(SCALES), help="Largest scale run with DAROTRAIN")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Base simulation config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the report as the new baseline")
+    args = parser.parse_args()
+
+    scales = args.scales.split(",")
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"Unknown scale {scale}")
+
+    report = run_benchmarks(scales, args.schedulers.split(","), args.config, args.daro_max_scale, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
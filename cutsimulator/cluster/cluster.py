@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.node_table import UTIL_BUSY_THRESHOLD, empty_utilization_summary
 from cutsimulator.workload.pod import Pod
 
 class Cluster(ABC):
-    
+
     @abstractmethod
     def reset(self):
         pass
@@ -23,7 +26,12 @@ class Cluster(ABC):
         pass
 
     @abstractmethod
-    def deploy_pod(self, pod: Pod, node: Node) -> bool:
+    def deploy_pod(self, pod: Pod, node: Node, delegate_binding=False) -> bool:
+        """
+        Deploys the pod on the node. With delegate_binding a pod without a node
+        is left to the cluster's own scheduler (if it has one), otherwise it
+        is not deployed.
+        """
         pass
 
     @abstractmethod
@@ -38,15 +46,107 @@ class Cluster(ABC):
     def get_node(self, node_name: str) -> Node:
         pass
 
-    def get_cluster_state(self):
+    def deploy_pods(self, pods: List[Pod], nodes: List[Node], delegate_binding=False) -> List[bool]:
+        """
+        Deploys each pod on the corresponding node and returns the outcome per pod.
+        """
+        return [self.deploy_pod(pod, node, delegate_binding) for pod, node in zip(pods, nodes)]
+
+    def terminate_pods(self, pods: List[Pod]) -> List[bool]:
+        """
+        Terminates the given pods and returns the outcome per pod.
+        """
+        return [self.terminate_pod(pod) for pod in pods]
+
+    def get_resource_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the cpu capacity, mem capacity, cpu available and mem available
+        of all nodes as arrays ordered like get_nodes(). The arrays must be
+        treated as read-only.
+        """
         nodes = self.get_nodes()
-        total_cpu_capacity = sum(n.cpu_capacity for n in nodes)
-        total_mem_capacity = sum(n.mem_capacity for n in nodes)
-        total_cpu_available = sum(n.cpu_available for n in nodes)
-        total_mem_available = sum(n.mem_available for n in nodes)
+        return (np.array([n.cpu_capacity for n in nodes], dtype=np.int64),
+                np.array([n.mem_capacity for n in nodes], dtype=np.int64),
+                np.array([n.cpu_available for n in nodes], dtype=np.int64),
+                np.array([n.mem_available for n in nodes], dtype=np.int64))
+
+    def get_fit_mask(self, cpu, memory) -> np.ndarray:
+        """
+        Returns a boolean mask (ordered like get_nodes()) of the nodes that
+        have enough resources available for the given request.
+        """
+        _, _, cpu_available, mem_available = self.get_resource_arrays()
+        return (cpu_available >= cpu) & (mem_available >= memory)
+
+    def has_fit(self, cpu, memory) -> bool:
+        """
+        Returns whether any node has enough resources available for the given request.
+        """
+        return bool(self.get_fit_mask(cpu, memory).any())
+
+    def get_fit_count(self, cpu, memory) -> int:
+        """
+        Returns the number of nodes that have enough resources available for the given request.
+        """
+        return int(np.count_nonzero(self.get_fit_mask(cpu, memory)))
 
-        return {"total_cpu_capacity" : total_cpu_capacity, 
+    def get_best_fit(self, cpu, memory) -> Optional[Node]:
+        """
+        Returns the node that fits the given request with the least resources
+        left over, (cpu left) / (max cpu capacity) + (mem left) / (max mem
+        capacity), the first one on ties, or None if no node fits.
+        """
+        cpu_capacity, mem_capacity, cpu_available, mem_available = self.get_resource_arrays()
+        fit = (cpu_available >= cpu) & (mem_available >= memory)
+        if not fit.any():
+            return None
+        leftover = ((cpu_available - cpu) / max(int(cpu_capacity.max()), 1)
+                    + (mem_available - memory) / max(int(mem_capacity.max()), 1))
+        return self.get_nodes()[int(np.argmin(np.where(fit, leftover, np.inf)))]
+
+    def get_utilization(self, empty_usage=0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the cpu and mem utilization (0-1) of all nodes ordered like
+        get_nodes(). Nodes without capacity report empty_usage.
+        """
+        cpu_capacity, mem_capacity, cpu_available, mem_available = self.get_resource_arrays()
+        cpu_usage = np.full(len(cpu_capacity), empty_usage, dtype=np.float64)
+        mem_usage = np.full(len(mem_capacity), empty_usage, dtype=np.float64)
+        np.subtract(1, cpu_available / np.maximum(cpu_capacity, 1), out=cpu_usage, where=cpu_capacity > 0)
+        np.subtract(1, mem_available / np.maximum(mem_capacity, 1), out=mem_usage, where=mem_capacity > 0)
+        return cpu_usage, mem_usage
+
+    def get_utilization_summary(self, empty_usage=0.0) -> dict:
+        """
+        Returns the mean, std, min and max of the node cpu and mem utilization,
+        the mean cpu/mem balance (1 - |cpu - mem|) and the number of busy nodes.
+        """
+        cpu_usage, mem_usage = self.get_utilization(empty_usage)
+        if len(cpu_usage) == 0:
+            return empty_utilization_summary()
+
+        return {
+            "nodes": len(cpu_usage),
+            "cpu_mean": float(np.mean(cpu_usage)),
+            "cpu_std": float(np.std(cpu_usage)),
+            "cpu_min": float(np.min(cpu_usage)),
+            "cpu_max": float(np.max(cpu_usage)),
+            "mem_mean": float(np.mean(mem_usage)),
+            "mem_std": float(np.std(mem_usage)),
+            "mem_min": float(np.min(mem_usage)),
+            "mem_max": float(np.max(mem_usage)),
+            "balance_mean": float(np.mean(np.maximum(0, 1 - np.abs(cpu_usage - mem_usage)))),
+            "busy_nodes": int(np.count_nonzero((cpu_usage > UTIL_BUSY_THRESHOLD) | (mem_usage > UTIL_BUSY_THRESHOLD))),
+        }
+
+    def get_cluster_state(self):
+        cpu_capacity, mem_capacity, cpu_available, mem_available = self.get_resource_arrays()
+        total_cpu_capacity = int(cpu_capacity.sum())
+        total_mem_capacity = int(mem_capacity.sum())
+        total_cpu_available = int(cpu_available.sum())
+        total_mem_available = int(mem_available.sum())
+
+        return {"total_cpu_capacity" : total_cpu_capacity,
                 "total_mem_capacity" : total_mem_capacity,
                 "total_cpu_available" : total_cpu_available,
                 "total_mem_available" : total_mem_available}
-
@@ -1,10 +1,16 @@
 from typing import List
 
+import numpy as np
+
 from cutsimulator.cluster.node import Node
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.cluster.kwok_cluster import KWOKCluster
 from cutsimulator.cluster.python_cluster import PythonCluster
-from cutsimulator.utils.utility import generate_distribution_values
+from cutsimulator.utils.scenario_cache import create_scenario_cache
+from cutsimulator.utils.utility import create_rng, generate_distribution_values
+
+# Config keys that determine the generated nodes (and thus their cache entry)
+CLUSTER_SCENARIO_KEYS = ['cluster_nodes', 'cluster_nodes_cpu_dist', 'cluster_nodes_mem_dist']
 
 # Cluster synthesizer is responsible for creating a cluster with a set of nodes.
 # The node characteristics (e.g., cpu, mem) are generated based on the provided
@@ -18,13 +24,21 @@ class ClusterSynthesizer:
                 raise ValueError(f"Missing required cluster config key: {key}")
         self.config = config
 
+        # With a simulation_seed the nodes are drawn from their own seeded stream
+        # (and may be cached), otherwise from the global numpy random state
+        self.seed = config.get('simulation_seed')
+        self.rng = create_rng(self.seed, "cluster") if self.seed is not None else None
+
     def create_nodes(self, start_index=0) -> List[Node]:
         num_nodes = self.config['cluster_nodes']
-        cpu_dist = self.config['cluster_nodes_cpu_dist']
-        mem_dist = self.config['cluster_nodes_mem_dist']
 
-        cpus = generate_distribution_values(cpu_dist, num_nodes)
-        memories = generate_distribution_values(mem_dist, num_nodes)
+        if self.rng is not None:
+            arrays = self.load_node_arrays()
+            cpus = arrays["node_cpu"].tolist()
+            memories = arrays["node_mem"].tolist()
+        else:
+            cpus = generate_distribution_values(self.config['cluster_nodes_cpu_dist'], num_nodes)
+            memories = generate_distribution_values(self.config['cluster_nodes_mem_dist'], num_nodes)
 
         nodes = []
         for i in range(num_nodes):
@@ -32,13 +46,35 @@ class ClusterSynthesizer:
 
         return nodes
 
+    def generate_node_arrays(self):
+        num_nodes = self.config['cluster_nodes']
+        return {
+            "node_cpu": np.asarray(generate_distribution_values(self.config['cluster_nodes_cpu_dist'], num_nodes, self.rng), dtype=np.int64),
+            "node_mem": np.asarray(generate_distribution_values(self.config['cluster_nodes_mem_dist'], num_nodes, self.rng), dtype=np.int64),
+        }
+
+    def load_node_arrays(self):
+        """
+        Returns the seeded node resources, from the scenario cache when available.
+        """
+        cache = create_scenario_cache(self.config)
+        if cache is None:
+            return self.generate_node_arrays()
+
+        key = cache.key("cluster", {k: self.config[k] for k in CLUSTER_SCENARIO_KEYS}, self.seed)
+        arrays = cache.load(key)
+        if arrays is None:
+            arrays = self.generate_node_arrays()
+            cache.store(key, arrays)
+        return arrays
+
     def create_cluster(self) -> Cluster:
         # Create the appropriate cluster
         cluster_type = self.config['cluster_type']
         if cluster_type == 'KWOK':
-            cluster = KWOKCluster()
+            cluster = KWOKCluster(self.config)
         elif cluster_type == 'Python':
-            cluster = PythonCluster()
+            cluster = PythonCluster(verify_aggregates=self.config.get('cluster_verify_aggregates', False))
         else:
             raise ValueError(f"Unsupported cluster type {cluster_type}")
         
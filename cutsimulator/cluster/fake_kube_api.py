@@ -0,0 +1,309 @@
+import copy
+import heapq
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from cutsimulator.cluster.kwok_informer import pod_requests
+import cutsimulator.utils.utility as util
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _not_found(kind, name):
+    return ApiException(status=404, reason=f"{kind} {name} not found")
+
+
+def _matches_field_selector(obj, field_selector):
+    # Supports comma separated "field=value" and "field!=value" terms on the
+    # fields used by the simulator
+    if not field_selector:
+        return True
+    fields = {
+        "metadata.name": obj.metadata.name,
+        "metadata.namespace": obj.metadata.namespace or "",
+        "spec.nodeName": getattr(obj.spec, "node_name", None) or "",
+        "status.phase": (obj.status.phase if obj.status is not None else None) or "",
+    }
+    for term in field_selector.split(","):
+        negate = "!=" in term
+        field, value = term.split("!=" if negate else "=", 1)
+        field = field.strip().rstrip("=")
+        if field not in fields:
+            raise ApiException(status=400, reason=f"Unsupported field selector {field}")
+        if (fields[field] == value.strip()) == negate:
+            return False
+    return True
+
+
+# In-process stand-in for the CoreV1Api node and pod endpoints used by
+# KWOKCluster (list, read, create, delete, delete collection, field selectors
+# and watch through FakeWatch). Every request sleeps `latency` seconds outside
+# the store lock, like concurrent requests to a real API server, and is counted
+# in `calls`. Pods created without a node are bound by a simple scheduler
+# thread after `bind_delay` seconds to the least requested node they fit on.
+class FakeCoreV1Api:
+    def __init__(self, latency=0.0, bind_delay=0.0, history_size=10000, scheduler=True):
+        self.latency = latency
+        self.bind_delay = bind_delay
+        self.calls = Counter()
+        self.nodes = {}   # name -> V1Node
+        self.pods = {}    # (namespace, name) -> V1Pod
+        self.resource_version = 0
+        self.history_size = history_size
+        self.history = []  # (resource version, kind, namespace, type, object), consecutive versions
+        self.requested = {}     # node name -> [cpu, memory] requested by the pods bound to it
+        self.pending = set()    # (namespace, name) of the pods without a node
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+        self._binds = []  # heap of (due time, sequence, namespace, pod name)
+        self._bind_sequence = 0
+        self._closed = False
+        self._scheduler = None
+        if scheduler:
+            self._scheduler = threading.Thread(target=self._schedule_loop, name="fake-kube-scheduler", daemon=True)
+            self._scheduler.start()
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        self.calls.clear()
+
+    def close(self):
+        with self.lock:
+            self._closed = True
+            self.changed.notify_all()
+        if self._scheduler is not None:
+            self._scheduler.join()
+
+    # --- nodes -------------------------------------------------------------
+
+    def list_node(self, field_selector=None, watch=False, **kwargs):
+        self._request("list_node")
+        with self.lock:
+            items = [copy.deepcopy(n) for n in self.nodes.values() if _matches_field_selector(n, field_selector)]
+            return client.V1NodeList(items=items, metadata=client.V1ListMeta(resource_version=str(self.resource_version)))
+
+    def read_node(self, name, **kwargs):
+        self._request("read_node")
+        with self.lock:
+            if name not in self.nodes:
+                raise _not_found("node", name)
+            return copy.deepcopy(self.nodes[name])
+
+    def create_node(self, body, **kwargs):
+        self._request("create_node")
+        with self.lock:
+            name = body.metadata.name
+            if name in self.nodes:
+                raise ApiException(status=409, reason=f"node {name} already exists")
+            node = copy.deepcopy(body)
+            node.metadata.creation_timestamp = datetime.now(timezone.utc)
+            self.nodes[name] = node
+            self._emit("node", None, "ADDED", node)
+            self._requeue_pending_pods()
+            return copy.deepcopy(node)
+
+    def delete_node(self, name, **kwargs):
+        self._request("delete_node")
+        with self.lock:
+            node = self.nodes.pop(name, None)
+            if node is None:
+                raise _not_found("node", name)
+            self._emit("node", None, "DELETED", node)
+            return client.V1Status(status="Success")
+
+    # --- pods --------------------------------------------------------------
+
+    def list_namespaced_pod(self, namespace, field_selector=None, watch=False, **kwargs):
+        self._request("list_namespaced_pod")
+        with self.lock:
+            items = [copy.deepcopy(p) for (ns, _), p in self.pods.items()
+                     if ns == namespace and _matches_field_selector(p, field_selector)]
+            return client.V1PodList(items=items, metadata=client.V1ListMeta(resource_version=str(self.resource_version)))
+
+    def read_namespaced_pod(self, name, namespace, **kwargs):
+        self._request("read_namespaced_pod")
+        with self.lock:
+            pod = self.pods.get((namespace, name))
+            if pod is None:
+                raise _not_found("pod", name)
+            return copy.deepcopy(pod)
+
+    def create_namespaced_pod(self, namespace, body, **kwargs):
+        self._request("create_namespaced_pod")
+        with self.lock:
+            name = body.metadata.name
+            if (namespace, name) in self.pods:
+                raise ApiException(status=409, reason=f"pod {name} already exists")
+            pod = copy.deepcopy(body)
+            pod.metadata.namespace = namespace
+            pod.metadata.creation_timestamp = datetime.now(timezone.utc)
+            pod.status = client.V1PodStatus(phase="Running" if pod.spec.node_name else "Pending")
+            self.pods[(namespace, name)] = pod
+            self._account(pod, 1)
+            self._emit("pod", namespace, "ADDED", pod)
+            if not pod.spec.node_name:
+                self.pending.add((namespace, name))
+                self._queue_bind(namespace, name)
+            return copy.deepcopy(pod)
+
+    def delete_namespaced_pod(self, name, namespace, **kwargs):
+        self._request("delete_namespaced_pod")
+        with self.lock:
+            pod = self.pods.pop((namespace, name), None)
+            if pod is None:
+                raise _not_found("pod", name)
+            self._remove_pod((namespace, name), pod)
+            self._requeue_pending_pods()
+            return copy.deepcopy(pod)
+
+    def delete_collection_namespaced_pod(self, namespace, field_selector=None, **kwargs):
+        self._request("delete_collection_namespaced_pod")
+        with self.lock:
+            for key, pod in list(self.pods.items()):
+                if key[0] == namespace and _matches_field_selector(pod, field_selector):
+                    del self.pods[key]
+                    self._remove_pod(key, pod)
+            return client.V1Status(status="Success")
+
+    def _remove_pod(self, key, pod):
+        self._account(pod, -1)
+        self.pending.discard(key)
+        self._emit("pod", key[0], "DELETED", pod)
+
+    def _account(self, pod, sign):
+        if pod.spec.node_name:
+            cpu, memory = pod_requests(pod)
+            used = self.requested.setdefault(pod.spec.node_name, [0, 0])
+            used[0] += sign * cpu
+            used[1] += sign * memory
+
+    # --- watch support -----------------------------------------------------
+
+    def events_since(self, kind, namespace, resource_version):
+        """
+        Returns the events of a resource after resource_version, raising 410
+        Gone if they are no longer in the history. Called with the lock held.
+        """
+        if not self.history:
+            return []
+        first = self.history[0][0]
+        if int(resource_version) < first - 1:
+            raise ApiException(status=410, reason="Gone: too old resource version")
+        return [(rv, event_type, obj) for rv, event_kind, event_namespace, event_type, obj
+                in self.history[int(resource_version) + 1 - first:]
+                if event_kind == kind and (namespace is None or event_namespace == namespace)]
+
+    def _emit(self, kind, namespace, event_type, obj):
+        self.resource_version += 1
+        obj.metadata.resource_version = str(self.resource_version)
+        self.history.append((self.resource_version, kind, namespace, event_type, copy.deepcopy(obj)))
+        if len(self.history) >= 2 * self.history_size:
+            del self.history[:self.history_size]
+        self.changed.notify_all()
+
+    def _request(self, method):
+        self.calls[method] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    # --- binding scheduler -------------------------------------------------
+
+    def _queue_bind(self, namespace, name):
+        heapq.heappush(self._binds, (time.monotonic() + self.bind_delay, self._bind_sequence, namespace, name))
+        self._bind_sequence += 1
+        self.changed.notify_all()
+
+    def _requeue_pending_pods(self):
+        # Freed or added resources may let unschedulable pods fit
+        queued = {b[2:] for b in self._binds}
+        for namespace, name in self.pending - queued:
+            self._queue_bind(namespace, name)
+
+    def _schedule_loop(self):
+        with self.lock:
+            while not self._closed:
+                if not self._binds:
+                    self.changed.wait()
+                    continue
+                due = self._binds[0][0] - time.monotonic()
+                if due > 0:
+                    self.changed.wait(due)
+                    continue
+                _, _, namespace, name = heapq.heappop(self._binds)
+                self._bind(namespace, name)
+
+    def _bind(self, namespace, name):
+        pod = self.pods.get((namespace, name))
+        if pod is None or pod.spec.node_name:
+            return
+
+        cpu, memory = pod_requests(pod)
+        best, best_score = None, None
+        for node_name, node in self.nodes.items():
+            allocatable = node.status.allocatable or {}
+            cpu_capacity = util.convert_cpu(allocatable.get("cpu", "0"))
+            mem_capacity = util.convert_memory(allocatable.get("memory", "0Mi"))
+            used_cpu, used_memory = self.requested.get(node_name, (0, 0))
+            if used_cpu + cpu > cpu_capacity or used_memory + memory > mem_capacity:
+                continue
+            score = (used_cpu + cpu) / max(cpu_capacity, 1) + (used_memory + memory) / max(mem_capacity, 1)
+            if best_score is None or score < best_score:
+                best, best_score = node_name, score
+
+        if best is None:
+            return  # Stays pending until resources are freed
+        pod.spec.node_name = best
+        pod.status.phase = "Running"
+        self._account(pod, 1)
+        self.pending.discard((namespace, name))
+        self._emit("pod", namespace, "MODIFIED", pod)
+
+
+# Drop-in for kubernetes.watch.Watch over a FakeCoreV1Api: streams the events
+# of the watched list function after resource_version until timeout_seconds
+# pass or stop() is called.
+class FakeWatch:
+    def __init__(self):
+        self._stop = False
+        self._api = None
+
+    def stop(self):
+        self._stop = True
+        if self._api is not None:
+            with self._api.lock:
+                self._api.changed.notify_all()
+
+    def stream(self, func, *args, resource_version=None, timeout_seconds=None, **kwargs):
+        api = func.__self__
+        self._api = api
+        kind = "node" if func.__name__ == "list_node" else "pod"
+        namespace = kwargs.get("namespace", args[0] if args else None) if kind == "pod" else None
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        api.calls["watch_" + func.__name__] += 1
+
+        with api.lock:
+            version = int(resource_version) if resource_version else api.resource_version
+        while not self._stop:
+            with api.lock:
+                events = api.events_since(kind, namespace, version)
+                if not events:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    api.changed.wait(remaining)
+                    continue
+            for rv, event_type, obj in events:
+                if self._stop:
+                    return
+                version = rv
+                yield {"type": event_type, "object": copy.deepcopy(obj), "raw_object": None}
@@ -0,0 +1,183 @@
+from collections import Counter
+
+import numpy as np
+
+# Number of buckets per resource of the feasibility grid
+FEASIBILITY_BUCKETS = 32
+
+# Boundary or bucket rows beyond which a query checks them with a vectorized
+# scan instead of one by one
+FEASIBILITY_SCAN_ROWS = 64
+
+
+# Grid of buckets over the available cpu and memory of the rows of a NodeTable,
+# answering "which nodes fit (cpu, memory)" without scanning every row.
+# Bucket (i, j) holds the rows with i * cpu_width <= cpu available < (i + 1) * cpu_width
+# (same for memory, the last bucket is open ended). For a request in bucket
+# (bc, bm), every row in a bucket (i > bc, j > bm) fits and every row in a bucket
+# (i < bc or j < bm) does not, so only the rows on the boundary buckets
+# (i == bc or j == bm) are checked one by one, or with a vectorized scan when
+# there are many of them (e.g. identical empty nodes in the same bucket).
+#
+# The table calls update(row) whenever the resources of a row change. The
+# bucket widths start at 1 and double when a node with a larger capacity
+# arrives, which rebuilds the grid.
+class FeasibilityIndex:
+    def __init__(self, table, buckets=FEASIBILITY_BUCKETS):
+        self.table = table
+        self.buckets = buckets
+        self.cpu_width = 1
+        self.mem_width = 1
+        self.counts = np.zeros((buckets, buckets), dtype=np.int64)
+        self._flat_counts = self.counts.reshape(-1)  # view for updates by cell
+        self.members = [set() for _ in range(buckets * buckets)]
+        self.cells = []       # row -> cell (i * buckets + j) or -1
+        self.capacities = []  # row -> (cpu capacity, memory capacity)
+        self.cpu_capacities = Counter()  # capacity -> rows, for the max capacity
+        self.mem_capacities = Counter()
+
+    def update(self, row, cpu_capacity, mem_capacity, cpu_available, mem_available):
+        if row >= len(self.capacities) or self.capacities[row] != (cpu_capacity, mem_capacity):
+            self._set_capacity(row, cpu_capacity, mem_capacity)
+            if cpu_capacity > self.cpu_width * self.buckets or mem_capacity > self.mem_width * self.buckets:
+                self._rescale(cpu_capacity, mem_capacity)
+                return
+        last = self.buckets - 1
+        i = cpu_available // self.cpu_width
+        j = mem_available // self.mem_width
+        self._place(row, (last if i > last else i if i > 0 else 0) * self.buckets
+                    + (last if j > last else j if j > 0 else 0))
+
+    def _set_capacity(self, row, cpu_capacity, mem_capacity):
+        while len(self.capacities) <= row:
+            self.capacities.append(None)
+        if self.capacities[row] is not None:
+            old_cpu, old_memory = self.capacities[row]
+            for capacities, old in ((self.cpu_capacities, old_cpu), (self.mem_capacities, old_memory)):
+                capacities[old] -= 1
+                if capacities[old] == 0:
+                    del capacities[old]
+        self.capacities[row] = (cpu_capacity, mem_capacity)
+        self.cpu_capacities[cpu_capacity] += 1
+        self.mem_capacities[mem_capacity] += 1
+
+    def _rescale(self, cpu_capacity, mem_capacity):
+        while self.cpu_width * self.buckets < cpu_capacity:
+            self.cpu_width *= 2
+        while self.mem_width * self.buckets < mem_capacity:
+            self.mem_width *= 2
+        self.counts[:] = 0
+        for members in self.members:
+            members.clear()
+        self.cells = []
+        table = self.table
+        for row in range(table.size):
+            self._place(row, self._cell(int(table._cpu_available[row]), int(table._mem_available[row])))
+
+    def _cell(self, cpu, memory):
+        return self._bucket(cpu, self.cpu_width) * self.buckets + self._bucket(memory, self.mem_width)
+
+    def _bucket(self, value, width):
+        return min(max(value // width, 0), self.buckets - 1)
+
+    def _place(self, row, cell):
+        cells = self.cells
+        while len(cells) <= row:
+            cells.append(-1)
+        old = cells[row]
+        if old == cell:
+            return
+        if old >= 0:
+            self.members[old].discard(row)
+            self._flat_counts[old] -= 1
+        self.members[cell].add(row)
+        self._flat_counts[cell] += 1
+        cells[row] = cell
+
+    # --- queries -----------------------------------------------------------
+
+    def _boundary_rows(self, bc, bm):
+        buckets, members = self.buckets, self.members
+        for j in range(bm, buckets):
+            yield from members[bc * buckets + j]
+        for i in range(bc + 1, buckets):
+            yield from members[i * buckets + bm]
+
+    def _boundary_size(self, bc, bm):
+        return int(self.counts[bc, bm:].sum() + self.counts[bc + 1:, bm].sum())
+
+    def _fits(self, row, cpu, memory):
+        return self.table._cpu_available[row] >= cpu and self.table._mem_available[row] >= memory
+
+    def any_fit(self, cpu, memory) -> bool:
+        bc, bm = self._bucket(cpu, self.cpu_width), self._bucket(memory, self.mem_width)
+        if self.counts[bc + 1:, bm + 1:].any():
+            return True
+        if self._boundary_size(bc, bm) > FEASIBILITY_SCAN_ROWS:
+            return bool(self.table.fit_mask(cpu, memory).any())
+        return any(self._fits(row, cpu, memory) for row in self._boundary_rows(bc, bm))
+
+    def count_fit(self, cpu, memory) -> int:
+        bc, bm = self._bucket(cpu, self.cpu_width), self._bucket(memory, self.mem_width)
+        if self._boundary_size(bc, bm) > FEASIBILITY_SCAN_ROWS:
+            return int(np.count_nonzero(self.table.fit_mask(cpu, memory)))
+        count = int(self.counts[bc + 1:, bm + 1:].sum())
+        return count + sum(1 for row in self._boundary_rows(bc, bm) if self._fits(row, cpu, memory))
+
+    def _best_in(self, rows, cpu, memory, cpu_scale, mem_scale):
+        # (leftover, row) of the best fitting row of a bucket, None if none fits
+        cpu_available, mem_available = self.table._cpu_available, self.table._mem_available
+        if len(rows) > FEASIBILITY_SCAN_ROWS:
+            rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            cpu_left = cpu_available[rows] - cpu
+            mem_left = mem_available[rows] - memory
+            fit = (cpu_left >= 0) & (mem_left >= 0)
+            if not fit.any():
+                return None
+            leftover = np.where(fit, cpu_left / cpu_scale + mem_left / mem_scale, np.inf)
+            best = leftover.min()
+            return (float(best), int(rows[leftover == best].min()))
+
+        best = None
+        for row in rows:
+            cpu_left = int(cpu_available[row]) - cpu
+            mem_left = int(mem_available[row]) - memory
+            if cpu_left < 0 or mem_left < 0:
+                continue
+            candidate = (cpu_left / cpu_scale + mem_left / mem_scale, row)
+            if best is None or candidate < best:
+                best = candidate
+        return best
+
+    def best_fit(self, cpu, memory):
+        """
+        Returns the row that fits the request with the least leftover
+        resources, (cpu left) / (max cpu capacity) + (memory left) / (max memory
+        capacity), the lowest row on ties, or None if no row fits.
+        """
+        if not self.capacities:
+            return None
+        cpu_scale = max(max(self.cpu_capacities), 1)
+        mem_scale = max(max(self.mem_capacities), 1)
+        buckets, members = self.buckets, self.members
+        bc, bm = self._bucket(cpu, self.cpu_width), self._bucket(memory, self.mem_width)
+
+        def lower_bound(i, j):
+            return max(0, i * self.cpu_width - cpu) / cpu_scale + max(0, j * self.mem_width - memory) / mem_scale
+
+        # Walk the diagonals i + j = bc + bm + d away from the request: the
+        # lower bound of the leftover does not decrease from one diagonal to
+        # the next, so the walk stops once it exceeds the best leftover found
+        best = None
+        for d in range(2 * buckets - 1 - bc - bm):
+            cells = [(i, bm + d - (i - bc)) for i in range(bc, min(buckets, bc + d + 1)) if bm + d - (i - bc) < buckets]
+            if best is not None and min(lower_bound(i, j) for i, j in cells) > best[0]:
+                break
+            for i, j in cells:
+                rows = members[i * buckets + j]
+                if not rows or (best is not None and lower_bound(i, j) > best[0]):
+                    continue
+                candidate = self._best_in(rows, cpu, memory, cpu_scale, mem_scale)
+                if candidate is not None and (best is None or candidate < best):
+                    best = candidate
+        return None if best is None else best[1]
@@ -1,18 +1,49 @@
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from kubernetes import client, config
-from typing import List
+from kubernetes.client.rest import ApiException
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 import cutsimulator.utils.utility as util
 from cutsimulator.cluster.node import Node
 from cutsimulator.cluster.cluster import Cluster
+from cutsimulator.cluster.kwok_informer import KWOKInformer
 from cutsimulator.workload.pod import Pod
 import logging
 logger = logging.getLogger(__name__)
 
-# Represents a KWOK cluster
+# Represents a KWOK cluster.
+# With cluster_kwok_informer (default) nodes and pods are served from a
+# watch-driven KWOKInformer cache instead of listing the cluster on every query.
+# The CoreV1Api and the watch factory can be injected (e.g. for testing).
+# Bulk API operations (node creation and deletion) are fanned out over a pool
+# of cluster_kwok_workers threads sharing one pooled API client.
 class KWOKCluster(Cluster):
 
-    def __init__(self):
+    def __init__(self, config=None, api=None, watch_factory=None):
+        cluster_config = config or {}
+        self.workers = cluster_config.get('cluster_kwok_workers', 16)
+        if self.workers < 1:
+            raise ValueError("cluster_kwok_workers has to be at least 1")
+        self.reset_mode = cluster_config.get('cluster_kwok_reset_mode', 'light')
+        if self.reset_mode not in ('light', 'full'):
+            raise ValueError(f"Unsupported KWOK reset mode: {self.reset_mode}")
+
+        self.owns_api = api is None
+        if api is None:
+            api = self._connect()
+        self.api = api
+        self.watch_factory = watch_factory
+        self.use_informer = cluster_config.get('cluster_kwok_informer', True)
+        self.resync_period = cluster_config.get('cluster_kwok_resync_period', 300)
+        self.bind_timeout = cluster_config.get('cluster_kwok_bind_timeout', 5)
+        self.informer = None
+        self.diff_nodes = False
+
+    def _connect(self):
         try: 
             config.load_kube_config()  # Load kube config for external access
         except Exception as e:
@@ -20,35 +51,132 @@ class KWOKCluster(Cluster):
             subprocess.run(["kwokctl", "create", "cluster"], check=True)
             config.load_kube_config()
 
-        self.api = client.CoreV1Api()
+        # One connection per worker thread, so concurrent requests do not queue for a connection
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, self.workers)
+        return client.CoreV1Api(client.ApiClient(configuration))
+
+    def _run_concurrently(self, func, items):
+        if len(items) <= 1 or self.workers == 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items)), thread_name_prefix="kwok-api") as pool:
+            return list(pool.map(func, items))
+
+    def _get_informer(self) -> KWOKInformer:
+        # Started lazily, so that it lists the cluster after a reset
+        if self.informer is None:
+            self.informer = KWOKInformer(self.api, watch_factory=self.watch_factory, resync_period=self.resync_period)
+            self.informer.start()
+        return self.informer
+
+    def _stop_informer(self):
+        if self.informer is not None:
+            self.informer.stop()
+            self.informer = None
+
+    def close(self):
+        self._stop_informer()
 
-    def reset(self):
+    def reset(self, full=False):
         """
-        Resets the cluster using kwokctl.
+        Resets the cluster. The light reset (default) deletes all pods and lets
+        the next deploy_nodes() only create, replace or delete the nodes that
+        differ. A full reset (full=True or cluster_kwok_reset_mode: full)
+        recreates the cluster using kwokctl.
         """
         logger.info("Resetting KWOK cluster...")
+        self._stop_informer()
+        if full or self.reset_mode == 'full':
+            self._recreate_cluster()
+            return
+
+        try:
+            self.api.delete_collection_namespaced_pod(namespace="default", grace_period_seconds=0)
+            self.diff_nodes = True
+            logger.info("Deleted all pods of the KWOK cluster.")
+        except Exception as e:
+            logger.error(f"Failed to delete the pods of the KWOK cluster: {e}. Recreating it...")
+            self._recreate_cluster()
+
+    def _recreate_cluster(self):
+        self.diff_nodes = False
         try:
             subprocess.run(["kwokctl", "delete", "cluster"], check=False)
             subprocess.run(["kwokctl", "create", "cluster"], check=True)
+            if self.owns_api:
+                self.api = self._connect()  # The new cluster may have a new endpoint and credentials
             logger.info("KWOK cluster successfully reset.")
         except Exception as e:
             logger.error(f"Failed to reset KWOK cluster: {e}")
 
     def deploy_nodes(self, nodes: List[Node]):
         """
-        Deploys nodes to the Kubernetes cluster using API.
+        Deploys nodes to the Kubernetes cluster using API. After a light reset
+        only the nodes that do not exist with the same resources are created,
+        and the remaining nodes of the previous run are deleted.
         """
-        for node in nodes:
+        if self.diff_nodes:
+            self.diff_nodes = False
+            nodes = self._diff_nodes(nodes)
+        self._run_concurrently(self._create_node, nodes)
+
+    def _create_node(self, node: Node, retries=10):
+        for attempt in range(retries):
             try:
                 self.api.create_node(self._node_to_k8s_object(node))
+                if self.informer is not None:
+                    self.informer.assume_node(node)
                 logger.info(f"Successfully created node: {node.name}")
+                return True
+            except ApiException as e:
+                if e.status != 409 or attempt == retries - 1:
+                    logger.error(f"Failed to create node {node.name}: {e}")
+                    return False
+                time.sleep(0.1 * (attempt + 1))  # A replaced node is still being deleted
             except Exception as e:
                 logger.error(f"Failed to create node {node.name}: {e}")
+                return False
+
+    def _diff_nodes(self, nodes: List[Node]) -> List[Node]:
+        """
+        Deletes the existing nodes that are not part of the given nodes (or
+        have different resources) and returns the nodes that need to be created.
+        """
+        try:
+            existing = {n.metadata.name: (util.convert_cpu(n.status.allocatable.get("cpu", "0")),
+                                          util.convert_memory(n.status.allocatable.get("memory", "0Mi")))
+                        for n in self.api.list_node().items if n.metadata.name.startswith("node-")}
+        except Exception as e:
+            logger.error(f"Failed to list the existing nodes: {e}")
+            return nodes
+
+        wanted = {node.name: node for node in nodes}
+        stale = [name for name, resources in existing.items()
+                 if name not in wanted or resources != (wanted[name].cpu_capacity, wanted[name].mem_capacity)]
+        self._run_concurrently(self._delete_node, stale)
+
+        missing = [node for node in nodes if node.name not in existing or node.name in stale]
+        logger.info(f"Reusing {len(existing) - len(stale)} nodes, deleted {len(stale)}, creating {len(missing)}")
+        return missing
+
+    def _delete_node(self, node_name: str):
+        try:
+            self.api.delete_node(name=node_name)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete node {node_name}: {e}")
+            return False
 
     def get_nodes(self) -> List[Node]:
         """
-        Retrieves a list of existing nodes in the cluster using Kubernetes API.
+        Retrieves a list of existing nodes in the cluster, from the informer
+        cache or using Kubernetes API.
         """
+        if self.use_informer:
+            return self._get_informer().get_nodes()
+        return self._list_nodes()
+
+    def _list_nodes(self) -> List[Node]:
         try:
             # Get all node info
             kwok_nodes = self.api.list_node()
@@ -79,39 +207,120 @@ class KWOKCluster(Cluster):
 
         return list(nodes.values())
 
+    def get_resource_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if not self.use_informer:
+            return super().get_resource_arrays()
+
+        # Copies, as the watch threads keep updating the table
+        informer = self._get_informer()
+        with informer.lock:
+            table = informer.table
+            return (table.cpu_capacity.copy(), table.mem_capacity.copy(),
+                    table.cpu_available.copy(), table.mem_available.copy())
+
+    def has_fit(self, cpu, memory) -> bool:
+        if not self.use_informer:
+            return super().has_fit(cpu, memory)
+        informer = self._get_informer()
+        with informer.lock:
+            return informer.table.index.any_fit(cpu, memory)
+
+    def get_fit_count(self, cpu, memory) -> int:
+        if not self.use_informer:
+            return super().get_fit_count(cpu, memory)
+        informer = self._get_informer()
+        with informer.lock:
+            return informer.table.index.count_fit(cpu, memory)
+
+    def get_best_fit(self, cpu, memory) -> Optional[Node]:
+        if not self.use_informer:
+            return super().get_best_fit(cpu, memory)
+        informer = self._get_informer()
+        with informer.lock:
+            row = informer.table.index.best_fit(cpu, memory)
+            return None if row is None else informer.table.nodes[row]
+
     def get_num_nodes(self) -> int:
         """
         Retrieves the number of existing nodes in the cluster using Kubernetes API.
         """
-        api = client.CoreV1Api()
         try:
-            existing_nodes = api.list_node()
+            existing_nodes = self.api.list_node()
             return len(existing_nodes.items)
         except Exception as e:
             logger.warning(f"Failed to retrieve existing nodes: {e}. Assuming no nodes exist.")
             return 0
 
-    def deploy_pod(self, pod: Pod, node: Node) -> bool:
-        try:
-            # Deploy on kwok
-            pod_manifest = self._pod_to_k8s_object(pod, node)
-            self.api.create_namespaced_pod(namespace="default", body=pod_manifest)
-
-            # Make sure it was deployed
-            pod.node = self.get_pod_node(pod.name)
-            if pod.node is None:
-                self.api.delete_namespaced_pod(name=pod.name, namespace="default")
-                logger.warning(f"Pod {pod.name} failed to bind to node {node.name}. Cleaning up...")
-                return False
+    def deploy_pod(self, pod: Pod, node: Node, delegate_binding=False) -> bool:
+        return self.deploy_pods([pod], [node], delegate_binding)[0]
+
+    def deploy_pods(self, pods: List[Pod], nodes: List[Node], delegate_binding=False) -> List[bool]:
+        """
+        Submits all pods concurrently and then confirms their bindings. With
+        delegate_binding, pods without a node are bound by the kube-scheduler;
+        they count as deployed once the binding is observed within
+        cluster_kwok_bind_timeout seconds. Otherwise they fail without an API call.
+        """
+        indices = []
+        for i, (pod, node) in enumerate(zip(pods, nodes)):
+            if node is None and not delegate_binding:
+                logger.warning(f"Cannot deploy pod {pod.name} - no node provided")
+            else:
+                indices.append(i)
+        submitted = self._run_concurrently(self._submit_pod, [(pods[i], nodes[i]) for i in indices])
 
+        deadline = time.monotonic() + self.bind_timeout
+        deployed = [False] * len(pods)
+        for i, ok in zip(indices, submitted):
+            deployed[i] = ok and self._confirm_pod(pods[i], nodes[i], deadline)
+        return deployed
+
+    def _submit_pod(self, request) -> bool:
+        pod, node = request
+        try:
+            self.api.create_namespaced_pod(namespace="default", body=self._pod_to_k8s_object(pod, node))
+            if self.use_informer and node is not None:
+                # Bound directly: account for it before the watch confirms it
+                self._get_informer().assume_pod(pod.name, node.name, pod.cpu, pod.memory)
             return True
         except Exception as e:
             logger.error(f"Failed to deploy pod {pod.name}: {e}")
             return False
 
+    def _confirm_pod(self, pod: Pod, node: Node, deadline) -> bool:
+        if self.use_informer:
+            informer = self._get_informer()
+            if node is not None:
+                pod.node = informer.get_node(node.name)
+            else:
+                pod.node = informer.wait_for_pod_node(pod.name, deadline - time.monotonic())
+        else:
+            pod.node = self._poll_pod_node(pod.name, deadline)
+        if pod.node is not None:
+            return True
+
+        target = node.name if node is not None else "any node"
+        logger.warning(f"Pod {pod.name} failed to bind to {target} within {self.bind_timeout}s. Cleaning up...")
+        try:
+            self.api.delete_namespaced_pod(name=pod.name, namespace="default")
+            if self.informer is not None:
+                self.informer.forget_pod(pod.name)
+        except Exception as e:
+            logger.error(f"Failed to clean up pod {pod.name}: {e}")
+        return False
+
+    def _poll_pod_node(self, pod_name: str, deadline) -> Node:
+        while True:
+            node = self._read_pod_node(pod_name)
+            if node is not None or time.monotonic() >= deadline:
+                return node
+            time.sleep(0.05)
+
     def terminate_pod(self, pod: Pod) -> bool:
         try:
             self.api.delete_namespaced_pod(name=pod.name, namespace="default")
+            if self.informer is not None:
+                self.informer.forget_pod(pod.name)
         except Exception as e:
             logger.error(f"Failed to terminate pod {pod.name}: {e}")
 
@@ -119,6 +328,14 @@ class KWOKCluster(Cluster):
         """
         Returns the node that this pod is running on.
         """
+        if self.use_informer:
+            node = self._get_informer().get_pod_node(pod_name)
+            if node is not None:
+                return node
+        # Not bound in the cache (yet): ask the API server
+        return self._read_pod_node(pod_name)
+
+    def _read_pod_node(self, pod_name: str) -> Node:
         try:
             kwok_pod = self.api.read_namespaced_pod(namespace="default", name=pod_name)
             if kwok_pod.spec.node_name:
@@ -133,6 +350,13 @@ class KWOKCluster(Cluster):
         """
         Returns information for the given node name.
         """
+        if self.use_informer:
+            node = self._get_informer().get_node(node_name)
+            if node is not None:
+                return node
+        return self._read_node(node_name)
+
+    def _read_node(self, node_name: str) -> Node:
         try:
             # Get basic node info
             kwok_node = self.api.read_node(name=node_name)
@@ -0,0 +1,281 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+import cutsimulator.utils.utility as util
+from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.node_table import NodeTable
+import logging
+logger = logging.getLogger(__name__)
+
+
+def pod_requests(k8s_pod):
+    """
+    Returns the summed cpu (m) and memory (Mi) requests of the containers of a pod.
+    """
+    cpu, memory = 0, 0
+    for container in k8s_pod.spec.containers or []:
+        resources = container.resources.requests if container.resources else None
+        if resources:
+            cpu += util.convert_cpu(resources.get("cpu", "0"))
+            memory += util.convert_memory(resources.get("memory", "0"))
+    return cpu, memory
+
+
+# Informer-style local cache of the nodes and pods of a KWOK cluster.
+# The cache is filled by a list and kept up to date by one watch thread per
+# resource, which relists on errors, expired resource versions and every
+# resync_period seconds. Deployments and terminations of the simulator are
+# applied optimistically (assume_pod / forget_pod) before the watch confirms
+# them, so the node resources are always served from memory.
+#
+# Node resources live in a NodeTable (available = allocatable - requests of the
+# pods bound to the node). All state changes happen under self.lock.
+class KWOKInformer:
+    def __init__(self, api, namespace="default", node_prefix="node-", watch_factory=None,
+                 resync_period=300, watch_timeout=60):
+        self.api = api
+        self.namespace = namespace
+        self.node_prefix = node_prefix
+        self.watch_factory = watch_factory or watch.Watch
+        self.resync_period = resync_period
+        self.watch_timeout = watch_timeout
+
+        self.lock = threading.RLock()
+        self.bound = threading.Condition(self.lock)  # notified when a pod gets a node
+        self.table = NodeTable()
+        self.pods = {}       # pod name -> (node name or None, cpu, memory)
+        self.usage = {}      # node name -> [cpu, memory] requested by its pods
+        self.forgotten = set()  # pods terminated locally whose deletion was not watched yet
+        self.relists = 0
+        self.events = 0
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._watches = []
+
+    def start(self):
+        """
+        Lists the cluster synchronously and starts the watch threads.
+        """
+        node_version = self._list_nodes()
+        pod_version = self._list_pods()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, args=(self._list_nodes, self.api.list_node, {}, self._on_node_event, node_version),
+                             name="kwok-node-informer", daemon=True),
+            threading.Thread(target=self._run, args=(self._list_pods, self.api.list_namespaced_pod, {"namespace": self.namespace},
+                                                     self._on_pod_event, pod_version),
+                             name="kwok-pod-informer", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for w in list(self._watches):
+            w.stop()
+        for thread in self._threads:
+            thread.join(timeout=self.watch_timeout)
+        self._threads = []
+
+    # --- queries -----------------------------------------------------------
+
+    def get_nodes(self) -> List[Node]:
+        # A copy, as a node deletion rebuilds the table list in place
+        with self.lock:
+            return list(self.table.nodes)
+
+    def get_node(self, node_name: str) -> Optional[Node]:
+        with self.lock:
+            row = self.table.rows.get(node_name)
+            return self.table.nodes[row] if row is not None else None
+
+    def get_pod_node(self, pod_name: str) -> Optional[Node]:
+        with self.lock:
+            entry = self.pods.get(pod_name)
+            return self.get_node(entry[0]) if entry is not None and entry[0] else None
+
+    def has_pod(self, pod_name: str) -> bool:
+        with self.lock:
+            return pod_name in self.pods
+
+    def wait_for_pod_node(self, pod_name: str, timeout) -> Optional[Node]:
+        """
+        Waits up to timeout seconds until the watch reports the pod as bound
+        and returns its node, or None if it was not bound in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self.bound:
+            while True:
+                node = self.get_pod_node(pod_name)
+                remaining = deadline - time.monotonic()
+                if node is not None or remaining <= 0:
+                    return node
+                self.bound.wait(remaining)
+
+    # --- optimistic updates ------------------------------------------------
+
+    def assume_node(self, node: Node):
+        with self.lock:
+            self._upsert_node(node.name, node.cpu_capacity, node.mem_capacity)
+
+    def assume_pod(self, pod_name, node_name, cpu, memory):
+        with self.lock:
+            self.forgotten.discard(pod_name)
+            self._set_pod(pod_name, node_name, cpu, memory)
+
+    def forget_pod(self, pod_name):
+        with self.lock:
+            self._remove_pod(pod_name)
+            self.forgotten.add(pod_name)
+
+    # --- list / watch ------------------------------------------------------
+
+    def _run(self, relist, list_func, list_kwargs, on_event, resource_version):
+        last_list = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                if resource_version is None or time.monotonic() - last_list >= self.resync_period:
+                    resource_version = relist()
+                    last_list = time.monotonic()
+
+                timeout = max(1, int(min(self.watch_timeout, self.resync_period - (time.monotonic() - last_list))))
+                w = self.watch_factory()
+                self._watches.append(w)
+                try:
+                    for event in w.stream(list_func, resource_version=resource_version, timeout_seconds=timeout, **list_kwargs):
+                        if self._stop.is_set():
+                            break
+                        if event["type"] == "ERROR":
+                            resource_version = None  # e.g. 410 Gone: the version expired
+                            break
+                        resource_version = on_event(event["type"], event["object"]) or resource_version
+                finally:
+                    self._watches.remove(w)
+            except ApiException as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Watch failed ({e.status}), relisting")
+                resource_version = None
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Watch failed: {e}, relisting")
+                    self._stop.wait(1)
+                resource_version = None
+
+    def _list_nodes(self):
+        k8s_nodes = self.api.list_node()
+        listed = {}
+        for k8s_node in k8s_nodes.items:
+            if k8s_node.metadata.name.startswith(self.node_prefix):
+                listed[k8s_node.metadata.name] = self._node_resources(k8s_node)
+
+        with self.lock:
+            self.relists += 1
+            if any(name not in listed for name in self.table.rows):
+                self._rebuild_table(listed)
+            else:
+                for name, (cpu, memory) in listed.items():
+                    self._upsert_node(name, cpu, memory)
+        return k8s_nodes.metadata.resource_version
+
+    def _list_pods(self):
+        k8s_pods = self.api.list_namespaced_pod(namespace=self.namespace)
+        listed = {}
+        for k8s_pod in k8s_pods.items:
+            if k8s_pod.metadata.deletion_timestamp is None:
+                listed[k8s_pod.metadata.name] = (k8s_pod.spec.node_name, *pod_requests(k8s_pod))
+
+        with self.lock:
+            self.relists += 1
+            self.forgotten &= set(listed)
+            for name in list(self.pods):
+                if name not in listed:
+                    self._remove_pod(name)
+            for name, (node_name, cpu, memory) in listed.items():
+                if name not in self.forgotten:
+                    self._set_pod(name, node_name, cpu, memory)
+        return k8s_pods.metadata.resource_version
+
+    def _on_node_event(self, event_type, k8s_node):
+        name = k8s_node.metadata.name
+        with self.lock:
+            self.events += 1
+            if name.startswith(self.node_prefix):
+                if event_type == "DELETED":
+                    if name in self.table.rows:
+                        self._rebuild_table({n.name: (n.cpu_capacity, n.mem_capacity) for n in self.table.nodes if n.name != name})
+                else:
+                    self._upsert_node(name, *self._node_resources(k8s_node))
+        return k8s_node.metadata.resource_version
+
+    def _on_pod_event(self, event_type, k8s_pod):
+        name = k8s_pod.metadata.name
+        with self.lock:
+            self.events += 1
+            if event_type == "DELETED":
+                self._remove_pod(name)
+                self.forgotten.discard(name)
+            elif name not in self.forgotten and k8s_pod.metadata.deletion_timestamp is None:
+                self._set_pod(name, k8s_pod.spec.node_name, *pod_requests(k8s_pod))
+        return k8s_pod.metadata.resource_version
+
+    # --- cache updates (called with the lock held) --------------------------
+
+    def _node_resources(self, k8s_node):
+        allocatable = k8s_node.status.allocatable or {}
+        return util.convert_cpu(allocatable.get("cpu", "0")), util.convert_memory(allocatable.get("memory", "0Mi"))
+
+    def _upsert_node(self, name, cpu, memory):
+        row = self.table.rows.get(name)
+        if row is None:
+            self.table.add_nodes([Node(name, cpu, memory)])
+            row = self.table.rows[name]
+        elif (self.table._cpu_capacity[row], self.table._mem_capacity[row]) != (cpu, memory):
+            self.table.set_capacity(row, cpu, memory)
+        self._refresh_node(name)
+
+    def _rebuild_table(self, nodes: Dict[str, tuple]):
+        # Nodes were deleted: the remaining nodes get new rows (and views)
+        self.table.clear()
+        self.table.add_nodes([Node(name, cpu, memory) for name, (cpu, memory) in nodes.items()])
+        for name in nodes:
+            self._refresh_node(name)
+
+    def _refresh_node(self, name):
+        row = self.table.rows.get(name)
+        if row is None:
+            return
+        used_cpu, used_memory = self.usage.get(name, (0, 0))
+        self.table.set_available(row, max(int(self.table._cpu_capacity[row]) - used_cpu, 0),
+                                 max(int(self.table._mem_capacity[row]) - used_memory, 0))
+
+    def _set_pod(self, name, node_name, cpu, memory):
+        entry = (node_name, cpu, memory)
+        previous = self.pods.get(name)
+        if previous == entry:
+            return
+        if previous is not None:
+            self._remove_pod(name)
+        self.pods[name] = entry
+        if node_name:
+            usage = self.usage.setdefault(node_name, [0, 0])
+            usage[0] += cpu
+            usage[1] += memory
+            self._refresh_node(node_name)
+            self.bound.notify_all()
+
+    def _remove_pod(self, name):
+        entry = self.pods.pop(name, None)
+        if entry is None or not entry[0]:
+            return
+        node_name, cpu, memory = entry
+        usage = self.usage[node_name]
+        usage[0] -= cpu
+        usage[1] -= memory
+        if usage == [0, 0]:
+            del self.usage[node_name]
+        self._refresh_node(node_name)
@@ -1,11 +1,15 @@
-# Contains info for a cluster node
+# Contains info for a cluster node.
+# A node either holds its own values or, once added to a NodeTable, acts as a
+# thin view onto its row of the table.
 class Node:
     def __init__(self, name, cpu_capacity, mem_capacity):
         self.name = name
-        self.cpu_capacity = cpu_capacity
-        self.mem_capacity = mem_capacity
-        self.cpu_available = cpu_capacity
-        self.mem_available = mem_capacity
+        self._table = None
+        self._row = -1
+        self._cpu_capacity = cpu_capacity
+        self._mem_capacity = mem_capacity
+        self._cpu_available = cpu_capacity
+        self._mem_available = mem_capacity
 
     def __eq__(self, other):
         return isinstance(other, Node) and self.name == other.name
@@ -16,17 +20,91 @@ class Node:
     def __repr__(self):
         return f"Node(name={self.name}, cpu={self.cpu_capacity}, mem={self.mem_capacity})"
 
+    @property
+    def cpu_capacity(self):
+        if self._table is None:
+            return self._cpu_capacity
+        return int(self._table._cpu_capacity[self._row])
+
+    @cpu_capacity.setter
+    def cpu_capacity(self, value):
+        if self._table is None:
+            self._cpu_capacity = value
+        else:
+            self._table.set_capacity(self._row, value, self.mem_capacity)
+
+    @property
+    def mem_capacity(self):
+        if self._table is None:
+            return self._mem_capacity
+        return int(self._table._mem_capacity[self._row])
+
+    @mem_capacity.setter
+    def mem_capacity(self, value):
+        if self._table is None:
+            self._mem_capacity = value
+        else:
+            self._table.set_capacity(self._row, self.cpu_capacity, value)
+
+    @property
+    def cpu_available(self):
+        if self._table is None:
+            return self._cpu_available
+        return int(self._table._cpu_available[self._row])
+
+    @cpu_available.setter
+    def cpu_available(self, value):
+        if self._table is None:
+            self._cpu_available = value
+        else:
+            self._table.set_available(self._row, value, self.mem_available)
+
+    @property
+    def mem_available(self):
+        if self._table is None:
+            return self._mem_available
+        return int(self._table._mem_available[self._row])
+
+    @mem_available.setter
+    def mem_available(self, value):
+        if self._table is None:
+            self._mem_available = value
+        else:
+            self._table.set_available(self._row, self.cpu_available, value)
+
     def allocate_resources(self, cpu, memory):
-        self.cpu_available -= cpu
-        self.mem_available -= memory
-        if self.cpu_available < 0 : self.cpu_available = 0
-        if self.mem_available < 0 : self.mem_available = 0
+        if self._table is not None:
+            self._table.allocate(self._row, cpu, memory)
+            return
+
+        self._cpu_available -= cpu
+        self._mem_available -= memory
+        if self._cpu_available < 0 : self._cpu_available = 0
+        if self._mem_available < 0 : self._mem_available = 0
 
     def release_resources(self, cpu, memory):
-        self.cpu_available += cpu
-        self.mem_available += memory
-        if self.cpu_available > self.cpu_capacity : self.cpu_available = self.cpu_capacity
-        if self.mem_available > self.mem_capacity : self.mem_available = self.mem_capacity
+        if self._table is not None:
+            self._table.release(self._row, cpu, memory)
+            return
+
+        self._cpu_available += cpu
+        self._mem_available += memory
+        if self._cpu_available > self._cpu_capacity : self._cpu_available = self._cpu_capacity
+        if self._mem_available > self._mem_capacity : self._mem_available = self._mem_capacity
 
     def has_available_resources(self, cpu, memory) -> bool:
         return self.cpu_available >= cpu and self.mem_available >= memory
+
+    def _attach(self, table, row):
+        self._table = table
+        self._row = row
+
+    def _detach(self):
+        if self._table is None:
+            return
+        self._cpu_capacity = self.cpu_capacity
+        self._mem_capacity = self.mem_capacity
+        self._cpu_available = self.cpu_available
+        self._mem_available = self.mem_available
+        self._table = None
+        self._row = -1
@@ -0,0 +1,340 @@
+import math
+from typing import List
+
+import numpy as np
+
+from cutsimulator.cluster.feasibility_index import FeasibilityIndex
+from cutsimulator.cluster.node import Node
+
+# A node counts as busy when its cpu or mem utilization exceeds this
+UTIL_BUSY_THRESHOLD = 0.01
+
+# The running utilization sums are recomputed after this many updates to
+# bound the floating point drift of the incremental updates
+UTIL_RESYNC_INTERVAL = 4096
+
+
+# Segment tree over row values answering the min and max of all rows in O(1)
+# after O(log N) point updates. Unused rows hold +inf/-inf.
+class MinMaxTree:
+    def __init__(self, rows):
+        self.leaves = 1
+        while self.leaves < rows:
+            self.leaves *= 2
+        self.min = [math.inf] * (2 * self.leaves)
+        self.max = [-math.inf] * (2 * self.leaves)
+
+    def update(self, row, value):
+        mins, maxs = self.min, self.max
+        p = row + self.leaves
+        mins[p] = maxs[p] = value
+        p >>= 1
+        while p:
+            left, right = mins[2 * p], mins[2 * p + 1]
+            mins[p] = left if left < right else right
+            left, right = maxs[2 * p], maxs[2 * p + 1]
+            maxs[p] = left if left > right else right
+            p >>= 1
+
+    @property
+    def min_value(self):
+        return self.min[1]
+
+    @property
+    def max_value(self):
+        return self.max[1]
+
+# Struct-of-arrays storage for the resources of cluster nodes.
+# Each node occupies one row of the capacity and availability columns and the
+# Node objects handed out by the table are thin views onto their row.
+# Cluster-wide totals are maintained incrementally on every update, as are the
+# per-node utilization columns with their running sums, sums of squares,
+# min/max trees and busy node count, and the feasibility index over the
+# available resources.
+class NodeTable:
+    def __init__(self, initial_rows=64):
+        self.size = 0
+        self.nodes = []   # row -> Node view
+        self.rows = {}    # node name -> row
+        self._allocate_columns(max(initial_rows, 1))
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.total_cpu_capacity = 0
+        self.total_mem_capacity = 0
+        self.total_cpu_available = 0
+        self.total_mem_available = 0
+        self._reset_utilization()
+
+    def _reset_utilization(self):
+        self.sum_cpu_util = 0.0
+        self.sumsq_cpu_util = 0.0
+        self.sum_mem_util = 0.0
+        self.sumsq_mem_util = 0.0
+        self.sum_balance = 0.0
+        self.busy_nodes = 0
+        self.zero_capacity_nodes = 0
+        self._util_updates = 0
+        self._cpu_util_tree = MinMaxTree(len(self._cpu_capacity))
+        self._mem_util_tree = MinMaxTree(len(self._cpu_capacity))
+        self.index = FeasibilityIndex(self)
+        for row in range(self.size):
+            self._add_utilization(row)
+
+    def _allocate_columns(self, rows):
+        self._cpu_capacity = np.zeros(rows, dtype=np.int64)
+        self._mem_capacity = np.zeros(rows, dtype=np.int64)
+        self._cpu_available = np.zeros(rows, dtype=np.int64)
+        self._mem_available = np.zeros(rows, dtype=np.int64)
+        self._cpu_util = np.zeros(rows, dtype=np.float64)
+        self._mem_util = np.zeros(rows, dtype=np.float64)
+
+    def _grow(self, min_rows):
+        rows = len(self._cpu_capacity)
+        while rows < min_rows:
+            rows *= 2
+        old = (self._cpu_capacity, self._mem_capacity, self._cpu_available, self._mem_available, self._cpu_util, self._mem_util)
+        self._allocate_columns(rows)
+        for new_col, old_col in zip((self._cpu_capacity, self._mem_capacity, self._cpu_available, self._mem_available,
+                                     self._cpu_util, self._mem_util), old):
+            new_col[:self.size] = old_col[:self.size]
+        self._reset_utilization()
+
+    # Column views (only the occupied rows)
+    @property
+    def cpu_capacity(self) -> np.ndarray:
+        return self._cpu_capacity[:self.size]
+
+    @property
+    def mem_capacity(self) -> np.ndarray:
+        return self._mem_capacity[:self.size]
+
+    @property
+    def cpu_available(self) -> np.ndarray:
+        return self._cpu_available[:self.size]
+
+    @property
+    def mem_available(self) -> np.ndarray:
+        return self._mem_available[:self.size]
+
+    @property
+    def cpu_util(self) -> np.ndarray:
+        return self._cpu_util[:self.size]
+
+    @property
+    def mem_util(self) -> np.ndarray:
+        return self._mem_util[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def add_nodes(self, nodes: List[Node]):
+        """
+        Appends the given nodes as new rows and turns them into views onto the table.
+        """
+        for node in nodes:
+            if node.name in self.rows:
+                raise ValueError(f"Node {node.name} already exists")
+
+        if self.size + len(nodes) > len(self._cpu_capacity):
+            self._grow(self.size + len(nodes))
+
+        for node in nodes:
+            row = self.size
+            self._cpu_capacity[row] = node.cpu_capacity
+            self._mem_capacity[row] = node.mem_capacity
+            self._cpu_available[row] = node.cpu_available
+            self._mem_available[row] = node.mem_available
+            node._attach(self, row)
+            self.nodes.append(node)
+            self.rows[node.name] = row
+            self.size += 1
+            self._add_utilization(row)
+
+            self.total_cpu_capacity += int(self._cpu_capacity[row])
+            self.total_mem_capacity += int(self._mem_capacity[row])
+            self.total_cpu_available += int(self._cpu_available[row])
+            self.total_mem_available += int(self._mem_available[row])
+
+    def clear(self):
+        # Detached nodes keep their last known values
+        for node in self.nodes:
+            node._detach()
+        self.nodes.clear()
+        self.rows.clear()
+        self.size = 0
+        self._reset_totals()
+
+    def get_node(self, node_name: str) -> Node:
+        row = self.rows.get(node_name)
+        return None if row is None else self.nodes[row]
+
+    def allocate(self, row, cpu, memory):
+        cpu_available = int(self._cpu_available[row])
+        mem_available = int(self._mem_available[row])
+        self.set_available(row, max(cpu_available - cpu, 0), max(mem_available - memory, 0))
+
+    def release(self, row, cpu, memory):
+        cpu_available = int(self._cpu_available[row])
+        mem_available = int(self._mem_available[row])
+        self.set_available(row, min(cpu_available + cpu, int(self._cpu_capacity[row])),
+                           min(mem_available + memory, int(self._mem_capacity[row])))
+
+    def set_available(self, row, cpu, memory):
+        self.total_cpu_available += int(cpu) - int(self._cpu_available[row])
+        self.total_mem_available += int(memory) - int(self._mem_available[row])
+        self._remove_utilization(row)
+        self._cpu_available[row] = cpu
+        self._mem_available[row] = memory
+        self._add_utilization(row)
+
+    def set_capacity(self, row, cpu, memory):
+        self.total_cpu_capacity += int(cpu) - int(self._cpu_capacity[row])
+        self.total_mem_capacity += int(memory) - int(self._mem_capacity[row])
+        self._remove_utilization(row)
+        self._cpu_capacity[row] = cpu
+        self._mem_capacity[row] = memory
+        self._add_utilization(row)
+
+    def allocate_rows(self, rows: np.ndarray, cpus: np.ndarray, memories: np.ndarray):
+        """
+        Allocates resources on many rows at once (rows may repeat).
+        """
+        touched = np.unique(rows)
+        cpu_before, mem_before = self._available_sums(touched)
+        for row in touched.tolist():
+            self._remove_utilization(row)
+        np.subtract.at(self._cpu_available, rows, cpus)
+        np.subtract.at(self._mem_available, rows, memories)
+        self._cpu_available[touched] = np.maximum(self._cpu_available[touched], 0)
+        self._mem_available[touched] = np.maximum(self._mem_available[touched], 0)
+        self._update_available_totals(touched, cpu_before, mem_before)
+        for row in touched.tolist():
+            self._add_utilization(row)
+
+    def release_rows(self, rows: np.ndarray, cpus: np.ndarray, memories: np.ndarray):
+        """
+        Releases resources on many rows at once (rows may repeat).
+        """
+        touched = np.unique(rows)
+        cpu_before, mem_before = self._available_sums(touched)
+        for row in touched.tolist():
+            self._remove_utilization(row)
+        np.add.at(self._cpu_available, rows, cpus)
+        np.add.at(self._mem_available, rows, memories)
+        self._cpu_available[touched] = np.minimum(self._cpu_available[touched], self._cpu_capacity[touched])
+        self._mem_available[touched] = np.minimum(self._mem_available[touched], self._mem_capacity[touched])
+        self._update_available_totals(touched, cpu_before, mem_before)
+        for row in touched.tolist():
+            self._add_utilization(row)
+
+    def _available_sums(self, rows):
+        return int(self._cpu_available[rows].sum()), int(self._mem_available[rows].sum())
+
+    def _update_available_totals(self, rows, cpu_before, mem_before):
+        cpu_after, mem_after = self._available_sums(rows)
+        self.total_cpu_available += cpu_after - cpu_before
+        self.total_mem_available += mem_after - mem_before
+
+    def _remove_utilization(self, row):
+        # Takes the current utilization of a row out of the running aggregates
+        cpu = float(self._cpu_util[row])
+        mem = float(self._mem_util[row])
+        self.sum_cpu_util -= cpu
+        self.sumsq_cpu_util -= cpu * cpu
+        self.sum_mem_util -= mem
+        self.sumsq_mem_util -= mem * mem
+        self.sum_balance -= max(0.0, 1 - abs(cpu - mem))
+        if cpu > UTIL_BUSY_THRESHOLD or mem > UTIL_BUSY_THRESHOLD:
+            self.busy_nodes -= 1
+        if self._cpu_capacity[row] <= 0 or self._mem_capacity[row] <= 0:
+            self.zero_capacity_nodes -= 1
+
+    def _add_utilization(self, row):
+        # Recomputes the utilization of a row and adds it to the running aggregates
+        cpu_capacity = int(self._cpu_capacity[row])
+        mem_capacity = int(self._mem_capacity[row])
+        cpu_available = int(self._cpu_available[row])
+        mem_available = int(self._mem_available[row])
+        cpu = 1 - cpu_available / cpu_capacity if cpu_capacity > 0 else 0.0
+        mem = 1 - mem_available / mem_capacity if mem_capacity > 0 else 0.0
+        self._cpu_util[row] = cpu
+        self._mem_util[row] = mem
+        self.sum_cpu_util += cpu
+        self.sumsq_cpu_util += cpu * cpu
+        self.sum_mem_util += mem
+        self.sumsq_mem_util += mem * mem
+        self.sum_balance += max(0.0, 1 - abs(cpu - mem))
+        if cpu > UTIL_BUSY_THRESHOLD or mem > UTIL_BUSY_THRESHOLD:
+            self.busy_nodes += 1
+        if cpu_capacity <= 0 or mem_capacity <= 0:
+            self.zero_capacity_nodes += 1
+        self._cpu_util_tree.update(row, cpu)
+        self._mem_util_tree.update(row, mem)
+        self.index.update(row, cpu_capacity, mem_capacity, cpu_available, mem_available)
+
+        self._util_updates += 1
+        if self._util_updates >= UTIL_RESYNC_INTERVAL:
+            self._resync_utilization_sums()
+
+    def _resync_utilization_sums(self):
+        cpu, mem = self.cpu_util, self.mem_util
+        self.sum_cpu_util = float(cpu.sum())
+        self.sumsq_cpu_util = float(np.dot(cpu, cpu))
+        self.sum_mem_util = float(mem.sum())
+        self.sumsq_mem_util = float(np.dot(mem, mem))
+        self.sum_balance = float(np.maximum(0, 1 - np.abs(cpu - mem)).sum())
+        self._util_updates = 0
+
+    def get_utilization_summary(self) -> dict:
+        """
+        Returns the mean, std, min and max of the node cpu and mem utilization
+        (0 for nodes without capacity), the mean cpu/mem balance and the number
+        of busy nodes, all from the running aggregates.
+        """
+        n = self.size
+        if n == 0:
+            return empty_utilization_summary()
+
+        cpu_mean = self.sum_cpu_util / n
+        mem_mean = self.sum_mem_util / n
+        return {
+            "nodes": n,
+            "cpu_mean": cpu_mean,
+            "cpu_std": math.sqrt(max(self.sumsq_cpu_util / n - cpu_mean * cpu_mean, 0.0)),
+            "cpu_min": self._cpu_util_tree.min_value,
+            "cpu_max": self._cpu_util_tree.max_value,
+            "mem_mean": mem_mean,
+            "mem_std": math.sqrt(max(self.sumsq_mem_util / n - mem_mean * mem_mean, 0.0)),
+            "mem_min": self._mem_util_tree.min_value,
+            "mem_max": self._mem_util_tree.max_value,
+            "balance_mean": self.sum_balance / n,
+            "busy_nodes": self.busy_nodes,
+        }
+
+    def get_totals(self) -> dict:
+        return {"total_cpu_capacity" : self.total_cpu_capacity,
+                "total_mem_capacity" : self.total_mem_capacity,
+                "total_cpu_available" : self.total_cpu_available,
+                "total_mem_available" : self.total_mem_available}
+
+    def compute_totals(self) -> dict:
+        """
+        Recomputes the totals from the columns (used to verify the running totals).
+        """
+        return {"total_cpu_capacity" : int(self.cpu_capacity.sum()),
+                "total_mem_capacity" : int(self.mem_capacity.sum()),
+                "total_cpu_available" : int(self.cpu_available.sum()),
+                "total_mem_available" : int(self.mem_available.sum())}
+
+    def fit_mask(self, cpu, memory) -> np.ndarray:
+        """
+        Returns a boolean mask of the rows that have at least the given resources available.
+        """
+        return (self.cpu_available >= cpu) & (self.mem_available >= memory)
+
+
+def empty_utilization_summary() -> dict:
+    return {"nodes": 0, "cpu_mean": 0.0, "cpu_std": 0.0, "cpu_min": 0.0, "cpu_max": 0.0,
+            "mem_mean": 0.0, "mem_std": 0.0, "mem_min": 0.0, "mem_max": 0.0,
+            "balance_mean": 0.0, "busy_nodes": 0}
@@ -1,38 +1,50 @@
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.node_table import NodeTable
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.workload.pod import Pod
 import logging
 logger = logging.getLogger(__name__)
 
-# Simulates a virtual cluster in Python
+# Simulates a virtual cluster in Python.
+# Node resources are kept in a NodeTable so cluster-wide queries are vectorized
+# and the utilization summary is maintained incrementally.
+# With verify_aggregates the running cluster totals are checked against a full
+# recompute on every get_cluster_state() call.
 class PythonCluster(Cluster):
-    def __init__(self):
-        self.nodes = []
+    def __init__(self, verify_aggregates=False):
+        self.table = NodeTable()
         self.pods = {}
+        self.verify_aggregates = verify_aggregates
+
+    @property
+    def nodes(self) -> List[Node]:
+        return self.table.nodes
 
-    def reset(self):        
+    def reset(self):
         logger.info("Resetting PythonCluster...")
-        self.nodes.clear()
+        self.table.clear()
         self.pods.clear()
-    
+
     def deploy_nodes(self, nodes: List[Node]):
-        self.nodes.extend(nodes)
+        self.table.add_nodes(nodes)
         for node in nodes:
             logger.info(f"Added cluster node {node}")
 
     def get_nodes(self) -> List[Node]:
-        return self.nodes
+        return self.table.nodes
 
     def get_num_nodes(self) -> int:
-        return len(self.nodes)
+        return len(self.table)
 
-    def deploy_pod(self, pod: Pod, node: Node) -> bool:
+    def deploy_pod(self, pod: Pod, node: Node, delegate_binding=False) -> bool:
         if node is None:
             logger.warning(f"Cannot deploy pod {pod.name} - no node provided")
             return False
-        
+
         if not node.has_available_resources(pod.cpu, pod.memory):
             logger.warning(f"Cannot deploy pod {pod.name} - node has not enough resources")
             return False
@@ -44,6 +56,36 @@ class PythonCluster(Cluster):
 
         return True
 
+    def deploy_pods(self, pods: List[Pod], nodes: List[Node], delegate_binding=False) -> List[bool]:
+        """
+        Deploys many pods with a single vectorized feasibility check and allocation.
+        Pods that target the same node are admitted in order while they fit.
+        """
+        rows = np.array([self._row_of(node) for node in nodes], dtype=np.int64)
+        known = rows >= 0
+        foreign = any(node is not None and row < 0 for node, row in zip(nodes, rows))
+
+        if not foreign and len(np.unique(rows[known])) == np.count_nonzero(known):
+            # Distinct target nodes: the check against the current state is exact
+            table = self.table
+            cpus = np.array([pod.cpu for pod in pods], dtype=np.int64)
+            mems = np.array([pod.memory for pod in pods], dtype=np.int64)
+            deployed = known.copy()
+            deployed[known] = (table.cpu_available[rows[known]] >= cpus[known]) & \
+                              (table.mem_available[rows[known]] >= mems[known])
+            table.allocate_rows(rows[deployed], cpus[deployed], mems[deployed])
+            for i in np.flatnonzero(deployed):
+                pods[i].node = nodes[i]
+                self.pods[pods[i].name] = nodes[i]
+            for i in np.flatnonzero(~deployed):
+                if nodes[i] is None:
+                    logger.warning(f"Cannot deploy pod {pods[i].name} - no node provided")
+                else:
+                    logger.warning(f"Cannot deploy pod {pods[i].name} - node has not enough resources")
+            return deployed.tolist()
+
+        return super().deploy_pods(pods, nodes, delegate_binding)
+
     def terminate_pod(self, pod: Pod) -> bool:
         if pod.name not in self.pods:
             logger.warning(f"Unable to terminate pod {pod.name} - not found")
@@ -54,9 +96,73 @@ class PythonCluster(Cluster):
         del self.pods[pod.name]
         return True
 
+    def terminate_pods(self, pods: List[Pod]) -> List[bool]:
+        """
+        Terminates many pods with a single vectorized release.
+        """
+        found = [pod for pod in pods if pod.name in self.pods]
+        rows = np.array([self._row_of(self.pods[pod.name]) for pod in found], dtype=np.int64)
+        if np.any(rows < 0) or len({pod.name for pod in found}) != len(found):
+            return super().terminate_pods(pods)
+
+        cpus = np.array([pod.cpu for pod in found], dtype=np.int64)
+        mems = np.array([pod.memory for pod in found], dtype=np.int64)
+        self.table.release_rows(rows, cpus, mems)
+
+        terminated = []
+        for pod in pods:
+            if pod.name in self.pods:
+                del self.pods[pod.name]
+                terminated.append(True)
+            else:
+                logger.warning(f"Unable to terminate pod {pod.name} - not found")
+                terminated.append(False)
+        return terminated
+
     def get_pod_node(self, pod_name: str) -> Node:
         return self.pods[pod_name]
-    
+
     def get_node(self, node_name: str) -> Node:
-        return next((node for node in self.nodes if node.name == node_name), None)
+        return self.table.get_node(node_name)
+
+    def get_resource_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return (self.table.cpu_capacity, self.table.mem_capacity,
+                self.table.cpu_available, self.table.mem_available)
+
+    def get_fit_mask(self, cpu, memory) -> np.ndarray:
+        return self.table.fit_mask(cpu, memory)
+
+    def has_fit(self, cpu, memory) -> bool:
+        return self.table.index.any_fit(cpu, memory)
+
+    def get_fit_count(self, cpu, memory) -> int:
+        return self.table.index.count_fit(cpu, memory)
+
+    def get_best_fit(self, cpu, memory) -> Optional[Node]:
+        row = self.table.index.best_fit(cpu, memory)
+        return None if row is None else self.table.nodes[row]
+
+    def get_utilization(self, empty_usage=0.0) -> Tuple[np.ndarray, np.ndarray]:
+        if empty_usage != 0.0 and self.table.zero_capacity_nodes:
+            return super().get_utilization(empty_usage)
+        return self.table.cpu_util, self.table.mem_util
+
+    def get_utilization_summary(self, empty_usage=0.0) -> dict:
+        # The table tracks nodes without capacity at 0 utilization
+        if empty_usage != 0.0 and self.table.zero_capacity_nodes:
+            return super().get_utilization_summary(empty_usage)
+        return self.table.get_utilization_summary()
+
+    def get_cluster_state(self):
+        totals = self.table.get_totals()
+        if self.verify_aggregates:
+            expected = self.table.compute_totals()
+            if totals != expected:
+                logger.error(f"Cluster aggregates out of sync: running={totals}, recomputed={expected}")
+                raise RuntimeError("PythonCluster running totals do not match the node resources")
+        return totals
 
+    def _row_of(self, node: Node) -> int:
+        if node is None or node._table is not self.table:
+            return -1
+        return node._row
@@ -68,6 +68,10 @@ class DaroPettingZooEnv(ParallelEnv):
         Resets the environment and returns a dictionary of observations 
         (keyed by the agent name)
         """
+        if seed is not None:
+            # Generate the episode's cluster and workload from seeded streams
+            self.config["simulation_seed"] = seed
+
         # Randomize number of nodes and tasks within specified ranges
         num_nodes = random.randint(self.config["training_nodes_per_episode_min"], self.config["training_nodes_per_episode_max"])
         num_tasks = random.randint(self.config["training_nodes_per_episode_min"], self.config["training_nodes_per_episode_max"])
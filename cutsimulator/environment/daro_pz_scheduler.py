@@ -1,4 +1,3 @@
-import numpy as np
 import random as rnd
 
 import cutsimulator.state.obs_builder as ob
@@ -6,7 +5,7 @@ from cutsimulator.cluster.cluster import Cluster, Node
 from cutsimulator.environment.coordinator import Coordinator
 from cutsimulator.reward.reward_selector import RewardSelector
 from cutsimulator.scheduler.scheduler import Scheduler
-from cutsimulator.utils.utility import log_rewards
+from cutsimulator.utils.utility import log_rewards, output_path
 from cutsimulator.workload.pod import Pod
 
 # A scheduler to be used with the Daro PettingZoo environment
@@ -14,18 +13,20 @@ class DaroPettingZooScheduler(Scheduler):
     def __init__(self, config: dict, coordinator: Coordinator):
         self.reward_fn = RewardSelector(config, None).create_reward()
         self.coordinator = coordinator
+        self.reward_log_file = output_path(config, "reward_trace.csv")
 
     def schedule(self, pod: Pod) -> Node:
         nodes = self.cluster.get_nodes()
 
-        # Mark nodes that don't have enough resources
-        self.valid_nodes = [node.has_available_resources(pod.cpu, pod.memory) for node in nodes]
-        if not np.any(self.valid_nodes):
+        if not self.cluster.has_fit(pod.cpu, pod.memory):
             print(f"[Scheduler] No valid nodes found for Pod {pod.name}")
             return None  # No node can schedule this pod
 
+        # Mark nodes that don't have enough resources
+        self.valid_nodes = self.cluster.get_fit_mask(pod.cpu, pod.memory)
+
         # Build states and switch to the environment to select actions
-        self.obs = {f"agent_{i}": ob.build_node_obs(self.cluster, node, pod) for i, node in enumerate(nodes)}
+        self.obs = dict(zip((f"agent_{i}" for i in range(len(nodes))), ob.build_obs_matrix(self.cluster, pod)))
         self.coordinator.switch_turn()
         self.coordinator.wait_for_turn(is_main=False)
 
@@ -43,7 +44,7 @@ class DaroPettingZooScheduler(Scheduler):
         nodes = self.cluster.get_nodes()
         reward_list = self.reward_fn.compute(pod.node, nodes)
         self.rewards = {f"agent_{i}": reward for i, reward in enumerate(reward_list)}
-        log_rewards(pod.name, pod.node, nodes, reward_list)
+        log_rewards(pod.name, pod.node, nodes, reward_list, log_file=self.reward_log_file)
 
     def onPodTerminated(self, pod: Pod):
         pass
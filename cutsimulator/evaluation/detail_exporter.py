@@ -0,0 +1,291 @@
+import glob
+import importlib.util
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from cutsimulator.cluster.cluster import Cluster
+from cutsimulator.utils.utility import output_path
+from cutsimulator.workload.pod import Pod
+import logging
+logger = logging.getLogger(__name__)
+
+DETAIL_FORMATS = ["csv", "parquet", "npy"]
+
+# Bytes stored of the pod, task and node names; longer names are truncated with a warning
+DETAIL_NAME_BYTES = 64
+
+# Cluster utilization at one event timestamp (the last record of the timestamp)
+TIMELINE_RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("cpu_std", "<f8"),
+    ("mem_std", "<f8"),
+    ("avg_cpu", "<f8"),
+    ("avg_mem", "<f8"),
+    ("min_cpu", "<f8"),
+    ("max_cpu", "<f8"),
+    ("min_mem", "<f8"),
+    ("max_mem", "<f8"),
+])
+
+# Outcome of a pod: deployed (success) or failed after its restarts
+POD_RECORD_DTYPE = np.dtype([
+    ("pod", f"S{DETAIL_NAME_BYTES}"),
+    ("task", f"S{DETAIL_NAME_BYTES}"),
+    ("node", f"S{DETAIL_NAME_BYTES}"),
+    ("cpu", "<i8"),
+    ("memory", "<i8"),
+    ("arrival_time", "<f8"),
+    ("start_time", "<f8"),
+    ("end_time", "<f8"),
+    ("duration", "<f8"),
+    ("restart_count", "<i4"),
+    ("success", "?"),
+])
+
+
+def _parquet_available():
+    return any(importlib.util.find_spec(engine) is not None for engine in ("pyarrow", "fastparquet"))
+
+
+# Buffers the rows of one table in a preallocated chunk and writes every full
+# chunk as a shard part-NNNNN.<format> into its own directory. The last row
+# can be overwritten until the next row is appended.
+class ChunkedTableWriter:
+    def __init__(self, directory, dtype, chunk_rows, fmt):
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows has to be positive")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.fmt = fmt
+        self.buffer = np.zeros(chunk_rows, dtype=dtype)
+        self.count = 0
+        self.rows = 0
+        # Continue the numbering of a writer reopened on the same directory
+        # (the node matrices after the number of nodes changed)
+        self.part = len(glob.glob(os.path.join(directory, "part-*")))
+
+    def next_row(self):
+        """
+        Returns the buffer row to fill in for a new record.
+        """
+        if self.count == self.chunk_rows:
+            self.flush()
+        self.count += 1
+        self.rows += 1
+        return self.buffer[self.count - 1]
+
+    def last_row(self):
+        return self.buffer[self.count - 1] if self.count else None
+
+    def flush(self):
+        if self.count == 0:
+            return
+
+        path = os.path.join(self.directory, f"part-{self.part:05d}.{self.fmt}")
+        chunk = self.buffer[:self.count]
+        if self.fmt == "parquet":
+            frame = pd.DataFrame(chunk)
+            for name in frame.columns:
+                if chunk.dtype[name].kind == "S":
+                    frame[name] = frame[name].str.decode("utf-8")
+            frame.to_parquet(path, index=False)
+        else:
+            np.save(path, chunk)
+        self.part += 1
+        self.count = 0
+
+
+# Same as ChunkedTableWriter for matrices with one row per record (e.g. the
+# utilization of every node), always stored as .npy shards
+class ChunkedMatrixWriter(ChunkedTableWriter):
+    def __init__(self, directory, width, chunk_rows, dtype=np.float32):
+        super().__init__(directory, dtype, chunk_rows, "npy")
+        self.buffer = np.zeros((chunk_rows, width), dtype=dtype)
+
+
+# Exports the detailed statistics of a simulation run
+class DetailExporter(ABC):
+
+    @abstractmethod
+    def record_utilization(self, timestamp, entry: dict, cluster: Cluster):
+        pass
+
+    @abstractmethod
+    def record_pod(self, pod: Pod, success: bool):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+# An exporter that writes nothing (csv detail format or detailed statistics disabled)
+class NullDetailExporter(DetailExporter):
+
+    def record_utilization(self, timestamp, entry: dict, cluster: Cluster):
+        pass
+
+    def record_pod(self, pod: Pod, success: bool):
+        pass
+
+    def close(self):
+        pass
+
+
+# Writes the event timeline, the per-node utilization matrices and the pod
+# lifecycle records of a run as chunked columnar shards while the simulation
+# runs. Every run writes to a new run-NNNNN subdirectory of the detail directory:
+#   <directory>/timeline/part-*.{parquet,npy}
+#   <directory>/pods/part-*.{parquet,npy}
+#   <directory>/node_cpu_util/part-*.npy, node_mem_util/part-*.npy (row k = timeline row k)
+#   <directory>/node_names.npy
+# Names longer than DETAIL_NAME_BYTES are truncated with a warning.
+# Use load_detail_table() to read a table back.
+class ColumnarDetailExporter(DetailExporter):
+    def __init__(self, directory, fmt="parquet", chunk_rows=65536, node_utilization=True):
+        if fmt not in ("parquet", "npy"):
+            raise ValueError(f"Unsupported columnar detail format: {fmt}")
+        if fmt == "parquet" and not _parquet_available():
+            logger.warning("Parquet export requires pyarrow or fastparquet - writing .npy shards instead")
+            fmt = "npy"
+
+        self.directory = directory
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.node_utilization = node_utilization
+        self.timeline = ChunkedTableWriter(os.path.join(directory, "timeline"), TIMELINE_RECORD_DTYPE, chunk_rows, fmt)
+        self.pods = ChunkedTableWriter(os.path.join(directory, "pods"), POD_RECORD_DTYPE, chunk_rows, fmt)
+        self.node_cpu = None
+        self.node_mem = None
+        self._last_time = None
+        self._node_last_time = None
+        self._truncated_warning = False
+
+    def record_utilization(self, timestamp, entry: dict, cluster: Cluster):
+        # Only the last record of a timestamp is kept, as in the CSV trace
+        if timestamp == self._last_time:
+            row = self.timeline.last_row()
+        else:
+            row = self.timeline.next_row()
+        row["timestamp"] = timestamp
+        for name in TIMELINE_RECORD_DTYPE.names[1:]:
+            row[name] = entry[name]
+
+        if self.node_utilization:
+            self._record_node_utilization(timestamp, cluster)
+        self._last_time = timestamp
+
+    def _record_node_utilization(self, timestamp, cluster: Cluster):
+        cpu_usage, mem_usage = cluster.get_utilization()
+        if self.node_cpu is None or self.node_cpu.buffer.shape[1] != len(cpu_usage):
+            self._open_node_writers(cluster)
+
+        if timestamp == self._node_last_time:
+            self.node_cpu.last_row()[:] = cpu_usage
+            self.node_mem.last_row()[:] = mem_usage
+        else:
+            self.node_cpu.next_row()[:] = cpu_usage
+            self.node_mem.next_row()[:] = mem_usage
+        self._node_last_time = timestamp
+
+    def _open_node_writers(self, cluster: Cluster):
+        if self.node_cpu is not None:
+            logger.warning("Number of nodes changed during the run - restarting the node utilization matrices")
+            self.node_cpu.flush()
+            self.node_mem.flush()
+
+        names = [node.name for node in cluster.get_nodes()]
+        np.save(os.path.join(self.directory, "node_names.npy"), np.array(names, dtype=str))
+        self.node_cpu = ChunkedMatrixWriter(os.path.join(self.directory, "node_cpu_util"), len(names), self.chunk_rows)
+        self.node_mem = ChunkedMatrixWriter(os.path.join(self.directory, "node_mem_util"), len(names), self.chunk_rows)
+        self._node_last_time = None
+
+    def record_pod(self, pod: Pod, success: bool):
+        row = self.pods.next_row()
+        row["pod"] = self._encode_name(pod.name)
+        task = getattr(pod, "task", None)
+        row["task"] = self._encode_name(task.name) if task is not None else b""
+        row["node"] = self._encode_name(pod.node.name) if pod.node is not None else b""
+        row["cpu"] = pod.cpu
+        row["memory"] = pod.memory
+        row["arrival_time"] = pod.arrival_time
+        row["start_time"] = np.nan if pod.start_time is None else pod.start_time
+        row["end_time"] = np.nan if pod.end_time is None else pod.end_time
+        row["duration"] = pod.duration
+        row["restart_count"] = pod.restart_count
+        row["success"] = success
+
+    def _encode_name(self, name):
+        encoded = name.encode()
+        if len(encoded) > DETAIL_NAME_BYTES and not self._truncated_warning:
+            logger.warning(f"Names longer than {DETAIL_NAME_BYTES} bytes are truncated in the detailed statistics {self.directory}: {name}")
+            self._truncated_warning = True
+        return encoded
+
+    def close(self):
+        writers = [self.timeline, self.pods] + ([self.node_cpu, self.node_mem] if self.node_cpu is not None else [])
+        for writer in writers:
+            writer.flush()
+        logger.info(f"Exported {self.timeline.rows} timeline and {self.pods.rows} pod records to {self.directory}")
+
+
+def load_detail_table(directory) -> pd.DataFrame:
+    """
+    Concatenates the shards of an exported table (timeline or pods) into a DataFrame.
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "part-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+        else:
+            chunk = np.load(path)
+            frame = pd.DataFrame(chunk)
+            for name in frame.columns:
+                if chunk.dtype[name].kind == "S":
+                    frame[name] = frame[name].str.decode("utf-8")
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def load_detail_matrix(directory) -> np.ndarray:
+    """
+    Stacks the shards of an exported per-node matrix (node_cpu_util or node_mem_util).
+    """
+    parts = [np.load(path) for path in sorted(glob.glob(os.path.join(directory, "part-*.npy")))]
+    return np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+
+def new_run_directory(directory) -> str:
+    """
+    Creates and returns the next free run-NNNNN subdirectory of directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    run = len(glob.glob(os.path.join(directory, "run-*")))
+    while True:
+        path = os.path.join(directory, f"run-{run:05d}")
+        try:
+            os.mkdir(path)
+            return path
+        except FileExistsError:
+            run += 1
+
+
+def create_detail_exporter(config) -> DetailExporter:
+    """
+    Returns the exporter of the detailed statistics selected with
+    simulation_detail_format. The csv format is written by SimulationStatistics
+    at the end of the run, so it needs no exporter.
+    """
+    fmt = config.get('simulation_detail_format', 'csv')
+    if fmt not in DETAIL_FORMATS:
+        raise ValueError(f"Unsupported detail statistics format: {fmt}")
+    if not config.get('simulation_detail_statistics', False) or fmt == 'csv':
+        return NullDetailExporter()
+
+    return ColumnarDetailExporter(new_run_directory(output_path(config, "simulation_detail")), fmt,
+                                  chunk_rows=config.get('simulation_detail_chunk_rows', 65536),
+                                  node_utilization=config.get('simulation_detail_node_utilization', True))
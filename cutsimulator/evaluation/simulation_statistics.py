@@ -1,74 +1,158 @@
 import csv
-import numpy as np
+import math
 
+from cutsimulator.evaluation.detail_exporter import DetailExporter, NullDetailExporter
+from cutsimulator.evaluation.streaming_stats import StreamSummary
 from cutsimulator.utils.utility import log_statistics
 
+# Aggregates the cluster utilization recorded at every event. The per
+# timestamp values are kept only if keep_trace is set (for the detailed
+# statistics), otherwise they are folded into constant-memory aggregators.
+# As in the trace, only the last record of a timestamp counts. Besides the
+# per-event averages, the time-weighted averages weight every record by the
+# time until the next one.
 class LoadBalancingStatus:
-    def __init__(self):
+    def __init__(self, keep_trace=True):
+        self.keep_trace = keep_trace
         self.trace = {}  # time -> {"cpu_std": val, "mem_std": val, "avg_cpu": val, "avg_mem": val}
+        self.count = 0
+        self.sums = {"cpu_std": 0.0, "mem_std": 0.0, "avg_cpu": 0.0, "avg_mem": 0.0}
+        self.extremes = {"min_cpu": math.inf, "max_cpu": -math.inf, "min_mem": math.inf, "max_mem": -math.inf}
+        self.cpu_util = StreamSummary()
+        self.mem_util = StreamSummary()
+        self.weighted_duration = 0.0
+        self.weighted_sums = {"cpu_std": 0.0, "mem_std": 0.0, "avg_cpu": 0.0, "avg_mem": 0.0}
+        self._pending_time = None
+        self._pending = None
 
-    def record(self, timestamp, nodes):
-        cpu_usages = [1 - node.cpu_available / node.cpu_capacity if node.cpu_capacity else 0 for node in nodes]
-        mem_usages = [1 - node.mem_available / node.mem_capacity if node.mem_capacity else 0 for node in nodes]
-        self.trace[timestamp] = {
-            "cpu_std": np.std(cpu_usages),
-            "mem_std": np.std(mem_usages),
-            "avg_cpu": np.mean(cpu_usages),
-            "avg_mem": np.mean(mem_usages),
-            "min_cpu": np.min(cpu_usages),
-            "max_cpu": np.max(cpu_usages),
-            "min_mem": np.min(mem_usages),
-            "max_mem": np.max(mem_usages)
+    def record(self, timestamp, cluster):
+        summary = cluster.get_utilization_summary()
+        entry = {
+            "cpu_std": summary["cpu_std"],
+            "mem_std": summary["mem_std"],
+            "avg_cpu": summary["cpu_mean"],
+            "avg_mem": summary["mem_mean"],
+            "min_cpu": summary["cpu_min"],
+            "max_cpu": summary["cpu_max"],
+            "min_mem": summary["mem_min"],
+            "max_mem": summary["mem_max"]
         }
+        if self.keep_trace:
+            self.trace[timestamp] = entry
+
+        if self._pending is not None and timestamp != self._pending_time:
+            self._commit(max(timestamp - self._pending_time, 0))
+        self._pending_time = timestamp
+        self._pending = entry
+        return entry
+
+    def _commit(self, weight=0):
+        entry = self._pending
+        self.count += 1
+        for key in self.sums:
+            self.sums[key] += entry[key]
+        if weight:
+            self.weighted_duration += weight
+            for key in self.weighted_sums:
+                self.weighted_sums[key] += entry[key] * weight
+        self.extremes["min_cpu"] = min(self.extremes["min_cpu"], entry["min_cpu"])
+        self.extremes["max_cpu"] = max(self.extremes["max_cpu"], entry["max_cpu"])
+        self.extremes["min_mem"] = min(self.extremes["min_mem"], entry["min_mem"])
+        self.extremes["max_mem"] = max(self.extremes["max_mem"], entry["max_mem"])
+        self.cpu_util.add(entry["avg_cpu"])
+        self.mem_util.add(entry["avg_mem"])
+        self._pending_time = None
+        self._pending = None
+
+    def flush(self):
+        # Folds the record of the last timestamp into the aggregates
+        if self._pending is not None:
+            self._commit()
+
+    def merge(self, other: "LoadBalancingStatus"):
+        self.flush()
+        other.flush()
+        self.count += other.count
+        for key in self.sums:
+            self.sums[key] += other.sums[key]
+        self.weighted_duration += other.weighted_duration
+        for key in self.weighted_sums:
+            self.weighted_sums[key] += other.weighted_sums[key]
+        for key in ["min_cpu", "min_mem"]:
+            self.extremes[key] = min(self.extremes[key], other.extremes[key])
+        for key in ["max_cpu", "max_mem"]:
+            self.extremes[key] = max(self.extremes[key], other.extremes[key])
+        self.cpu_util.merge(other.cpu_util)
+        self.mem_util.merge(other.mem_util)
 
     def aggregate(self):
-        if not self.trace:
+        self.flush()
+        if not self.count:
             return {
                 "cpu_std": 0, "mem_std": 0,
                 "avg_cpu": 0, "avg_mem": 0,
                 "min_cpu": 0, "max_cpu": 0,
-                "min_mem": 0, "max_mem": 0
+                "min_mem": 0, "max_mem": 0,
+                "p50_cpu": 0, "p90_cpu": 0, "p99_cpu": 0,
+                "p50_mem": 0, "p90_mem": 0, "p99_mem": 0,
+                "tw_cpu_std": 0, "tw_mem_std": 0, "tw_avg_cpu": 0, "tw_avg_mem": 0
             }
 
-        cpu_stds = []
-        mem_stds = []
-        avg_cpus = []
-        avg_mems = []
-        min_cpus = []
-        max_cpus = []
-        min_mems = []
-        max_mems = []
-
-        for entry in self.trace.values():
-            cpu_stds.append(entry["cpu_std"])
-            mem_stds.append(entry["mem_std"])
-            avg_cpus.append(entry["avg_cpu"])
-            avg_mems.append(entry["avg_mem"])
-            min_cpus.append(entry["min_cpu"])
-            max_cpus.append(entry["max_cpu"])
-            min_mems.append(entry["min_mem"])
-            max_mems.append(entry["max_mem"])
+        # Without elapsed time (a single timestamp) every record weighs the same
+        if self.weighted_duration > 0:
+            weighted = {key: float(value / self.weighted_duration) for key, value in self.weighted_sums.items()}
+        else:
+            weighted = {key: float(value / self.count) for key, value in self.sums.items()}
 
         return {
-            "cpu_std": float(np.mean(cpu_stds)),
-            "mem_std": float(np.mean(mem_stds)),
-            "avg_cpu": float(np.mean(avg_cpus)),
-            "avg_mem": float(np.mean(avg_mems)),
-            "min_cpu": float(np.min(min_cpus)),
-            "max_cpu": float(np.max(max_cpus)),
-            "min_mem": float(np.min(min_mems)),
-            "max_mem": float(np.max(max_mems))
+            "cpu_std": float(self.sums["cpu_std"] / self.count),
+            "mem_std": float(self.sums["mem_std"] / self.count),
+            "avg_cpu": float(self.sums["avg_cpu"] / self.count),
+            "avg_mem": float(self.sums["avg_mem"] / self.count),
+            "min_cpu": float(self.extremes["min_cpu"]),
+            "max_cpu": float(self.extremes["max_cpu"]),
+            "min_mem": float(self.extremes["min_mem"]),
+            "max_mem": float(self.extremes["max_mem"]),
+            "p50_cpu": self.cpu_util.quantile(0.5),
+            "p90_cpu": self.cpu_util.quantile(0.9),
+            "p99_cpu": self.cpu_util.quantile(0.99),
+            "p50_mem": self.mem_util.quantile(0.5),
+            "p90_mem": self.mem_util.quantile(0.9),
+            "p99_mem": self.mem_util.quantile(0.99),
+            "tw_cpu_std": weighted["cpu_std"],
+            "tw_mem_std": weighted["mem_std"],
+            "tw_avg_cpu": weighted["avg_cpu"],
+            "tw_avg_mem": weighted["avg_mem"]
         }
 
+# Collects the statistics of simulation runs in constant memory: pod counts,
+# moments and quantile histograms of wait times and latencies, and the
+# utilization aggregates. Statistics of parallel runs can be merged.
+# The detailed statistics are either kept for the CSV export at the end of the
+# run or streamed to a DetailExporter while the simulation runs.
 class SimulationStatistics:
     def __init__(self, detailed=False):
-        self.pod_stats = []  # Holds dicts with pod lifecycle info
-        self.load_balancer = LoadBalancingStatus()
+        self.total_pods = 0
+        self.completed_pods = 0
+        self.wait_times = StreamSummary()
+        self.latencies = StreamSummary()
+        self.min_arrival = None
+        self.max_end = None
+        self.load_balancer = LoadBalancingStatus(keep_trace=detailed)
         self.simulation_start = None
         self.simulation_end = None
         self.detailed = detailed
-        self.cluster_nodes = []  # Persist final snapshot for capacity info
+        self.num_nodes = 0
+        self.cpu_capacity_range = (0, 0)
+        self.mem_capacity_range = (0, 0)
         self.num_tasks = 0
+        self.exporter = NullDetailExporter()
+
+    def set_detail_exporter(self, exporter: DetailExporter):
+        # A streaming exporter replaces the in-memory trace of the CSV export
+        self.exporter = exporter
+        if not isinstance(exporter, NullDetailExporter):
+            self.load_balancer.keep_trace = False
 
     def mark_start(self, timestamp):
         self.simulation_start = timestamp
@@ -77,55 +161,96 @@ class SimulationStatistics:
         self.simulation_end = timestamp
 
     def record_cluster_snapshot(self, nodes):
-        self.cluster_nodes = nodes  # save for post-analysis
+        # Keep only the capacity info needed for the final metrics
+        cpu_caps = [n.cpu_capacity for n in nodes]
+        mem_caps = [n.mem_capacity for n in nodes]
+        self.num_nodes = len(nodes)
+        self.cpu_capacity_range = (min(cpu_caps), max(cpu_caps)) if cpu_caps else (0, 0)
+        self.mem_capacity_range = (min(mem_caps), max(mem_caps)) if mem_caps else (0, 0)
 
     def set_task_count(self, num_tasks):
         self.num_tasks = num_tasks
 
     def record_pod_event(self, pod, success=True):
-        self.pod_stats.append({
-            "pod": pod.name,
-            "arrival": pod.arrival_time,
-            "start": pod.start_time,
-            "end": pod.end_time,
-            "success": success
-        })
+        self.total_pods += 1
+        self.exporter.record_pod(pod, success)
+        if not success or pod.end_time is None:
+            return
 
-    def record_cluster_utilization(self, timestamp, nodes):
-        self.load_balancer.record(timestamp, nodes)
+        self.completed_pods += 1
+        if pod.start_time is not None and pod.start_time > pod.arrival_time:
+            self.wait_times.add(pod.start_time - pod.arrival_time)
+        self.latencies.add(pod.end_time - pod.arrival_time)
+        self.min_arrival = pod.arrival_time if self.min_arrival is None else min(self.min_arrival, pod.arrival_time)
+        self.max_end = pod.end_time if self.max_end is None else max(self.max_end, pod.end_time)
 
-    def compute_final_metrics(self):
-        completed = [p for p in self.pod_stats if p['success'] and p['end'] is not None]
-        wait_times = [p['start'] - p['arrival'] for p in completed if p['start'] is not None and p['start'] > p['arrival']]
-        latencies = [p['end'] - p['arrival'] for p in completed if p['end'] is not None]
+    def record_cluster_utilization(self, timestamp, cluster):
+        entry = self.load_balancer.record(timestamp, cluster)
+        self.exporter.record_utilization(timestamp, entry, cluster)
 
-        duration = self.simulation_end - self.simulation_start if self.simulation_start is not None and self.simulation_end is not None else 0
-        throughput = len(completed) / duration if duration > 0 else 0
-        rejection_rate = 1 - len(completed) / len(self.pod_stats) if self.pod_stats else 0
-        makespan = max([p['end'] for p in completed], default=0) - min([p['arrival'] for p in completed], default=0)
+    def merge(self, other: "SimulationStatistics"):
+        """
+        Adds the statistics of another (e.g. parallel) run to this one.
+        Durations add up, so the throughput is over the combined simulated time.
+        """
+        duration = self._duration() + other._duration()
+        self.simulation_start = 0
+        self.simulation_end = duration
 
-        lb_agg = self.load_balancer.aggregate()
+        self.total_pods += other.total_pods
+        self.completed_pods += other.completed_pods
+        self.wait_times.merge(other.wait_times)
+        self.latencies.merge(other.latencies)
+        if other.min_arrival is not None:
+            self.min_arrival = other.min_arrival if self.min_arrival is None else min(self.min_arrival, other.min_arrival)
+        if other.max_end is not None:
+            self.max_end = other.max_end if self.max_end is None else max(self.max_end, other.max_end)
+        self.load_balancer.merge(other.load_balancer)
+        self.num_nodes = max(self.num_nodes, other.num_nodes)
+        if other.num_nodes:
+            ranges = [r for r in (self.cpu_capacity_range, other.cpu_capacity_range) if r != (0, 0)]
+            self.cpu_capacity_range = (min(r[0] for r in ranges), max(r[1] for r in ranges))
+            ranges = [r for r in (self.mem_capacity_range, other.mem_capacity_range) if r != (0, 0)]
+            self.mem_capacity_range = (min(r[0] for r in ranges), max(r[1] for r in ranges))
+        self.num_tasks += other.num_tasks
+
+    def _duration(self):
+        if self.simulation_start is None or self.simulation_end is None:
+            return 0
+        return self.simulation_end - self.simulation_start
+
+    def compute_final_metrics(self):
+        duration = self._duration()
+        throughput = self.completed_pods / duration if duration > 0 else 0
+        rejection_rate = 1 - self.completed_pods / self.total_pods if self.total_pods else 0
+        makespan = (self.max_end - self.min_arrival) if self.completed_pods else 0
 
-        cpu_caps = [n.cpu_capacity for n in self.cluster_nodes]
-        mem_caps = [n.mem_capacity for n in self.cluster_nodes]
+        lb_agg = self.load_balancer.aggregate()
+        wait, latency = self.wait_times, self.latencies
 
         return {
-            "total_pods": len(self.pod_stats),
-            "completed_pods": len(completed),
+            "total_pods": self.total_pods,
+            "completed_pods": self.completed_pods,
             "rejection_rate": round(rejection_rate, 4),
-            "avg_wait_time": round(np.mean(wait_times), 4) if wait_times else 0,
-            "min_wait_time": round(np.min(wait_times), 4) if wait_times else 0,
-            "max_wait_time": round(np.max(wait_times), 4) if wait_times else 0,
-            "avg_latency": round(np.mean(latencies), 4) if latencies else 0,
-            "min_latency": round(np.min(latencies), 4) if latencies else 0,
-            "max_latency": round(np.max(latencies), 4) if latencies else 0,
+            "avg_wait_time": round(wait.moments.mean, 4) if wait.count else 0,
+            "min_wait_time": round(wait.moments.min, 4) if wait.count else 0,
+            "max_wait_time": round(wait.moments.max, 4) if wait.count else 0,
+            "p50_wait_time": round(wait.quantile(0.5), 4),
+            "p90_wait_time": round(wait.quantile(0.9), 4),
+            "p99_wait_time": round(wait.quantile(0.99), 4),
+            "avg_latency": round(latency.moments.mean, 4) if latency.count else 0,
+            "min_latency": round(latency.moments.min, 4) if latency.count else 0,
+            "max_latency": round(latency.moments.max, 4) if latency.count else 0,
+            "p50_latency": round(latency.quantile(0.5), 4),
+            "p90_latency": round(latency.quantile(0.9), 4),
+            "p99_latency": round(latency.quantile(0.99), 4),
             "throughput": round(throughput, 4),
             "makespan": round(makespan, 4),
-            "num_nodes": len(self.cluster_nodes),
-            "min_cpu_capacity": min(cpu_caps) if cpu_caps else 0,
-            "max_cpu_capacity": max(cpu_caps) if cpu_caps else 0,
-            "min_mem_capacity": min(mem_caps) if mem_caps else 0,
-            "max_mem_capacity": max(mem_caps) if mem_caps else 0,
+            "num_nodes": self.num_nodes,
+            "min_cpu_capacity": self.cpu_capacity_range[0],
+            "max_cpu_capacity": self.cpu_capacity_range[1],
+            "min_mem_capacity": self.mem_capacity_range[0],
+            "max_mem_capacity": self.mem_capacity_range[1],
             "avg_cpu_std": round(lb_agg["cpu_std"], 4),
             "avg_mem_std": round(lb_agg["mem_std"], 4),
             "avg_cpu_util": round(lb_agg["avg_cpu"], 4),
@@ -134,6 +259,16 @@ class SimulationStatistics:
             "max_cpu_util": round(lb_agg["max_cpu"], 4),
             "min_mem_util": round(lb_agg["min_mem"], 4),
             "max_mem_util": round(lb_agg["max_mem"], 4),
+            "p50_cpu_util": round(lb_agg["p50_cpu"], 4),
+            "p90_cpu_util": round(lb_agg["p90_cpu"], 4),
+            "p99_cpu_util": round(lb_agg["p99_cpu"], 4),
+            "p50_mem_util": round(lb_agg["p50_mem"], 4),
+            "p90_mem_util": round(lb_agg["p90_mem"], 4),
+            "p99_mem_util": round(lb_agg["p99_mem"], 4),
+            "tw_avg_cpu_util": round(lb_agg["tw_avg_cpu"], 4),
+            "tw_avg_mem_util": round(lb_agg["tw_avg_mem"], 4),
+            "tw_cpu_std": round(lb_agg["tw_cpu_std"], 4),
+            "tw_mem_std": round(lb_agg["tw_mem_std"], 4),
             "total_tasks": self.num_tasks
         }
 
@@ -150,8 +285,11 @@ class SimulationStatistics:
         # Write main summary CSV
         log_statistics(reordered, path)
 
+        self.exporter.close()
+        self.exporter = NullDetailExporter()
+
         # Write detailed trace if enabled
-        if self.detailed:
+        if self.detailed and self.load_balancer.trace:
             detailed_path = path.replace(".csv", "_detailed.csv")
             with open(detailed_path, mode='w', newline='') as f:
                 fieldnames = ["timestamp", "num_nodes", "total_tasks", "total_pods"] + list(self.load_balancer.trace[list(self.load_balancer.trace.keys())[0]].keys())
@@ -160,9 +298,9 @@ class SimulationStatistics:
                 for t, row in self.load_balancer.trace.items():
                     writer.writerow({
                         "timestamp": t,
-                        "num_nodes": len(self.cluster_nodes),
+                        "num_nodes": self.num_nodes,
                         "total_tasks": self.num_tasks,
-                        "total_pods": len(self.pod_stats),
+                        "total_pods": self.total_pods,
                         **row
                     })
 
@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+# Constant-memory aggregators for simulation statistics. Both can be merged,
+# e.g. to combine the statistics of parallel runs.
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of a stream of values (Welford).
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningMoments"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        # Chan et al. parallel combination
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class LogHistogram:
+    """
+    Mergeable histogram with logarithmic buckets, so quantiles have a bounded
+    relative error (relative_accuracy) and memory only grows with the
+    logarithm of the value range. Values <= 0 are counted in a zero bucket.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy has to be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        indices, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other: "LogHistogram"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge histograms with different relative accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q):
+        """
+        Returns an estimate of the q-quantile (0 <= q <= 1), 0 if empty.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class StreamSummary:
+    """
+    Moments and quantile histogram of one metric.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        self.moments = RunningMoments()
+        self.histogram = LogHistogram(relative_accuracy)
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def add(self, value):
+        self.moments.add(value)
+        self.histogram.add(value)
+
+    def add_many(self, values):
+        self.moments.add_many(values)
+        self.histogram.add_many(values)
+
+    def merge(self, other: "StreamSummary"):
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+
+    def quantile(self, q):
+        return self.histogram.quantile(q)
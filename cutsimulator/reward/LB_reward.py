@@ -1,5 +1,3 @@
-import numpy as np
-
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.reward.reward import BaseReward
 from cutsimulator.utils.utility import safe_ratio
@@ -12,30 +10,14 @@ class LB_reward(BaseReward):
         rewards_list = []
 
         all_nodes = self.cluster.get_nodes()
-        cpu_usages = []
-        mem_usages = []
-        node_has_pods = []
-
-        for node in all_nodes:
-            cpu_usage = 1 - safe_ratio(node.cpu_available, node.cpu_capacity)
-            mem_usage = 1 - safe_ratio(node.mem_available, node.mem_capacity)
-            cpu_usages.append(cpu_usage)
-            mem_usages.append(mem_usage)
-
-            participated = int(cpu_usage > 0.01 or mem_usage > 0.01)
-            node_has_pods.append(participated)
-
-        std_cpu = np.std(cpu_usages)
-        std_mem = np.std(mem_usages)
-        cluster_load_score = max(0, 1 - (std_cpu + std_mem) / 2)
+        cpu_usages, mem_usages = self.cluster.get_utilization(empty_usage=1.0)
+        utilization = self.cluster.get_utilization_summary(empty_usage=1.0)
 
-        node_balance_scores = []
-        for cpu_usage, mem_usage in zip(cpu_usages, mem_usages):
-            balance = max(0, 1 - abs(cpu_usage - mem_usage))
-            node_balance_scores.append(balance)
+        cluster_load_score = max(0, 1 - (utilization["cpu_std"] + utilization["mem_std"]) / 2)
 
-        idle_penalty = safe_ratio(node_has_pods.count(0), len(all_nodes))
+        idle_penalty = safe_ratio(len(all_nodes) - utilization["busy_nodes"], len(all_nodes))
 
+        node_indices = {node.name: i for i, node in enumerate(all_nodes)}
         for node in valid_nodes:
             reward = 0
 
@@ -44,11 +26,9 @@ class LB_reward(BaseReward):
 
             reward += cluster_load_score
 
-            try:
-                node_index = all_nodes.index(node)
-                reward += node_balance_scores[node_index]
-            except ValueError:
-                pass
+            node_index = node_indices.get(node.name)
+            if node_index is not None:
+                reward += max(0, 1 - abs(cpu_usages[node_index] - mem_usages[node_index]))
 
             reward -= idle_penalty
 
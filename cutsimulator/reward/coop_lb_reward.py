@@ -1,5 +1,3 @@
-import numpy as np
-
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.reward.reward import BaseReward
 from cutsimulator.utils.utility import safe_ratio
@@ -10,30 +8,18 @@ class Coop_LB_reward(BaseReward): # Cooprative Load Balancing Reward
         self.cluster = cluster
 
     def compute(self, selected_node, valid_nodes):
-        all_nodes = self.cluster.get_nodes()
-        cpu_usages = []
-        mem_usages = []
-        node_has_pods = []
-
-        for node in all_nodes:
-            cpu_usage = 1 - safe_ratio(node.cpu_available, node.cpu_capacity)
-            mem_usage = 1 - safe_ratio(node.mem_available, node.mem_capacity)
-            cpu_usages.append(cpu_usage)
-            mem_usages.append(mem_usage)
-            participated = int(cpu_usage > 0.01 or mem_usage > 0.01)
-            node_has_pods.append(participated)
+        # Maintained incrementally by the cluster, so no per-node work here
+        utilization = self.cluster.get_utilization_summary(empty_usage=1.0)
+        num_nodes = utilization["nodes"]
 
         # Cluster-wide load uniformity (low stddev = better)
-        std_cpu = np.std(cpu_usages)
-        std_mem = np.std(mem_usages)
-        cluster_load_score = max(0, 1 - (std_cpu + std_mem) / 2)
+        cluster_load_score = max(0, 1 - (utilization["cpu_std"] + utilization["mem_std"]) / 2)
 
         # Node-local CPU/mem balance
-        node_balance_scores = [max(0, 1 - abs(c - m)) for c, m in zip(cpu_usages, mem_usages)]
-        avg_node_balance = np.mean(node_balance_scores)
+        avg_node_balance = utilization["balance_mean"]
 
         # Idle penalty
-        idle_penalty = safe_ratio(node_has_pods.count(0), len(all_nodes))
+        idle_penalty = safe_ratio(num_nodes - utilization["busy_nodes"], num_nodes)
 
         # Base reward formula (cooperative scalar)
         reward = cluster_load_score + avg_node_balance - idle_penalty
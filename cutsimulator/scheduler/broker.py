@@ -1,12 +1,14 @@
+import copy
 import random
 import torch
 import numpy as np
-import random as rnd
 
 import cutsimulator.state.obs_builder as ob
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.utils.utility import log_rewards
+from cutsimulator.scheduler.learner import create_learner
 from cutsimulator.scheduler.qmix_agent import QMIX
+from cutsimulator.scheduler.replay_buffer import ReplayBuffer
 from cutsimulator.workload.pod import Pod
 import logging
 logger = logging.getLogger(__name__)
@@ -16,7 +18,10 @@ class Broker:
     def __init__(self, cluster, reward_fn, num_agents, 
                  input_dim, output_dim=10, hidden_dim=64, lr=0.001, gamma=0.99,
                  update_target_every=200, double_q=True, epsilon=0.1, mixing_embed_dim=32, 
-                 hypernet_layers=2, hypernet_embed=64, buffer_size=1000, batch_size=32):
+                 hypernet_layers=2, hypernet_embed=64, buffer_size=1000, batch_size=32,
+                 reward_log_file="reward_trace.csv", buffer_dir=None, async_learner=False,
+                 updates_per_step=1.0, publish_every=1, learner=None, data_parallel_workers=1,
+                 threads_per_worker=0):
         self.cluster = cluster  # Broker uses Cluster object
         self.num_agents = num_agents
         self.output_dim = output_dim + 1 # Always 11 (10 bids + no-op)
@@ -29,27 +34,43 @@ class Broker:
                          double_q=double_q, mixing_embed_dim=mixing_embed_dim, 
                          hypernet_layers=hypernet_layers, hypernet_embed=hypernet_embed)
         self.epsilon=epsilon
-        self.replay_buffer = []
         self.buffer_size = buffer_size
         self.batch_size = batch_size
         self.reward_fn = reward_fn
+        self.reward_log_file = reward_log_file
+
+        # With an asynchronous learner the actions are selected by a copy of
+        # QMIX that receives the weights published by the learner thread. A
+        # given learner (e.g. of an actor process) trains elsewhere, so the
+        # local QMIX only acts and receives its weights.
+        if learner is None:
+            self.replay_buffer = ReplayBuffer(buffer_size, self.num_agents, self.input_dim, memmap_dir=buffer_dir,
+                                              shared=data_parallel_workers > 1)
+            learner = create_learner(self.qmix, self.replay_buffer, batch_size, async_learner,
+                                     updates_per_step, publish_every, data_parallel_workers, threads_per_worker)
+            self.policy = copy.deepcopy(self.qmix) if async_learner else self.qmix
+        else:
+            self.replay_buffer = None
+            self.policy = self.qmix
+        self.learner = learner
 
         
     def schedule_pod(self, pod):
         nodes = self.cluster.get_nodes()
 
-        # Remove nodes that don't have enough resources
-        valid_nodes = [node.has_available_resources(pod.cpu, pod.memory) for node in nodes]
-
-        if not np.any(valid_nodes):
+        if not self.cluster.has_fit(pod.cpu, pod.memory):
             logger.warning(f"[Broker] No valid nodes found for Pod {pod.name}")
             return None  # No node can schedule this pod
 
+        # Remove nodes that don't have enough resources
+        valid_nodes = self.cluster.get_fit_mask(pod.cpu, pod.memory)
+
         # Build states
-        obs = np.array([ob.build_node_obs(self.cluster, node, pod) for node in nodes])
+        obs = ob.build_obs_matrix(self.cluster, pod)
 
         # Select actions (bids)
-        actions = self.qmix.select_actions(obs, valid_nodes, epsilon=self.epsilon)
+        self.learner.sync_policy(self.policy.q_network)
+        actions = self.policy.select_actions(obs, valid_nodes, epsilon=self.epsilon)
 
         # Pick the node with highest bid
         max_bid = max(actions)
@@ -63,6 +84,42 @@ class Broker:
 
         return selected_node
 
+    def schedule_batch(self, pods):
+        nodes = self.cluster.get_nodes()
+        _, _, cpu_available, mem_available = self.cluster.get_resource_arrays()
+        cpu_available = cpu_available.copy()
+        mem_available = mem_available.copy()
+
+        # Build all states and select all actions (bids) with one inference pass
+        obs = ob.build_obs_batch(self.cluster, pods)
+        cpus = np.array([pod.cpu for pod in pods])[:, None]
+        mems = np.array([pod.memory for pod in pods])[:, None]
+        valid_nodes = (cpu_available >= cpus) & (mem_available >= mems)
+        self.learner.sync_policy(self.policy.q_network)
+        actions = self.policy.select_actions_batch(obs, valid_nodes, epsilon=self.epsilon)
+
+        selected_nodes = []
+        for i, pod in enumerate(pods):
+            # Only consider nodes that still fit after the earlier pods of the batch
+            feasible = np.flatnonzero((cpu_available >= pod.cpu) & (mem_available >= pod.memory))
+            if len(feasible) == 0:
+                logger.warning(f"[Broker] No valid nodes found for Pod {pod.name}")
+                selected_nodes.append(None)
+                continue
+
+            bids = actions[i][feasible]
+            max_bid = bids.max()
+            idx = random.choice(feasible[bids == max_bid].tolist())
+            cpu_available[idx] -= pod.cpu
+            mem_available[idx] -= pod.memory
+            selected_nodes.append(nodes[idx])
+
+            # Cache the info until the pod is actually scheduled
+            self.cache[pod.name] = (obs[i], actions[i].tolist())
+            logger.info(f"[Broker] Pod {pod.name} scheduled on {nodes[idx].name} with bid {max_bid}")
+
+        return selected_nodes
+
     def onPodDeployed(self, pod: Pod):
         if pod.name not in self.cache:
             logger.warning(f"[Broker] Cache not found for Pod {pod.name}")
@@ -70,28 +127,26 @@ class Broker:
             
         # Build next state
         nodes = self.cluster.get_nodes()
-        next_obs = np.array([ob.build_node_obs(self.cluster, node, pod) for node in nodes])
+        next_obs = ob.build_obs_matrix(self.cluster, pod)
 
         # Compute reward
         rewards = self.reward_fn.compute(pod.node, nodes)
-        log_rewards(pod.name, pod.node, nodes, rewards)
+        log_rewards(pod.name, pod.node, nodes, rewards, log_file=self.reward_log_file)
         
         # Save the experience for training
-        self.replay_buffer.append((self.cache[pod.name][0], self.cache[pod.name][1], np.mean(rewards), next_obs))
-        if len(self.replay_buffer) > self.buffer_size:
-            self.replay_buffer.pop(0)
+        self.learner.submit((self.cache[pod.name][0], self.cache[pod.name][1], np.mean(rewards), next_obs))
         del self.cache[pod.name]
 
-        # Train
-        if len(self.replay_buffer) >= self.batch_size:
-            batch = rnd.sample(self.replay_buffer, self.batch_size)
-            self.qmix.train(batch)
-            logger.info(f"[Broker] QMIX training updated.")
-
     def save_model(self, path="qmix_latest.pth"):
+        self.learner.flush()
         torch.save(self.qmix, path)
         logger.info(f"[Broker] Model saved to {path}")
     
+    def close(self):
+        self.learner.stop()
+        if self.replay_buffer is not None:
+            self.replay_buffer.close()
+
     def onClusterReset(self, cluster: Cluster):
         self.cluster = cluster
         self.reward_fn.onClusterReset(cluster)
@@ -1,14 +1,18 @@
+from typing import List
+
 import cutsimulator.state.obs_builder as ob
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.cluster.node import Node
 from cutsimulator.reward.reward_selector import RewardSelector
 from cutsimulator.scheduler.broker import Broker
+from cutsimulator.scheduler.learner import Learner
 from cutsimulator.scheduler.scheduler import Scheduler
+from cutsimulator.utils.utility import output_path
 from cutsimulator.workload.pod import Pod
 
 class DaroTrainScheduler(Scheduler):
 
-    def __init__(self, config, cluster: Cluster):
+    def __init__(self, config, cluster: Cluster, learner: Learner = None):
 
         self.num_agents = config["cluster_nodes"]
         self.epsilon = config["scheduler_daro_Epsilon"]
@@ -19,6 +23,12 @@ class DaroTrainScheduler(Scheduler):
         self.double_q = config["scheduler_daro_DoubleQ"]
         self.buffer_size = config["scheduler_daro_Replay_buffer_size"]
         self.batch_size = config["scheduler_daro_BatchSize"]
+        self.buffer_dir = config.get("scheduler_daro_Replay_buffer_dir")
+        self.async_learner = config.get("scheduler_daro_async_learner", False)
+        self.updates_per_step = config.get("scheduler_daro_updates_per_step", 1.0)
+        self.publish_every = config.get("scheduler_daro_publish_every", 1)
+        self.data_parallel_workers = config.get("scheduler_daro_data_parallel_workers", 1)
+        self.threads_per_worker = config.get("scheduler_daro_threads_per_worker", 0)
         self.mixing_embed_dim = config["scheduler_daro_Mixing_embed_dim"]
         self.hypernet_layers = config["scheduler_daro_Hypernet_layers"]
         self.hypernet_embed = config["scheduler_daro_Hypernet_embed"]
@@ -41,15 +51,30 @@ class DaroTrainScheduler(Scheduler):
             hypernet_layers=self.hypernet_layers,
             hypernet_embed=self.hypernet_embed,
             buffer_size=self.buffer_size,
-            batch_size=self.batch_size
+            batch_size=self.batch_size,
+            reward_log_file=output_path(config, "reward_trace.csv"),
+            buffer_dir=self.buffer_dir,
+            async_learner=self.async_learner,
+            updates_per_step=self.updates_per_step,
+            publish_every=self.publish_every,
+            learner=learner,
+            data_parallel_workers=self.data_parallel_workers,
+            threads_per_worker=self.threads_per_worker
         )
+        self.model_path = output_path(config, "qmix_latest.pth")
 
     def schedule(self, pod: Pod) -> Node:
         selected_node = self.broker.schedule_pod(pod)
         return selected_node
+
+    def schedule_batch(self, pods: List[Pod]) -> List[Node]:
+        return self.broker.schedule_batch(pods)
     
-    def save_model(self, path="qmix_latest.pth"):
-        self.broker.save_model(path)
+    def save_model(self, path=None):
+        self.broker.save_model(path or self.model_path)
+
+    def close(self):
+        self.broker.close()
 
     def onPodDeployed(self, pod: Pod):
         self.broker.onPodDeployed(pod)
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import torch as th
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from cutsimulator.scheduler.qmix_agent import QMIX
+from cutsimulator.scheduler.replay_buffer import ReplayBuffer
+import logging
+logger = logging.getLogger(__name__)
+
+# Commands broadcast by rank 0 in front of the sampled slots
+STOP, TRAIN = 0, 1
+
+
+def _qmix_config(qmix: QMIX):
+    return dict(num_agents=qmix.num_agents, input_dim=qmix.input_dim, output_dim=qmix.output_dim,
+                hidden_dim=qmix.hidden_dim, lr=qmix.lr, gamma=qmix.gamma,
+                update_target_every=qmix.update_target_every, double_q=qmix.double_q,
+                mixing_embed_dim=qmix.mixing_embed_dim, hypernet_layers=qmix.hypernet_layers,
+                hypernet_embed=qmix.hypernet_embed)
+
+
+def _broadcast_state(qmix: QMIX):
+    # Replicas start from the networks and training step of rank 0
+    for network in (qmix.q_network, qmix.target_q_network, qmix.mixing_network, qmix.target_mixing_network):
+        for tensor in network.state_dict().values():
+            dist.broadcast(tensor, src=0)
+    training_step = th.tensor([qmix.training_step], dtype=th.int64)
+    dist.broadcast(training_step, src=0)
+    qmix.training_step = int(training_step.item())
+
+
+def _train_shard(qmix: QMIX, replay_buffer: ReplayBuffer, slots, rank, workers):
+    shard = np.array_split(slots, workers)[rank]
+    qmix.train_batch(*replay_buffer.gather(shard), weight=len(shard) / len(slots))
+
+
+def _run_worker(rank, workers, init_method, qmix_config, replay_buffer, batch_size, threads):
+    if threads > 0:
+        th.set_num_threads(threads)
+    dist.init_process_group("gloo", init_method=init_method, rank=rank, world_size=workers)
+    try:
+        qmix = QMIX(**qmix_config)
+        qmix.process_group = dist.group.WORLD
+        _broadcast_state(qmix)
+
+        message = th.empty(batch_size + 1, dtype=th.int64)
+        while True:
+            dist.broadcast(message, src=0)
+            if message[0] == STOP:
+                return
+            _train_shard(qmix, replay_buffer, message[1:].numpy(), rank, workers)
+    finally:
+        dist.destroy_process_group()
+
+
+# Data-parallel QMIX training over `workers` processes with torch.distributed
+# (gloo backend), this process being rank 0. For every update rank 0 samples
+# the batch and broadcasts its replay buffer slots, each rank trains its
+# replica on its own shard of the slots, the gradients are summed with one
+# all-reduce and every replica takes the same optimizer step. The worker
+# processes read the transitions from the shared replay buffer. threads sets
+# the torch threads of every rank (0 keeps the torch default), e.g. the cores
+# of a socket divided by the workers per socket.
+class DataParallelTrainer:
+    def __init__(self, qmix: QMIX, replay_buffer: ReplayBuffer, batch_size, workers, threads=0):
+        if workers < 2:
+            raise ValueError("Data-parallel training needs at least 2 workers")
+        if batch_size < workers:
+            raise ValueError("Batch size has to be at least the number of data-parallel workers")
+        if threads < 0:
+            raise ValueError("Threads per worker can not be negative")
+        if not replay_buffer.shared:
+            raise ValueError("Data-parallel training needs a shared replay buffer")
+        if dist.is_initialized():
+            raise RuntimeError("A torch.distributed process group is already initialized")
+
+        self.qmix = qmix
+        self.replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.workers = workers
+        self._message = th.empty(batch_size + 1, dtype=th.int64)
+        self._store_dir = tempfile.mkdtemp(prefix="qmix-data-parallel-")
+        init_method = "file://" + os.path.join(self._store_dir, "store")
+
+        # The workers are stopped by stop() (Scheduler.close() of the owner);
+        # being daemons only keeps a crashed run from hanging at exit
+        context = mp.get_context("spawn")
+        self.processes = [context.Process(target=_run_worker, name=f"qmix-worker-{rank}", daemon=True,
+                                          args=(rank, workers, init_method, _qmix_config(qmix),
+                                                replay_buffer, batch_size, threads))
+                          for rank in range(1, workers)]
+        for process in self.processes:
+            process.start()
+
+        if threads > 0:
+            th.set_num_threads(threads)
+        dist.init_process_group("gloo", init_method=init_method, rank=0, world_size=workers)
+        qmix.process_group = dist.group.WORLD
+        _broadcast_state(qmix)
+        logger.info(f"[DataParallelTrainer] Training QMIX on {workers} workers")
+
+    def train(self):
+        """
+        Trains all replicas on one batch sampled from the replay buffer.
+        """
+        slots = self.replay_buffer.sample_slots(self.batch_size)
+        self._message[0] = TRAIN
+        self._message[1:] = th.from_numpy(slots)
+        dist.broadcast(self._message, src=0)
+        _train_shard(self.qmix, self.replay_buffer, slots, 0, self.workers)
+
+    def stop(self):
+        if self.qmix.process_group is None:
+            return
+        self._message[0] = STOP
+        dist.broadcast(self._message, src=0)
+        for process in self.processes:
+            process.join()
+        dist.destroy_process_group()
+        self.qmix.process_group = None
+        shutil.rmtree(self._store_dir, ignore_errors=True)
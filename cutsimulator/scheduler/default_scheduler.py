@@ -4,6 +4,8 @@ from cutsimulator.workload.pod import Pod
 
 # A scheduler that lets the default KWOK scheduler perform the scheduling decisions
 class DefaultScheduler(Scheduler):
+    delegates_binding = True
+
     def __init__(self):
         pass  # No setup needed for default scheduling
 
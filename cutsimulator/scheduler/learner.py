@@ -0,0 +1,184 @@
+import queue
+import threading
+
+import torch.nn as nn
+
+from cutsimulator.scheduler.data_parallel import DataParallelTrainer
+from cutsimulator.scheduler.qmix_agent import QMIX
+from cutsimulator.scheduler.replay_buffer import ReplayBuffer
+import logging
+logger = logging.getLogger(__name__)
+
+# Transitions that may wait for an asynchronous learner before submit() blocks
+LEARNER_QUEUE_SIZE = 10000
+
+
+# Trains QMIX on the transitions of the acting Broker. Every transition is
+# stored in the replay buffer and earns updates_per_step gradient steps (once
+# the buffer holds a batch), so e.g. 0.25 trains after every fourth
+# deployment. This learner trains synchronously inside submit(), or with a
+# DataParallelTrainer over several processes when one is given.
+class Learner:
+    def __init__(self, qmix: QMIX, replay_buffer: ReplayBuffer, batch_size, updates_per_step=1.0,
+                 trainer: DataParallelTrainer = None):
+        if updates_per_step <= 0:
+            raise ValueError("updates_per_step has to be positive")
+        self.qmix = qmix
+        self.replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.updates_per_step = updates_per_step
+        self.trainer = trainer
+        self.credit = 0.0
+        self.steps = 0
+        self.updates = 0
+
+    def submit(self, transition):
+        """
+        Hands over a (state, actions, reward, next state) transition.
+        """
+        self._learn(transition)
+
+    def sync_policy(self, network: nn.Module):
+        """
+        Loads the latest published weights into the acting Q-network.
+        """
+        pass  # The policy is the trained network
+
+    def flush(self):
+        """
+        Waits until all submitted transitions are learned and published.
+        """
+        pass
+
+    def stop(self):
+        if self.trainer is not None:
+            self.trainer.stop()
+
+    def _learn(self, transition):
+        self.replay_buffer.add(*transition)
+        self.steps += 1
+        if len(self.replay_buffer) < self.batch_size:
+            return
+
+        self.credit += self.updates_per_step
+        while self.credit >= 1:
+            self.credit -= 1
+            if self.trainer is None:
+                self.qmix.train_batch(*self.replay_buffer.sample(self.batch_size))
+            else:
+                self.trainer.train()
+            self.updates += 1
+            self._on_update()
+            logger.info(f"[Learner] QMIX training updated.")
+
+    def _on_update(self):
+        pass
+
+
+# Learner running in a background thread, decoupled from the simulation.
+# The Broker acts with its own copy of the Q-network, which picks up the
+# weights published every publish_every updates through sync_policy().
+# Transitions wait in a bounded queue, so a slow learner eventually slows
+# down the simulation instead of falling behind without limit.
+class AsyncLearner(Learner):
+    def __init__(self, qmix: QMIX, replay_buffer: ReplayBuffer, batch_size, updates_per_step=1.0, publish_every=1,
+                 trainer: DataParallelTrainer = None):
+        super().__init__(qmix, replay_buffer, batch_size, updates_per_step, trainer)
+        if publish_every <= 0:
+            raise ValueError("publish_every has to be positive")
+        self.publish_every = publish_every
+        self.queue = queue.Queue(maxsize=LEARNER_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.published = None   # state dict of the Q-network
+        self.version = 0
+        self._synced_version = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="qmix-learner", daemon=True)
+        self._thread.start()
+
+    def submit(self, transition):
+        self._raise_error()
+        self.queue.put(transition)
+
+    def sync_policy(self, network: nn.Module):
+        if self.version == self._synced_version:
+            return
+        with self.lock:
+            network.load_state_dict(self.published)
+            self._synced_version = self.version
+
+    def flush(self):
+        self.queue.join()
+        self._raise_error()
+        if self.updates % self.publish_every:
+            self._publish()
+
+    def stop(self):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+        super().stop()
+        self._raise_error()
+
+    def _run(self):
+        while True:
+            transition = self.queue.get()
+            try:
+                if transition is None:
+                    return
+                if self._error is None:
+                    self._learn(transition)
+            except Exception as e:
+                logger.error(f"[Learner] Training failed: {e}")
+                self._error = e
+            finally:
+                self.queue.task_done()
+
+    def _on_update(self):
+        if self.updates % self.publish_every == 0:
+            self._publish()
+
+    def _publish(self):
+        state = {name: tensor.detach().clone() for name, tensor in self.qmix.q_network.state_dict().items()}
+        with self.lock:
+            self.published = state
+            self.version += 1
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("QMIX learner thread failed") from self._error
+
+
+# Learner of an actor process in actor-learner training: forwards the
+# transitions to the central learner process through a queue and loads the
+# weights it broadcasts into a shared-memory Q-network (guarded by the lock of
+# the shared version counter).
+class RemoteLearner(Learner):
+    def __init__(self, transitions, shared_network: nn.Module, version):
+        self.transitions = transitions
+        self.shared_network = shared_network
+        self.version = version
+        self.steps = 0
+        self.trainer = None
+        self._synced_version = -1  # Load the initial weights before the first decision
+
+    def submit(self, transition):
+        self.transitions.put(transition)
+        self.steps += 1
+
+    def sync_policy(self, network: nn.Module):
+        if self.version.value == self._synced_version:
+            return
+        with self.version.get_lock():
+            network.load_state_dict(self.shared_network.state_dict())
+            self._synced_version = self.version.value
+
+
+def create_learner(qmix: QMIX, replay_buffer: ReplayBuffer, batch_size, async_learner=False,
+                   updates_per_step=1.0, publish_every=1, data_parallel_workers=1, threads_per_worker=0) -> Learner:
+    trainer = None
+    if data_parallel_workers > 1:
+        trainer = DataParallelTrainer(qmix, replay_buffer, batch_size, data_parallel_workers, threads_per_worker)
+    if async_learner:
+        return AsyncLearner(qmix, replay_buffer, batch_size, updates_per_step, publish_every, trainer)
+    return Learner(qmix, replay_buffer, batch_size, updates_per_step, trainer)
@@ -1,4 +1,5 @@
 import torch as th
+import torch.distributed as dist
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
@@ -59,6 +60,7 @@ class QMIX:
         self.input_dim = input_dim
         self.output_dim = output_dim
         self.hidden_dim = hidden_dim
+        self.lr = lr
         self.gamma = gamma
         self.update_target_every = update_target_every
         self.double_q = double_q
@@ -74,28 +76,61 @@ class QMIX:
         self.optimizer = optim.RMSprop(self.get_parameters() + list(self.mixing_network.parameters()), lr=lr)
         self.training_step = 0
         self.criterion = nn.MSELoss()
+        self._input_buffer = None  # float32 observations of select_actions
+        self.process_group = None  # all-reduces the gradients in data-parallel training
+
+    def __getstate__(self):
+        # The process group of data-parallel training is not saved with the model
+        return dict(self.__dict__, process_group=None)
 
     def get_parameters(self):
         """Returns parameters for agent network"""
         return list(self.q_network.parameters())
 
-    def select_actions(self, states, valid_agents, epsilon=0.1):
-        """Epsilon-greedy action selection for each agent, dynamically masking invalid agents."""
-        actions = []
-        for i in range(len(states)):
-            state_tensor = th.tensor(states[i], dtype=th.float32).unsqueeze(0)
-            if valid_agents[i]:
-                if np.random.rand() < epsilon:
-                    action = np.random.randint(1, 10)  # Random bid
-                else:
-                    with th.no_grad():
-                        q_values = self.q_network(state_tensor)
-                        action = th.argmax(q_values[:, 1:]).item()
-            else:
-                action = 0
-            actions.append(action)
-        return actions
+    def _input_tensor(self, states):
+        """
+        Returns the observations as a float32 tensor. Contiguous float32 arrays
+        are shared without a copy, anything else is converted into an input
+        buffer that is reused across calls.
+        """
+        if isinstance(states, np.ndarray) and states.dtype == np.float32 and states.flags.c_contiguous:
+            return th.from_numpy(states)
+
+        states = np.asarray(states)
+        if self._input_buffer is None or self._input_buffer.size < states.size:
+            self._input_buffer = np.empty(max(states.size, 2 * (0 if self._input_buffer is None else self._input_buffer.size)), dtype=np.float32)
+        buffer = self._input_buffer[:states.size].reshape(states.shape)
+        np.copyto(buffer, states, casting="unsafe")
+        return th.from_numpy(buffer)
 
+    def select_actions(self, states, valid_agents, epsilon=0.1):
+        """
+        Epsilon-greedy action selection for each agent, dynamically masking invalid agents.
+        Uses a single forward pass over the observation matrix [agents, input_dim].
+        """
+        valid_agents = np.asarray(valid_agents, dtype=bool)
+        with th.inference_mode():
+            q_values = self.q_network(self._input_tensor(states))
+            actions = th.argmax(q_values[:, 1:], dim=-1).numpy()
+
+        explore = np.random.rand(len(valid_agents)) < epsilon
+        actions = np.where(explore, np.random.randint(1, 10, size=len(valid_agents)), actions)
+        return np.where(valid_agents, actions, 0).tolist()
+
+    def select_actions_batch(self, states, valid_agents, epsilon=0.1):
+        """
+        Epsilon-greedy action selection for several pods at once.
+        states has shape [pods, agents, input_dim] and valid_agents [pods, agents].
+        Uses a single forward pass and returns an int array of shape [pods, agents].
+        """
+        valid_agents = np.asarray(valid_agents, dtype=bool)
+        with th.inference_mode():
+            q_values = self.q_network(self._input_tensor(states))
+            actions = th.argmax(q_values[..., 1:], dim=-1).numpy()
+
+        explore = np.random.rand(*valid_agents.shape) < epsilon
+        actions = np.where(explore, np.random.randint(1, 10, size=valid_agents.shape), actions)
+        return np.where(valid_agents, actions, 0)
 
     def train(self, experiences):
         """Train QMIX with batch experience while handling dynamic agent count."""
@@ -119,11 +154,17 @@ class QMIX:
         actions = pad(actions, self.num_agents)
 
         # Convert to tensors
-        states = th.tensor(states, dtype=th.float32)
-        next_states = th.tensor(next_states, dtype=th.float32)
-        rewards = th.tensor(rewards, dtype=th.float32)
-        actions = th.tensor(actions, dtype=th.int64)
-
+        self.train_batch(th.tensor(states, dtype=th.float32), th.tensor(actions, dtype=th.int64),
+                         th.tensor(rewards, dtype=th.float32), th.tensor(next_states, dtype=th.float32))
+
+    def train_batch(self, states, actions, rewards, next_states, weight=1.0):
+        """
+        Trains QMIX on a batch of padded transitions: states and next_states
+        [batch, num_agents, input_dim], actions [batch, num_agents] and rewards [batch].
+        In data-parallel training the batch is a shard of the global batch, its
+        loss is scaled by weight (shard / global batch size) and the gradients
+        are summed over the process group before the optimizer step.
+        """
         q_values = self.q_network(states).gather(2, actions.unsqueeze(2)).squeeze(2)
         joint_q_values = self.mixing_network(q_values, states.reshape(-1, self.input_dim * self.num_agents))
 
@@ -134,12 +175,17 @@ class QMIX:
         else:
             next_q_values = self.target_q_network(next_states).max(2)
         joint_next_q_values = self.mixing_network(next_q_values, next_states.reshape(-1, self.input_dim * self.num_agents))
-        targets = rewards + self.gamma * joint_next_q_values
+        # [batch, 1] like the joint Q-values, so the loss is a mean over the transitions
+        targets = rewards.view(-1, 1) + self.gamma * joint_next_q_values
 
         loss = self.criterion(joint_q_values, targets)
+        if weight != 1.0:
+            loss = loss * weight
 
         self.optimizer.zero_grad()
         loss.backward()
+        if self.process_group is not None:
+            self._all_reduce_gradients()
         self.optimizer.step()
 
         self.training_step += 1
@@ -147,3 +193,14 @@ class QMIX:
         if self.training_step % self.update_target_every == 0:
             self.target_q_network.load_state_dict(self.q_network.state_dict())
             self.target_mixing_network.load_state_dict(self.mixing_network.state_dict())
+
+    def _all_reduce_gradients(self):
+        """Sums the gradients of all replicas with one all-reduce over a flat buffer."""
+        params = [p for group in self.optimizer.param_groups for p in group["params"]]
+        grads = [th.zeros_like(p) if p.grad is None else p.grad for p in params]
+        flat = th.cat([grad.reshape(-1) for grad in grads])
+        dist.all_reduce(flat, group=self.process_group)
+        offset = 0
+        for param, grad in zip(params, grads):
+            param.grad = flat[offset:offset + grad.numel()].view_as(grad)
+            offset += grad.numel()
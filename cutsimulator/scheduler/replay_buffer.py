@@ -0,0 +1,145 @@
+import os
+import random as rnd
+import shutil
+import tempfile
+
+import numpy as np
+import torch as th
+
+
+# Arrays of a transition
+BUFFER_ARRAYS = ("states", "actions", "rewards", "next_states")
+
+# Torch dtypes of the shared buffer arrays
+SHARED_DTYPES = {np.float32: th.float32, np.int64: th.int64}
+
+
+# Fixed-capacity ring buffer of QMIX transitions (state, actions, mean reward,
+# next state). The transitions are stored padded to max_agents in
+# preallocated arrays, optionally memory-mapped from files in a new
+# subdirectory of memmap_dir for buffers that do not fit in memory. Once full,
+# every new transition replaces the oldest one. close() removes the
+# subdirectory.
+#
+# A shared buffer (shared memory or memory-mapped) can be passed to other
+# processes, which then read the transitions added by this one without copies.
+class ReplayBuffer:
+    def __init__(self, capacity, max_agents, obs_dim, memmap_dir=None, shared=False):
+        if capacity <= 0:
+            raise ValueError("Replay buffer capacity has to be positive")
+        self.capacity = capacity
+        self.max_agents = max_agents
+        self.obs_dim = obs_dim
+        self.memmap_dir = None
+        self.shared = shared or memmap_dir is not None
+        self._tensors = {}  # shared memory tensors behind the arrays
+        self._owner = True  # False in copies passed to other processes
+        if memmap_dir is not None:
+            # Own subdirectory, so buffers sharing memmap_dir do not overwrite each other
+            os.makedirs(memmap_dir, exist_ok=True)
+            self.memmap_dir = tempfile.mkdtemp(prefix="replay-", dir=memmap_dir)
+
+        self.states = self._allocate("states", (capacity, max_agents, obs_dim), np.float32)
+        self.actions = self._allocate("actions", (capacity, max_agents), np.int64)
+        self.rewards = self._allocate("rewards", (capacity,), np.float32)
+        self.next_states = self._allocate("next_states", (capacity, max_agents, obs_dim), np.float32)
+        self.size = 0
+        self.next = 0  # slot of the next transition
+
+        self._batch_size = None
+        self._batch = None
+
+    def _allocate(self, name, shape, dtype):
+        if self.memmap_dir is not None:
+            return np.lib.format.open_memmap(self._memmap_path(name), mode="w+", dtype=dtype, shape=shape)
+        if self.shared:
+            self._tensors[name] = th.zeros(shape, dtype=SHARED_DTYPES[dtype]).share_memory_()
+            return self._tensors[name].numpy()
+        return np.zeros(shape, dtype=dtype)
+
+    def _memmap_path(self, name):
+        return os.path.join(self.memmap_dir, f"{name}.npy")
+
+    def __getstate__(self):
+        state = dict(self.__dict__, _batch_size=None, _batch=None, _owner=False)
+        if self.shared:
+            # Other processes attach to the same files or shared memory
+            for name in BUFFER_ARRAYS:
+                state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in BUFFER_ARRAYS:
+            if self.memmap_dir is not None:
+                setattr(self, name, np.load(self._memmap_path(name), mmap_mode="r+"))
+            elif self.shared:
+                setattr(self, name, self._tensors[name].numpy())
+
+    def close(self):
+        """
+        Releases the arrays. The buffer that created the memmap subdirectory
+        also removes it; copies in other processes only detach from it.
+        """
+        for name in BUFFER_ARRAYS:
+            setattr(self, name, None)
+        self._tensors = {}
+        self._batch_size = None
+        self._batch = None
+        self.size = 0
+        if self._owner and self.memmap_dir is not None:
+            shutil.rmtree(self.memmap_dir, ignore_errors=True)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, actions, reward, next_state):
+        """
+        Stores a transition of up to max_agents agents, zero padded.
+        """
+        agents, next_agents = len(state), len(next_state)
+        if max(agents, next_agents, len(actions)) > self.max_agents:
+            raise ValueError(f"Transition has more than {self.max_agents} agents")
+
+        slot = self.next
+        self.states[slot, :agents] = state
+        self.states[slot, agents:] = 0
+        self.actions[slot, :len(actions)] = actions
+        self.actions[slot, len(actions):] = 0
+        self.rewards[slot] = reward
+        self.next_states[slot, :next_agents] = next_state
+        self.next_states[slot, next_agents:] = 0
+
+        self.next = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Samples batch_size distinct transitions uniformly and returns them as
+        (states, actions, rewards, next_states) tensors. The tensors share the
+        memory of batch arrays that are overwritten by the next sample.
+        """
+        return self.gather(self.sample_slots(batch_size))
+
+    def sample_slots(self, batch_size) -> np.ndarray:
+        """
+        Returns the slots of batch_size distinct transitions sampled uniformly.
+        """
+        # Positions from the oldest transition, drawn like random.sample over a list
+        positions = np.array(rnd.sample(range(self.size), batch_size), dtype=np.int64)
+        return (positions + (self.next - self.size)) % self.capacity
+
+    def gather(self, slots):
+        """
+        Returns the transitions in the given slots like sample().
+        """
+        batch_size = len(slots)
+        if self._batch_size != batch_size:
+            self._batch_size = batch_size
+            self._batch = (np.empty((batch_size, self.max_agents, self.obs_dim), dtype=np.float32),
+                           np.empty((batch_size, self.max_agents), dtype=np.int64),
+                           np.empty(batch_size, dtype=np.float32),
+                           np.empty((batch_size, self.max_agents, self.obs_dim), dtype=np.float32))
+        for source, out in zip((self.states, self.actions, self.rewards, self.next_states), self._batch):
+            np.take(source, slots, axis=0, out=out)
+        return tuple(th.from_numpy(out) for out in self._batch)
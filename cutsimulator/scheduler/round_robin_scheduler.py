@@ -1,3 +1,7 @@
+from typing import List
+
+import numpy as np
+
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.cluster.node import Node
 from cutsimulator.scheduler.scheduler import Scheduler
@@ -12,15 +16,41 @@ class RoundRobinScheduler(Scheduler):
     def schedule(self, pod: Pod) -> Node:
         nodes = self.cluster.get_nodes()
         num_nodes = len(nodes)
+        if num_nodes == 0:
+            return None
+
+        # Find the next node (after the last selected one) with available resources
+        fit_indices = np.flatnonzero(self.cluster.get_fit_mask(pod.cpu, pod.memory))
+        if len(fit_indices) == 0:
+            # No node has available resources
+            return None
+
+        pos = np.searchsorted(fit_indices, (self.last_node_idx + 1) % num_nodes)
+        self.last_node_idx = int(fit_indices[pos % len(fit_indices)])
+        return nodes[self.last_node_idx]
+
+    def schedule_batch(self, pods: List[Pod]) -> List[Node]:
+        nodes = self.cluster.get_nodes()
+        num_nodes = len(nodes)
+        _, _, cpu_available, mem_available = self.cluster.get_resource_arrays()
+        cpu_available = cpu_available.copy()
+        mem_available = mem_available.copy()
+
+        selected_nodes = []
+        for pod in pods:
+            fit_indices = np.flatnonzero((cpu_available >= pod.cpu) & (mem_available >= pod.memory))
+            if len(fit_indices) == 0:
+                selected_nodes.append(None)
+                continue
+
+            # Reserve the resources of the selected node for the rest of the batch
+            pos = np.searchsorted(fit_indices, (self.last_node_idx + 1) % num_nodes)
+            self.last_node_idx = int(fit_indices[pos % len(fit_indices)])
+            cpu_available[self.last_node_idx] -= pod.cpu
+            mem_available[self.last_node_idx] -= pod.memory
+            selected_nodes.append(nodes[self.last_node_idx])
 
-        for i in range(num_nodes):
-            # Find the next node with available resources
-            self.last_node_idx = (self.last_node_idx + 1) % num_nodes
-            if nodes[self.last_node_idx].has_available_resources(pod.cpu, pod.memory):
-                return nodes[self.last_node_idx]
-        
-        # If we reach this point, then no node has available resources
-        return None
+        return selected_nodes
 
     def onPodDeployed(self, pod: Pod):
         pass
@@ -1,15 +1,27 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.cluster.node import Node
 from cutsimulator.workload.pod import Pod
 
 class Scheduler(ABC):
-    
+    # True if the pods this scheduler leaves without a node are bound by the
+    # cluster's own scheduler (e.g. the kube-scheduler of a KWOK cluster)
+    delegates_binding = False
+
     @abstractmethod
     def schedule(self, pod: Pod) -> Node:
         pass
 
+    def schedule_batch(self, pods: List[Pod]) -> List[Node]:
+        """
+        Selects a node for each of the pods arriving at the same time (None if
+        no node is selected). The pods are deployed after the whole batch is
+        scheduled, so schedulers should account for their own earlier choices.
+        """
+        return [self.schedule(pod) for pod in pods]
+
     @abstractmethod
     def onPodDeployed(self, pod: Pod):
         pass
@@ -25,3 +37,10 @@ class Scheduler(ABC):
     @abstractmethod
     def onClusterReset(self, cluster: Cluster):
         pass
+
+    def close(self):
+        """
+        Releases the resources of the scheduler (e.g. learner threads or
+        processes) once its owner runs no more simulations with it.
+        """
+        pass
@@ -2,6 +2,7 @@ from cutsimulator.scheduler.scheduler import Scheduler
 from cutsimulator.scheduler.daro_train_scheduler import DaroTrainScheduler
 from cutsimulator.scheduler.default_scheduler import DefaultScheduler
 from cutsimulator.scheduler.round_robin_scheduler import RoundRobinScheduler
+from cutsimulator.scheduler.scoring_scheduler import SCORING_SCHEDULERS, ScoringScheduler
 
 class SchedulerSelector:
     def __init__(self, config):
@@ -18,6 +19,8 @@ class SchedulerSelector:
             scheduler = RoundRobinScheduler(self.config, cluster)
         elif scheduler_type == "DEFAULT":
             scheduler = DefaultScheduler()
+        elif scheduler_type in SCORING_SCHEDULERS:
+            scheduler = ScoringScheduler(self.config, cluster, scheduler_type)
         else:
             raise ValueError(f"Unsupported scheduler type: {scheduler_type}")
 
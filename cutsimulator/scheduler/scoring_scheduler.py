@@ -0,0 +1,150 @@
+from typing import List, Optional
+
+import numpy as np
+
+from cutsimulator.cluster.cluster import Cluster
+from cutsimulator.cluster.node import Node
+from cutsimulator.scheduler.scheduler import Scheduler
+from cutsimulator.workload.pod import Pod
+
+
+# Node scores (0-1, higher is better) from the cpu and mem fraction of each
+# node that would be requested after placing the pod, as in the
+# kube-scheduler NodeResourcesFit / NodeResourcesBalancedAllocation plugins
+def least_allocated(cpu_fraction: np.ndarray, mem_fraction: np.ndarray) -> np.ndarray:
+    return 1 - (cpu_fraction + mem_fraction) / 2
+
+
+def most_allocated(cpu_fraction: np.ndarray, mem_fraction: np.ndarray) -> np.ndarray:
+    return (cpu_fraction + mem_fraction) / 2
+
+
+def balanced_allocation(cpu_fraction: np.ndarray, mem_fraction: np.ndarray) -> np.ndarray:
+    # 1 - standard deviation of the two fractions
+    return 1 - np.abs(cpu_fraction - mem_fraction) / 2
+
+
+SCORING_FUNCTIONS = {
+    "LEASTALLOCATED": least_allocated,
+    "MOSTALLOCATED": most_allocated,
+    "BALANCEDALLOCATION": balanced_allocation,
+}
+
+SCORING_SCHEDULERS = list(SCORING_FUNCTIONS) + ["WEIGHTED"]
+
+# Weights of the WEIGHTED scheduler (the default kube-scheduler profile)
+DEFAULT_SCORING_WEIGHTS = {"LEASTALLOCATED": 1, "BALANCEDALLOCATION": 1}
+
+# Same limits as percentageOfNodesToScore in the kube-scheduler
+MIN_FEASIBLE_NODES_TO_FIND = 100
+MIN_FEASIBLE_NODES_PERCENTAGE_TO_FIND = 5
+
+
+# Schedules pods on the feasible node with the highest score. Filtering and
+# scoring are computed for all nodes at once over the cluster resource arrays.
+# With scheduler_percentage_of_nodes_to_score below 100 only the first feasible
+# nodes after a rotating start index are scored, as in the kube-scheduler
+# (0 selects the adaptive kube-scheduler percentage). Ties go to the first
+# candidate from the start index.
+class ScoringScheduler(Scheduler):
+    def __init__(self, config, cluster: Cluster, scheduler_type: str):
+        if scheduler_type not in SCORING_SCHEDULERS:
+            raise ValueError(f"Unsupported scoring scheduler type: {scheduler_type}")
+        if scheduler_type == "WEIGHTED":
+            weights = config.get('scheduler_scoring_weights', DEFAULT_SCORING_WEIGHTS)
+        else:
+            weights = {scheduler_type: 1}
+        for name, weight in weights.items():
+            if name not in SCORING_FUNCTIONS:
+                raise ValueError(f"Unsupported scoring function: {name}")
+            if weight < 0:
+                raise ValueError(f"Scoring weight of {name} has to be non-negative")
+        if sum(weights.values()) <= 0:
+            raise ValueError("At least one scoring weight has to be positive")
+
+        percentage = config.get('scheduler_percentage_of_nodes_to_score', 100)
+        if not 0 <= percentage <= 100:
+            raise ValueError("scheduler_percentage_of_nodes_to_score has to be between 0 and 100")
+
+        self.cluster = cluster
+        self.scheduler_type = scheduler_type
+        self.weights = {name: weight for name, weight in weights.items() if weight > 0}
+        self.total_weight = sum(self.weights.values())
+        self.percentage = percentage
+        self.next_start_index = 0
+
+    def num_nodes_to_score(self, num_nodes) -> int:
+        """
+        Returns how many feasible nodes are scored in a cluster of num_nodes.
+        """
+        if num_nodes < MIN_FEASIBLE_NODES_TO_FIND or self.percentage >= 100:
+            return num_nodes
+        percentage = self.percentage
+        if percentage == 0:
+            percentage = max(50 - num_nodes // 125, MIN_FEASIBLE_NODES_PERCENTAGE_TO_FIND)
+        return max(num_nodes * percentage // 100, MIN_FEASIBLE_NODES_TO_FIND)
+
+    def score(self, cpu_fraction: np.ndarray, mem_fraction: np.ndarray) -> np.ndarray:
+        if len(self.weights) == 1:
+            return SCORING_FUNCTIONS[next(iter(self.weights))](cpu_fraction, mem_fraction)
+        scores = np.zeros(len(cpu_fraction), dtype=np.float64)
+        for name, weight in self.weights.items():
+            scores += weight * SCORING_FUNCTIONS[name](cpu_fraction, mem_fraction)
+        return scores / self.total_weight
+
+    def _select(self, pod: Pod, cpu_capacity, mem_capacity, cpu_available, mem_available) -> Optional[int]:
+        num_nodes = len(cpu_capacity)
+        feasible = np.flatnonzero((cpu_available >= pod.cpu) & (mem_available >= pod.memory))
+        if len(feasible) == 0:
+            return None
+
+        # Candidates in node order from the start index
+        pos = int(np.searchsorted(feasible, self.next_start_index))
+        candidates = np.concatenate((feasible[pos:], feasible[:pos]))
+        limit = self.num_nodes_to_score(num_nodes)
+        if limit < len(candidates):
+            candidates = candidates[:limit]
+            self.next_start_index = (int(candidates[-1]) + 1) % num_nodes
+
+        cpu_capacity = np.maximum(cpu_capacity[candidates], 1)
+        mem_capacity = np.maximum(mem_capacity[candidates], 1)
+        cpu_fraction = np.minimum((cpu_capacity - cpu_available[candidates] + pod.cpu) / cpu_capacity, 1)
+        mem_fraction = np.minimum((mem_capacity - mem_available[candidates] + pod.memory) / mem_capacity, 1)
+        return int(candidates[np.argmax(self.score(cpu_fraction, mem_fraction))])
+
+    def schedule(self, pod: Pod) -> Node:
+        row = self._select(pod, *self.cluster.get_resource_arrays())
+        return None if row is None else self.cluster.get_nodes()[row]
+
+    def schedule_batch(self, pods: List[Pod]) -> List[Node]:
+        nodes = self.cluster.get_nodes()
+        cpu_capacity, mem_capacity, cpu_available, mem_available = self.cluster.get_resource_arrays()
+        cpu_available = cpu_available.copy()
+        mem_available = mem_available.copy()
+
+        selected_nodes = []
+        for pod in pods:
+            row = self._select(pod, cpu_capacity, mem_capacity, cpu_available, mem_available)
+            if row is None:
+                selected_nodes.append(None)
+                continue
+
+            # Reserve the resources of the selected node for the rest of the batch
+            cpu_available[row] -= pod.cpu
+            mem_available[row] -= pod.memory
+            selected_nodes.append(nodes[row])
+
+        return selected_nodes
+
+    def onPodDeployed(self, pod: Pod):
+        pass
+
+    def onPodTerminated(self, pod: Pod):
+        pass
+
+    def onSimulationEnded(self):
+        pass
+
+    def onClusterReset(self, cluster: Cluster):
+        self.cluster = cluster
+        self.next_start_index = 0
@@ -0,0 +1,167 @@
+import copy
+import os
+import queue
+import random
+
+import numpy as np
+
+from cutsimulator.utils.utility import log_rewards, output_path, setup_logger
+import logging
+logger = logging.getLogger(__name__)
+
+# Actor-learner training of the DAROTRAIN scheduler. training_actors processes
+# each run their own share of the training episodes (Simulator + cluster) with
+# a local copy of the Q-network and stream their transitions to the central
+# learner in the main process. The learner trains QMIX and broadcasts the
+# Q-network weights through shared memory every scheduler_daro_publish_every
+# updates. Each actor writes its outputs to <simulation_output_dir>/actor-NN.
+
+
+def create_episode(config, episode, base_seed=None):
+    """
+    Creates the randomized cluster and tasks of a training episode, updating
+    cluster_nodes, workload_tasks and (with a base seed) simulation_seed of the config.
+    """
+    from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
+    from cutsimulator.workload.workload_synthesizer import WorkloadSynthesizer
+
+    num_nodes = random.randint(config["training_nodes_per_episode_min"], config["training_nodes_per_episode_max"])
+    num_tasks = random.randint(config["training_tasks_per_episode_min"], config["training_tasks_per_episode_max"])
+    if base_seed is not None:
+        # Reproducible, but different scenario per episode
+        config["simulation_seed"] = base_seed + episode
+
+    config["cluster_nodes"] = num_nodes
+    cluster = ClusterSynthesizer(config).create_cluster()
+
+    config["workload_tasks"] = num_tasks
+    tasks = WorkloadSynthesizer(config).create_tasks()
+    return cluster, tasks
+
+
+def run_actor(actor_id, config, episodes, base_seed, transitions, shared_network, version):
+    """
+    Runs the given training episodes in an actor process, sending every
+    transition to the learner and a final None.
+    """
+    import torch
+    from cutsimulator.scheduler.daro_train_scheduler import DaroTrainScheduler
+    from cutsimulator.scheduler.learner import RemoteLearner
+    from cutsimulator.simulator.simulator import Simulator
+
+    try:
+        os.makedirs(config['simulation_output_dir'], exist_ok=True)
+        setup_logger(level=config.get('training_actor_log_level', 'WARNING'),
+                     log_file=os.path.join(config['simulation_output_dir'], "training.log"))
+        torch.set_num_threads(config.get('training_threads_per_actor', 1))
+        if base_seed is not None:
+            seed = base_seed + actor_id
+            random.seed(seed)
+            np.random.seed(seed)
+            torch.manual_seed(seed)
+
+        learner = RemoteLearner(transitions, shared_network, version)
+        simulator = Simulator(config)
+        scheduler = None
+        for episode in episodes:
+            logger.info(f"=== Actor {actor_id}: starting episode {episode + 1} ===")
+            cluster, tasks = create_episode(config, episode, base_seed)
+            if scheduler is None:
+                scheduler_config = dict(config, cluster_nodes=config["training_nodes_per_episode_max"])
+                scheduler = DaroTrainScheduler(scheduler_config, cluster, learner=learner)
+            else:
+                scheduler.onClusterReset(cluster)
+
+            simulator.run_simulation(cluster, scheduler, tasks)
+            log_rewards(None, None, None, None, mark_end=True, log_file=output_path(config, "reward_trace.csv"))
+    finally:
+        if scheduler is not None:
+            scheduler.close()
+        transitions.put(None)
+
+
+def run_actor_learner(config):
+    """
+    Trains DAROTRAIN with training_actors actor processes and one learner
+    (this process), and saves the trained model to the output directory.
+    """
+    import torch.multiprocessing as mp
+    from cutsimulator.cluster.python_cluster import PythonCluster
+    from cutsimulator.scheduler.daro_train_scheduler import DaroTrainScheduler
+    from cutsimulator.scheduler.learner import LEARNER_QUEUE_SIZE
+
+    num_actors = config["training_actors"]
+    episodes = config["training_episodes"]
+    publish_every = config.get("scheduler_daro_publish_every", 1)
+    if num_actors < 1:
+        raise ValueError("training_actors has to be at least 1")
+    if publish_every <= 0:
+        raise ValueError("publish_every has to be positive")
+
+    # The central learner trains with a synchronous Learner on a QMIX for the
+    # largest episode cluster. It is never asynchronous: publish() copies the
+    # weights from this thread, so no optimizer step may run meanwhile.
+    learner_config = dict(config, cluster_nodes=config["training_nodes_per_episode_max"],
+                          scheduler_daro_async_learner=False)
+    trainer = DaroTrainScheduler(learner_config, PythonCluster())
+    learner = trainer.broker.learner
+    qmix = trainer.broker.qmix
+
+    try:
+        context = mp.get_context("spawn")
+        shared_network = copy.deepcopy(qmix.q_network).share_memory()
+        version = context.Value("l", 0)
+        transitions = context.Queue(maxsize=LEARNER_QUEUE_SIZE)
+
+        def publish():
+            with version.get_lock():
+                shared_network.load_state_dict(qmix.q_network.state_dict())
+                version.value += 1
+
+        actors = []
+        base_output_dir = config.get('simulation_output_dir', '.')
+        for actor_id in range(num_actors):
+            actor_config = copy.deepcopy(config)
+            actor_config['simulation_output_dir'] = os.path.join(base_output_dir, f"actor-{actor_id:02d}")
+            actor_episodes = list(range(actor_id, episodes, num_actors))
+            process = context.Process(target=run_actor, name=f"daro-actor-{actor_id}",
+                                      args=(actor_id, actor_config, actor_episodes, config.get('simulation_seed'),
+                                            transitions, shared_network, version))
+            process.start()
+            actors.append(process)
+        logger.info(f"Started {num_actors} actors for {episodes} episodes")
+
+        try:
+            running = num_actors
+            published_updates = 0
+            while running:
+                try:
+                    transition = transitions.get(timeout=1)
+                except queue.Empty:
+                    failed = [p.name for p in actors if p.exitcode not in (None, 0)]
+                    if failed:
+                        raise RuntimeError(f"Actor processes failed: {failed}")
+                    continue
+
+                if transition is None:
+                    running -= 1
+                    continue
+                learner.submit(transition)
+                if learner.updates - published_updates >= publish_every:
+                    publish()
+                    published_updates = learner.updates
+        finally:
+            for process in actors:
+                if process.exitcode is None and running:
+                    process.terminate()
+                process.join()
+
+        failed = [p.name for p in actors if p.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Actor processes failed: {failed}")
+
+        publish()
+        trainer.save_model(output_path(config, "qmix_latest.pth"))
+    finally:
+        trainer.close()
+    logger.info(f"Learner finished: {learner.steps} transitions, {learner.updates} updates")
@@ -0,0 +1,165 @@
+import csv
+import time
+from abc import ABC, abstractmethod
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Phases of the simulation loop timed by the profiler
+PROFILE_PHASES = [
+    "queue",               # popping pods from / waking pods in the scheduling queue
+    "schedule",            # scheduler decision (schedule / schedule_batch)
+    "deploy",              # cluster.deploy_pod(s)
+    "terminate",           # cluster.terminate_pod
+    "scheduler_feedback",  # onPodDeployed / onPodTerminated (rewards, reward logging, training)
+    "utilization",         # record_cluster_utilization
+    "task_update",         # Task.mark_pod_terminated / update_available_pods and admission
+    "trace",               # trace sink writes
+]
+
+# Latencies are kept in log2 buckets of nanoseconds
+_HISTOGRAM_BUCKETS = 64
+
+
+# Times the phases of the simulation loop. start() returns a token that is
+# passed to stop() together with the phase name.
+class Profiler(ABC):
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self, phase: str, started):
+        pass
+
+    @abstractmethod
+    def count_event(self):
+        pass
+
+    @abstractmethod
+    def begin_run(self):
+        pass
+
+    @abstractmethod
+    def end_run(self):
+        pass
+
+    @abstractmethod
+    def export_to_csv(self, path):
+        pass
+
+
+# A profiler that records nothing (used when profiling is disabled)
+class NullProfiler(Profiler):
+
+    def start(self):
+        return 0
+
+    def stop(self, phase: str, started):
+        pass
+
+    def count_event(self):
+        pass
+
+    def begin_run(self):
+        pass
+
+    def end_run(self):
+        pass
+
+    def export_to_csv(self, path):
+        pass
+
+
+# Accumulates per-phase time, call counts and latency histograms
+class PhaseProfiler(Profiler):
+    def __init__(self):
+        self.total_ns = {phase: 0 for phase in PROFILE_PHASES}
+        self.calls = {phase: 0 for phase in PROFILE_PHASES}
+        self.max_ns = {phase: 0 for phase in PROFILE_PHASES}
+        self.histograms = {phase: [0] * _HISTOGRAM_BUCKETS for phase in PROFILE_PHASES}
+        self.events = 0
+        self.run_ns = 0
+        self._run_start = None
+
+    def start(self):
+        return time.perf_counter_ns()
+
+    def stop(self, phase: str, started):
+        elapsed = time.perf_counter_ns() - started
+        self.total_ns[phase] += elapsed
+        self.calls[phase] += 1
+        self.histograms[phase][elapsed.bit_length()] += 1
+        if elapsed > self.max_ns[phase]:
+            self.max_ns[phase] = elapsed
+
+    def count_event(self):
+        self.events += 1
+
+    def begin_run(self):
+        self._run_start = time.perf_counter_ns()
+
+    def end_run(self):
+        if self._run_start is not None:
+            self.run_ns += time.perf_counter_ns() - self._run_start
+            self._run_start = None
+
+    def quantile_ns(self, phase, q):
+        """
+        Returns the upper bound of the histogram bucket holding the q-quantile.
+        """
+        histogram = self.histograms[phase]
+        calls = self.calls[phase]
+        if calls == 0:
+            return 0
+
+        rank = q * calls
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= rank and count:
+                return min(1 << bucket, self.max_ns[phase]) if bucket else 0
+        return self.max_ns[phase]
+
+    def summary(self):
+        run_s = self.run_ns / 1e9
+        rows = []
+        for phase in PROFILE_PHASES:
+            calls = self.calls[phase]
+            total_s = self.total_ns[phase] / 1e9
+            rows.append({
+                "phase": phase,
+                "calls": calls,
+                "total_s": round(total_s, 6),
+                "share": round(total_s / run_s, 4) if run_s > 0 else 0,
+                "mean_us": round(self.total_ns[phase] / calls / 1e3, 3) if calls else 0,
+                "p50_us": round(self.quantile_ns(phase, 0.5) / 1e3, 3),
+                "p90_us": round(self.quantile_ns(phase, 0.9) / 1e3, 3),
+                "p99_us": round(self.quantile_ns(phase, 0.99) / 1e3, 3),
+                "max_us": round(self.max_ns[phase] / 1e3, 3),
+            })
+        rows.append({
+            "phase": "total",
+            "calls": self.events,
+            "total_s": round(run_s, 6),
+            "share": 1,
+            "mean_us": round(self.run_ns / self.events / 1e3, 3) if self.events else 0,
+            "p50_us": "", "p90_us": "", "p99_us": "", "max_us": "",
+        })
+        return rows
+
+    def events_per_second(self):
+        return self.events / (self.run_ns / 1e9) if self.run_ns > 0 else 0
+
+    def export_to_csv(self, path):
+        rows = self.summary()
+        with open(path, mode='w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        logger.info(f"Simulation profile: {self.events} events at {self.events_per_second():.1f} events/s, written to {path}")
+
+
+def create_profiler(config) -> Profiler:
+    return PhaseProfiler() if config.get('simulation_profile', False) else NullProfiler()
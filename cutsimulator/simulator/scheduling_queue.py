@@ -0,0 +1,133 @@
+import bisect
+import heapq
+import math
+from collections import deque
+from typing import List, Tuple
+
+from cutsimulator.cluster.cluster import Cluster
+from cutsimulator.cluster.node import Node
+from cutsimulator.workload.pod import Pod
+import logging
+logger = logging.getLogger(__name__)
+
+# Holds pods that failed to schedule, indexed by their resource request,
+# so that a release on a node only wakes the pods that could now fit there.
+class UnschedulablePods:
+    def __init__(self):
+        self.requests = []  # sorted list of distinct (cpu, memory) requests
+        self.pods = {}      # (cpu, memory) -> FIFO list of (last_attempt, pod)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, pod: Pod, last_attempt):
+        key = (pod.cpu, pod.memory)
+        if key not in self.pods:
+            bisect.insort(self.requests, key)
+            self.pods[key] = deque()
+        self.pods[key].append((last_attempt, pod))
+        self.count += 1
+
+    def pop_fitting(self, cpu_available, mem_available) -> List[Tuple[float, Pod]]:
+        """
+        Removes and returns, oldest attempt first, the pods that each fit on
+        their own in the given resources.
+        """
+        end = bisect.bisect_right(self.requests, (cpu_available, math.inf))
+        keys = [key for key in self.requests[:end] if key[1] <= mem_available]
+        if not keys:
+            return []
+
+        fitting = sorted(entry for key in keys for entry in self.pods.pop(key))
+        emptied = set(keys)
+        self.requests = [key for key in self.requests if key not in emptied]
+        self.count -= len(fitting)
+        return fitting
+
+    def pop_all(self) -> List[Tuple[float, Pod]]:
+        pods = [entry for key in self.requests for entry in self.pods[key]]
+        self.requests.clear()
+        self.pods.clear()
+        self.count = 0
+        return pods
+
+
+# A kube-scheduler style scheduling queue with three sub-queues:
+# - active: pods ready to be scheduled at the given time (arrivals)
+# - backoff: pods retried after an exponential backoff following a failure
+# - unschedulable: pods that fit no node, woken only by a release they could use
+class SchedulingQueue:
+    def __init__(self, cluster: Cluster, initial_backoff=1, max_backoff=10):
+        if initial_backoff < 0 or max_backoff < initial_backoff:
+            raise ValueError("Backoff durations must satisfy 0 <= initial <= max")
+
+        self.cluster = cluster
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.active = []     # heap of (time, pod)
+        self.backoff = []    # heap of (backoff_expiry, pod)
+        self.unschedulable = UnschedulablePods()
+
+    def __len__(self):
+        return len(self.active) + len(self.backoff) + len(self.unschedulable)
+
+    def has_ready_pods(self) -> bool:
+        return bool(self.active or self.backoff)
+
+    def add(self, pod: Pod, time):
+        heapq.heappush(self.active, (time, pod))
+
+    def next_time(self):
+        """
+        Returns the time of the next pod to schedule (inf if none is ready).
+        """
+        return self._head()[0]
+
+    def pop(self) -> Tuple[float, Pod]:
+        head = self._head()
+        if self.active and head is self.active[0]:
+            return heapq.heappop(self.active)
+        return heapq.heappop(self.backoff)
+
+    def _head(self):
+        if self.active and self.backoff:
+            return min(self.active[0], self.backoff[0])
+        elif self.active:
+            return self.active[0]
+        elif self.backoff:
+            return self.backoff[0]
+        return (math.inf, None)
+
+    def backoff_duration(self, pod: Pod):
+        if pod.restart_count <= 0:
+            return 0
+        return min(self.initial_backoff * 2 ** (pod.restart_count - 1), self.max_backoff)
+
+    def add_unschedulable(self, pod: Pod, time):
+        """
+        Queues a pod whose scheduling attempt at the given time failed.
+        """
+        if self.cluster.has_fit(pod.cpu, pod.memory):
+            # Resources exist, so the attempt failed for another reason: just back off
+            heapq.heappush(self.backoff, (time + self.backoff_duration(pod), pod))
+        else:
+            self.unschedulable.add(pod, time)
+
+    def on_resources_released(self, node: Node, time):
+        """
+        Moves the unschedulable pods that fit the given node to the backoff queue.
+        """
+        if node is None or not len(self.unschedulable):
+            return
+
+        for last_attempt, pod in self.unschedulable.pop_fitting(node.cpu_available, node.mem_available):
+            retry_time = max(time, last_attempt + self.backoff_duration(pod))
+            heapq.heappush(self.backoff, (retry_time, pod))
+            logger.info(f"Pod {pod.name} may fit on {node.name} - retrying at time {retry_time}")
+
+    def pop_unschedulable(self) -> List[Pod]:
+        """
+        Removes and returns all unschedulable pods.
+        """
+        return [pod for _, pod in self.unschedulable.pop_all()]
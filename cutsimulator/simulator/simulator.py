@@ -1,14 +1,19 @@
 import heapq
 import math
-from datetime import datetime
 import time
-from typing import List
+from collections.abc import Sequence
+from typing import Iterable
 
 from cutsimulator.cluster.cluster import Cluster
 from cutsimulator.scheduler.scheduler import Scheduler
 from cutsimulator.workload.pod import Pod, PodStatus
 from cutsimulator.workload.task import Task
+from cutsimulator.evaluation.detail_exporter import create_detail_exporter
 from cutsimulator.evaluation.simulation_statistics import SimulationStatistics  
+from cutsimulator.simulator.profiler import create_profiler
+from cutsimulator.simulator.scheduling_queue import SchedulingQueue
+from cutsimulator.simulator.trace_sink import TraceSinkSelector
+from cutsimulator.utils.utility import output_path
 import logging
 logger = logging.getLogger(__name__)
 
@@ -20,95 +25,202 @@ class Simulator:
         self.trace = self.config['simulation_save_trace']
         detailedstat = self.config['simulation_detail_statistics']
         self.stats = SimulationStatistics(detailed=detailedstat)
-
-    def append_to_simulation_trace(self, pod, event_type, filename="simulation_trace.txt"):
-        with open(filename, 'a') as file:
-            file.write(f"{event_type} Event Recorded at {datetime.now()}\n")
-            if event_type == "Deployment":
-                file.write(f"{pod.name} | {pod.cpu}m | {pod.memory}Mi | {pod.start_time} | {pod.node}\n")
-            elif event_type == "Termination":
-                file.write(f"{pod.name} | {pod.cpu}m | {pod.memory}Mi | {pod.start_time} -> {pod.end_time} | {pod.duration}s | {pod.node}\n")
-
-    def run_simulation(self, cluster: Cluster, scheduler: Scheduler, tasks: List[Task]):
-
+        self.trace_selector = TraceSinkSelector(self.config)
+        self.backoff_initial = self.config.get('simulation_backoff_initial', 1)
+        self.backoff_max = self.config.get('simulation_backoff_max', 10)
+        self.batch_arrivals = self.config.get('simulation_batch_arrivals', False)
+        self.profiler = create_profiler(self.config)
+
+    def run_simulation(self, cluster: Cluster, scheduler: Scheduler, tasks: Iterable[Task]):
+        """
+        Simulates the given tasks, which have to be ordered by arrival time.
+        Tasks are admitted when the virtual time reaches their arrival, so they
+        may come from a lazy iterator (e.g. WorkloadSynthesizer.iter_tasks()).
+        In that case finished tasks are also released during the run.
+        """
         self.virtual_time = 0
         self.stats.mark_start(self.virtual_time)
         self.stats.record_cluster_snapshot(cluster.get_nodes())
-        self.stats.set_task_count(len(tasks))
-        pending_pods = []
-        active_pods = []
-
-        for task in tasks:
-            for pod in task.get_available_pods():
-                pod.status = PodStatus.PENDING
-                heapq.heappush(pending_pods, (pod.arrival_time, pod))
-
-        while pending_pods or active_pods:
+        self.stats.set_detail_exporter(create_detail_exporter(self.config))
+        self.trace_sink = self.trace_selector.create_trace_sink()
+        self.pending_pods = SchedulingQueue(cluster, self.backoff_initial, self.backoff_max)
+        self.active_pods = []
+        self.retire_tasks = not isinstance(tasks, Sequence)
+        self.num_tasks = 0
+        pending_pods = self.pending_pods
+        active_pods = self.active_pods
+        profiler = self.profiler
+        profiler.begin_run()
+
+        task_stream = iter(tasks)
+        next_task = next(task_stream, None)
+
+        while pending_pods.has_ready_pods() or active_pods or next_task is not None:
+            profiler.count_event()
 
             # Peek to see the next arrival and finish times (if any)
-            next_arrival_time = pending_pods[0][0] if pending_pods else math.inf
+            next_arrival_time = pending_pods.next_time()
             next_finish_time = active_pods[0][0] if active_pods else math.inf
 
-            if next_arrival_time < next_finish_time:
+            # Admit the tasks that have arrived by the next event
+            started = profiler.start()
+            while next_task is not None and next_task.arrival_time <= min(next_arrival_time, next_finish_time):
+                self._admit_task(next_task)
+                next_task = next(task_stream, None)
+                next_arrival_time = pending_pods.next_time()
+            profiler.stop("task_update", started)
+
+            if next_arrival_time < next_finish_time and self.batch_arrivals:
+                # Deploy all pods arriving at this time together
+                started = profiler.start()
+                pods = []
+                while pending_pods.next_time() == next_arrival_time:
+                    pods.append(pending_pods.pop()[1])
+                profiler.stop("queue", started)
+                self._simulate_time_passing(next_arrival_time)
+                self._record_utilization(cluster)
+
+                started = profiler.start()
+                nodes = scheduler.schedule_batch(pods)
+                profiler.stop("schedule", started)
+                started = profiler.start()
+                deployed = cluster.deploy_pods(pods, nodes, scheduler.delegates_binding)
+                profiler.stop("deploy", started)
+
+                for pod, pod_deployed in zip(pods, deployed):
+                    if pod_deployed:
+                        self._on_pod_deployed(pod, scheduler)
+                for pod, pod_deployed in zip(pods, deployed):
+                    if not pod_deployed:
+                        self._on_pod_not_deployed(pod)
+            elif next_arrival_time < next_finish_time:
                 # Deploy the next pod
-                next_arrival_time, pod = heapq.heappop(pending_pods)
+                started = profiler.start()
+                next_arrival_time, pod = pending_pods.pop()
+                profiler.stop("queue", started)
                 self._simulate_time_passing(next_arrival_time)
-                self.stats.record_cluster_utilization(self.virtual_time, cluster.get_nodes())
+                self._record_utilization(cluster)
 
+                started = profiler.start()
                 node = scheduler.schedule(pod)
-                deployed = cluster.deploy_pod(pod, node)
+                profiler.stop("schedule", started)
+                started = profiler.start()
+                deployed = cluster.deploy_pod(pod, node, scheduler.delegates_binding)
+                profiler.stop("deploy", started)
 
                 if deployed:
-                    # Pod was successfully deployed
-                    pod.status = PodStatus.RUNNING
-                    pod.start_time = next_arrival_time
-                    pod.end_time = next_arrival_time + pod.duration
-                    scheduler.onPodDeployed(pod)
-                    heapq.heappush(active_pods, (pod.end_time, pod))
-                    self.stats.record_pod_event(pod, success=True)
-                    self.append_to_simulation_trace(pod, "Deployment")
-                    logger.info(f"Deployed {pod.name} on {pod.node.name} at time {pod.start_time}")
+                    self._on_pod_deployed(pod, scheduler)
                 else:
-                    pod.restart_count += 1
-                    if pod.restart_count > pod.max_restarts:
-                        logger.warning(f"[FAIL] Pod {pod.name} exceeded max restarts - skipping it.")
-                        pod.task.unsuccessful = True
-                        pod.status = PodStatus.FAILED
-                        self.stats.record_pod_event(pod, success=False)
-                    elif len(active_pods) == 0:
-                        logger.warning(f"[FAIL] Pod {pod.name} does not fit in the cluster - skipping it.")
-                        pod.task.unsuccessful = True
-                        pod.status = PodStatus.FAILED
-                        self.stats.record_pod_event(pod, success=False)
-                    else:
-                        heapq.heappush(pending_pods, (next_finish_time, pod))
-                        logger.info(f"Unable to schedule pod {pod.name} - pushing it back (restart #{pod.restart_count})")
+                    self._on_pod_not_deployed(pod)
             else:
                 # Terminate the next pod
                 next_finish_time, pod = heapq.heappop(active_pods)
                 self._simulate_time_passing(next_finish_time)
-                self.stats.record_cluster_utilization(self.virtual_time, cluster.get_nodes())
+                self._record_utilization(cluster)
 
+                started = profiler.start()
                 cluster.terminate_pod(pod)
+                profiler.stop("terminate", started)
+                started = profiler.start()
                 scheduler.onPodTerminated(pod)
-                self.append_to_simulation_trace(pod, "Termination")
+                profiler.stop("scheduler_feedback", started)
+                started = profiler.start()
+                self.trace_sink.record(pod, "Termination")
+                profiler.stop("trace", started)
                 logger.info(f"Terminated pod {pod.name} at time {pod.end_time}")
-                pod.status = PodStatus.COMPLETED
 
+                # Retry only the waiting pods that could use the released resources
+                started = profiler.start()
+                pending_pods.on_resources_released(cluster.get_node(pod.node.name), self.virtual_time)
+                profiler.stop("queue", started)
+
+                started = profiler.start()
                 if hasattr(pod, 'task'):
-                    pod.task.mark_pod_terminated(pod.name)
-                    new_ready = pod.task.get_available_pods()
+                    # Marks the pod COMPLETED and makes its dependent pods available
+                    task = pod.task
+                    task.mark_pod_terminated(pod.name)
+                    new_ready = task.get_available_pods()
                     for new_pod in new_ready:
                         if new_pod.node is None and new_pod.status == PodStatus.INITIAL:
-                            heapq.heappush(pending_pods, (new_pod.arrival_time, new_pod))
+                            pending_pods.add(new_pod, new_pod.arrival_time)
                             new_pod.status = PodStatus.PENDING
+                    self._retire_if_settled(task)
+                else:
+                    pod.status = PodStatus.COMPLETED
+                profiler.stop("task_update", started)
 
+                if not active_pods and not pending_pods.has_ready_pods():
+                    # Nothing left to release resources: waiting pods can never fit
+                    self._fail_unschedulable()
+
+        # Pods still waiting when the last ready pod failed
+        self._fail_unschedulable()
+        profiler.end_run()
+        self.stats.set_task_count(self.num_tasks)
         self.stats.mark_end(self.virtual_time)
-        self.stats.export_to_csv("simulation_statistics.csv")
-        with open("simulation_trace.txt", 'a') as f:
-            f.write("\n" + "*" * 50 + " End of Simulation " + "*" * 50 + "\n")
+        self.stats.export_to_csv(output_path(self.config, "simulation_statistics.csv"))
+        profiler.export_to_csv(output_path(self.config, "simulation_profile.csv"))
+        self.trace_sink.mark_end()
+        self.trace_sink.close()
         scheduler.onSimulationEnded()
 
+    def _record_utilization(self, cluster: Cluster):
+        started = self.profiler.start()
+        self.stats.record_cluster_utilization(self.virtual_time, cluster)
+        self.profiler.stop("utilization", started)
+
+    def _admit_task(self, task: Task):
+        self.num_tasks += 1
+        for pod in task.get_available_pods():
+            pod.status = PodStatus.PENDING
+            self.pending_pods.add(pod, pod.arrival_time)
+        self._retire_if_settled(task)
+
+    def _retire_if_settled(self, task: Task):
+        if self.retire_tasks and task.is_settled():
+            task.release()
+
+    def _on_pod_deployed(self, pod: Pod, scheduler: Scheduler):
+        # Pod was successfully deployed
+        pod.status = PodStatus.RUNNING
+        pod.start_time = self.virtual_time
+        pod.end_time = self.virtual_time + pod.duration
+        started = self.profiler.start()
+        scheduler.onPodDeployed(pod)
+        self.profiler.stop("scheduler_feedback", started)
+        heapq.heappush(self.active_pods, (pod.end_time, pod))
+        self.stats.record_pod_event(pod, success=True)
+        started = self.profiler.start()
+        self.trace_sink.record(pod, "Deployment")
+        self.profiler.stop("trace", started)
+        logger.info(f"Deployed {pod.name} on {pod.node.name} at time {pod.start_time}")
+
+    def _on_pod_not_deployed(self, pod: Pod):
+        pod.restart_count += 1
+        if pod.restart_count > pod.max_restarts:
+            logger.warning(f"[FAIL] Pod {pod.name} exceeded max restarts - skipping it.")
+            self._fail_pod(pod)
+        elif len(self.active_pods) == 0:
+            logger.warning(f"[FAIL] Pod {pod.name} does not fit in the cluster - skipping it.")
+            self._fail_pod(pod)
+        else:
+            started = self.profiler.start()
+            self.pending_pods.add_unschedulable(pod, self.virtual_time)
+            self.profiler.stop("queue", started)
+            logger.info(f"Unable to schedule pod {pod.name} - waiting for resources (restart #{pod.restart_count})")
+
+    def _fail_unschedulable(self):
+        for pod in self.pending_pods.pop_unschedulable():
+            logger.warning(f"[FAIL] Pod {pod.name} does not fit in the cluster - skipping it.")
+            self._fail_pod(pod)
+
+    def _fail_pod(self, pod: Pod):
+        pod.status = PodStatus.FAILED
+        self.stats.record_pod_event(pod, success=False)
+        if hasattr(pod, 'task'):
+            pod.task.unsuccessful = True
+            self._retire_if_settled(pod.task)
+
     def _simulate_time_passing(self, next_time):
         if (next_time < self.virtual_time):
             raise ValueError("Time cannot move backwards!")
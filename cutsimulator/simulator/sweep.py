@@ -0,0 +1,185 @@
+import copy
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from cutsimulator.utils.utility import setup_logger
+import logging
+logger = logging.getLogger(__name__)
+
+# Runs many simulations across a grid of config values and seeds in a process
+# pool. Each run writes its outputs to its own directory and the per-run
+# statistics are merged into one results table.
+
+def expand_sweep(config) -> List[dict]:
+    """
+    Expands the sweep_grid (config key -> list of values) and sweep_seeds of the
+    config into one config per run.
+    """
+    grid = config.get('sweep_grid') or {}
+    seeds = config.get('sweep_seeds') or [0]
+    output_dir = config.get('sweep_output_dir', 'sweep_results')
+
+    for key, values in grid.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"sweep_grid entry {key} must be a non-empty list")
+
+    keys = list(grid.keys())
+    runs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        for seed in seeds:
+            run_config = copy.deepcopy(config)
+            run_config.update(zip(keys, copy.deepcopy(values)))
+            run_config['simulation_seed'] = seed
+            run_config['sweep_run_id'] = len(runs)
+            run_config['sweep_params'] = dict(zip(keys, values))
+            run_config['simulation_output_dir'] = os.path.join(output_dir, f"run-{len(runs):04d}")
+            runs.append(run_config)
+    return runs
+
+
+def run_single(config):
+    """
+    Runs one simulation point (usually inside a worker process) and returns its
+    output directory and statistics.
+    """
+    # Imported here so that worker processes only pay for what they use
+    import torch
+    from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
+    from cutsimulator.scheduler.scheduler_selector import SchedulerSelector
+    from cutsimulator.simulator.simulator import Simulator
+    from cutsimulator.workload.workload_selector import WorkloadSelector
+
+    output_dir = config['simulation_output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    log_file = os.path.join(output_dir, "simulator.log")
+    setup_logger(level=config.get('sweep_log_level', 'WARNING'), log_file=log_file)
+
+    try:
+        seed = config['simulation_seed']
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+        torch.set_num_threads(config.get('sweep_threads_per_worker', 1))
+
+        cluster = ClusterSynthesizer(config).create_cluster()
+        scheduler = SchedulerSelector(config).create_scheduler(cluster)
+        try:
+            tasks = WorkloadSelector(config).create_workload()
+            simulator = Simulator(config)
+            simulator.run_simulation(cluster, scheduler, tasks)
+        finally:
+            scheduler.close()
+    finally:
+        # Pool workers are reused: later runs must not log into this run's file
+        _close_log_file(log_file)
+
+    # The per-event trace is only needed for the run's own detailed export
+    simulator.stats.load_balancer.trace = {}
+    return output_dir, simulator.stats
+
+
+def _init_worker():
+    # Forked workers inherit the log handlers of the sweep process (e.g. its
+    # sweep.log). They are only detached, the parent still owns their files.
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+
+def _close_log_file(log_file):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == os.path.abspath(log_file):
+            root.removeHandler(handler)
+            handler.close()
+
+
+def _param_value(value):
+    # Distributions and other nested values are stored as text in the results table
+    return value if isinstance(value, (int, float, str, bool)) else str(value)
+
+
+def merge_results(runs: List[dict], path) -> pd.DataFrame:
+    """
+    Merges the simulation_statistics.csv of every run into one table.
+    """
+    frames = []
+    for run in runs:
+        stats_path = os.path.join(run['simulation_output_dir'], "simulation_statistics.csv")
+        if not os.path.exists(stats_path):
+            logger.warning(f"No statistics found for sweep run {run['sweep_run_id']}")
+            continue
+
+        frame = pd.read_csv(stats_path)
+        frame.insert(0, "seed", run['simulation_seed'])
+        for i, (key, value) in enumerate(run['sweep_params'].items()):
+            frame.insert(i, key, _param_value(value))
+        frame.insert(0, "run_id", run['sweep_run_id'])
+        frames.append(frame)
+
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    results.to_csv(path, index=False)
+    logger.info(f"Merged {len(frames)} sweep runs into {path}")
+    return results
+
+
+def merge_grid_statistics(runs: List[dict], statistics: dict, path) -> pd.DataFrame:
+    """
+    Merges the statistics of all seeds of each grid point (wait time and latency
+    percentiles over all their pods) into one summary row per grid point.
+    """
+    merged = {}
+    for run in runs:
+        if run['sweep_run_id'] not in statistics:
+            continue
+        key = tuple(_param_value(value) for value in run['sweep_params'].values())
+        stats = statistics[run['sweep_run_id']]
+        if key not in merged:
+            merged[key] = (run['sweep_params'], stats, 1)
+        else:
+            params, total, seeds = merged[key]
+            total.merge(stats)
+            merged[key] = (params, total, seeds + 1)
+
+    rows = []
+    for params, stats, seeds in merged.values():
+        row = {key: _param_value(value) for key, value in params.items()}
+        row["seeds"] = seeds
+        row.update(stats.compute_final_metrics())
+        rows.append(row)
+
+    summary = pd.DataFrame(rows)
+    summary.to_csv(path, index=False)
+    logger.info(f"Merged the statistics of {len(statistics)} sweep runs into {len(rows)} grid points in {path}")
+    return summary
+
+
+def run_sweep(config) -> pd.DataFrame:
+    """
+    Runs all sweep points in a process pool and returns the merged results.
+    """
+    runs = expand_sweep(config)
+    output_dir = config.get('sweep_output_dir', 'sweep_results')
+    os.makedirs(output_dir, exist_ok=True)
+    workers = config.get('sweep_workers') or os.cpu_count()
+    logger.info(f"Running {len(runs)} sweep runs on {workers} workers")
+
+    statistics = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(run_single, run): run for run in runs}
+        for future in as_completed(futures):
+            run = futures[future]
+            try:
+                _, statistics[run['sweep_run_id']] = future.result()
+                logger.info(f"Sweep run {run['sweep_run_id']} finished: {run['sweep_params']} seed={run['simulation_seed']}")
+            except Exception as e:
+                logger.error(f"Sweep run {run['sweep_run_id']} failed: {e}")
+
+    merge_grid_statistics(runs, statistics, os.path.join(output_dir, "sweep_summary.csv"))
+    return merge_results(runs, os.path.join(output_dir, "sweep_results.csv"))
@@ -0,0 +1,294 @@
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import numpy as np
+
+from cutsimulator.utils.utility import output_path
+from cutsimulator.workload.pod import Pod
+import logging
+logger = logging.getLogger(__name__)
+
+# Event codes stored in the binary trace records
+TRACE_EVENT_END = 0
+TRACE_EVENT_DEPLOYMENT = 1
+TRACE_EVENT_TERMINATION = 2
+
+TRACE_EVENT_CODES = {"Deployment": TRACE_EVENT_DEPLOYMENT, "Termination": TRACE_EVENT_TERMINATION}
+TRACE_EVENT_NAMES = {code: name for name, code in TRACE_EVENT_CODES.items()}
+
+# Bytes of the pod and node names in a binary trace record
+TRACE_NAME_BYTES = 64
+
+# Fixed-size record of the binary trace (one per event)
+TRACE_RECORD_DTYPE = np.dtype([
+    ("event", "u1"),
+    ("wall_time", "<f8"),
+    ("pod", f"S{TRACE_NAME_BYTES}"),
+    ("cpu", "<i8"),
+    ("memory", "<i8"),
+    ("start_time", "<f8"),
+    ("end_time", "<f8"),
+    ("duration", "<f8"),
+    ("node", f"S{TRACE_NAME_BYTES}"),
+    ("node_cpu", "<i8"),
+    ("node_mem", "<i8"),
+])
+
+TRACE_MAGIC = b"CUTTRACE"
+TRACE_VERSION = 1
+_TRACE_HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("itemsize", "<u4")])
+
+END_OF_SIMULATION_LINE = "\n" + "*" * 50 + " End of Simulation " + "*" * 50 + "\n"
+
+
+# Records the deployment and termination events of a simulation run
+class TraceSink(ABC):
+
+    @abstractmethod
+    def record(self, pod: Pod, event_type: str):
+        pass
+
+    @abstractmethod
+    def mark_end(self):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+# A sink that discards all events (used when the trace is disabled)
+class NullTraceSink(TraceSink):
+
+    def record(self, pod: Pod, event_type: str):
+        pass
+
+    def mark_end(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# Writes the human-readable text trace through a single buffered file handle
+class TextTraceSink(TraceSink):
+    def __init__(self, path="simulation_trace.txt", buffer_size=1 << 20):
+        self.path = path
+        self.file = open(path, 'a', buffering=buffer_size)
+
+    def record(self, pod: Pod, event_type: str):
+        self.file.write(f"{event_type} Event Recorded at {datetime.now()}\n")
+        if event_type == "Deployment":
+            self.file.write(f"{pod.name} | {pod.cpu}m | {pod.memory}Mi | {pod.start_time} | {pod.node}\n")
+        elif event_type == "Termination":
+            self.file.write(f"{pod.name} | {pod.cpu}m | {pod.memory}Mi | {pod.start_time} -> {pod.end_time} | {pod.duration}s | {pod.node}\n")
+
+    def mark_end(self):
+        self.file.write(END_OF_SIMULATION_LINE)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+# Writes fixed-size binary records into a preallocated buffer that is flushed
+# to disk in large chunks, optionally by a background writer thread. A write
+# error of the writer thread is raised by the next flush() or close().
+# Names longer than TRACE_NAME_BYTES are truncated with a warning.
+# Use read_binary_trace() or convert_binary_trace() to inspect the result.
+class BinaryTraceSink(TraceSink):
+    def __init__(self, path="simulation_trace.bin", chunk_records=65536, background=False):
+        if chunk_records <= 0:
+            raise ValueError("chunk_records has to be positive")
+
+        self.path = path
+        self.chunk_records = chunk_records
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'ab')
+        if is_new:
+            header = np.array([(TRACE_MAGIC, TRACE_VERSION, TRACE_RECORD_DTYPE.itemsize)], dtype=_TRACE_HEADER_DTYPE)
+            self.file.write(header.tobytes())
+
+        self.buffer = np.zeros(chunk_records, dtype=TRACE_RECORD_DTYPE)
+        self.count = 0
+
+        self._truncated_warning = False
+
+        # Optional background writer
+        self.queue = None
+        self.writer = None
+        self._error = None
+        if background:
+            self.queue = queue.Queue(maxsize=4)
+            self.writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+            self.writer.start()
+
+    def record(self, pod: Pod, event_type: str):
+        rec = self.buffer[self.count]
+        rec["event"] = TRACE_EVENT_CODES[event_type]
+        rec["wall_time"] = time.time()
+        rec["pod"] = self._encode_name(pod.name)
+        rec["cpu"] = pod.cpu
+        rec["memory"] = pod.memory
+        rec["start_time"] = np.nan if pod.start_time is None else pod.start_time
+        rec["end_time"] = np.nan if pod.end_time is None else pod.end_time
+        rec["duration"] = pod.duration
+        if pod.node is not None:
+            rec["node"] = self._encode_name(pod.node.name)
+            rec["node_cpu"] = pod.node.cpu_capacity
+            rec["node_mem"] = pod.node.mem_capacity
+        else:
+            rec["node"] = b""
+            rec["node_cpu"] = 0
+            rec["node_mem"] = 0
+
+        self.count += 1
+        if self.count == self.chunk_records:
+            self.flush()
+
+    def _encode_name(self, name):
+        encoded = name.encode()
+        if len(encoded) > TRACE_NAME_BYTES and not self._truncated_warning:
+            logger.warning(f"Names longer than {TRACE_NAME_BYTES} bytes are truncated in the binary trace {self.path}: {name}")
+            self._truncated_warning = True
+        return encoded
+
+    def mark_end(self):
+        rec = self.buffer[self.count]
+        rec.fill(0)
+        rec["event"] = TRACE_EVENT_END
+        rec["wall_time"] = time.time()
+        self.count += 1
+        if self.count == self.chunk_records:
+            self.flush()
+
+    def flush(self):
+        if self.count == 0:
+            return
+
+        if self.queue is not None:
+            self._raise_error()
+            # Hand the full chunk over to the writer and continue with a fresh one
+            self.queue.put(self.buffer[:self.count])
+            self.buffer = np.zeros(self.chunk_records, dtype=TRACE_RECORD_DTYPE)
+        else:
+            self.file.write(self.buffer[:self.count].tobytes())
+        self.count = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        try:
+            self.flush()
+        finally:
+            if self.writer is not None:
+                self.queue.put(None)
+                self.writer.join()
+                self.writer = None
+            self.file.close()
+        self._raise_error()
+
+    def _write_loop(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                continue  # Keep draining the queue so that flush() never blocks
+            try:
+                self.file.write(chunk.tobytes())
+            except Exception as e:
+                logger.error(f"Binary trace writer failed: {e}")
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Writing the binary trace {self.path} failed") from self._error
+
+
+def read_binary_trace(path, chunk_records=65536):
+    """
+    Yields the records of a binary trace as numpy structured arrays of at most
+    chunk_records entries each.
+    """
+    with open(path, 'rb') as f:
+        header = np.frombuffer(f.read(_TRACE_HEADER_DTYPE.itemsize), dtype=_TRACE_HEADER_DTYPE)
+        if len(header) != 1 or header["magic"][0] != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a binary simulation trace")
+        if header["version"][0] != TRACE_VERSION or header["itemsize"][0] != TRACE_RECORD_DTYPE.itemsize:
+            raise ValueError(f"Unsupported binary trace version {header['version'][0]} in {path}")
+
+        while True:
+            data = f.read(chunk_records * TRACE_RECORD_DTYPE.itemsize)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=TRACE_RECORD_DTYPE)
+
+
+def _format_number(value):
+    # Virtual times are integral in synthetic workloads, print them as such
+    if np.isnan(value):
+        return "None"
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def format_trace_record(rec) -> str:
+    """
+    Formats one binary trace record in the human-readable text trace format.
+    """
+    event = int(rec["event"])
+    if event == TRACE_EVENT_END:
+        return END_OF_SIMULATION_LINE
+
+    event_type = TRACE_EVENT_NAMES[event]
+    pod_name = rec["pod"].decode()
+    node_name = rec["node"].decode()
+    node = f"Node(name={node_name}, cpu={rec['node_cpu']}, mem={rec['node_mem']})" if node_name else "None"
+    start = _format_number(rec["start_time"])
+
+    line = f"{event_type} Event Recorded at {datetime.fromtimestamp(rec['wall_time'])}\n"
+    if event == TRACE_EVENT_DEPLOYMENT:
+        line += f"{pod_name} | {rec['cpu']}m | {rec['memory']}Mi | {start} | {node}\n"
+    else:
+        line += (f"{pod_name} | {rec['cpu']}m | {rec['memory']}Mi | {start} -> {_format_number(rec['end_time'])} | "
+                 f"{_format_number(rec['duration'])}s | {node}\n")
+    return line
+
+
+def convert_binary_trace(path, output_path):
+    """
+    Converts a binary trace into the human-readable text trace format.
+    """
+    with open(output_path, 'w') as out:
+        for chunk in read_binary_trace(path):
+            out.writelines(format_trace_record(rec) for rec in chunk)
+    logger.info(f"Converted binary trace {path} to {output_path}")
+
+
+# Creates the trace sink selected in the simulation config
+class TraceSinkSelector:
+    def __init__(self, config):
+        if 'simulation_save_trace' not in config:
+            raise ValueError("TraceSinkSelector requires 'simulation_save_trace' in config")
+        self.config = config
+
+    def create_trace_sink(self) -> TraceSink:
+        if not self.config['simulation_save_trace']:
+            return NullTraceSink()
+
+        trace_format = self.config.get('simulation_trace_format', 'text')
+        if trace_format == 'text':
+            path = output_path(self.config, self.config.get('simulation_trace_file', "simulation_trace.txt"))
+            return TextTraceSink(path)
+        elif trace_format == 'binary':
+            path = output_path(self.config, self.config.get('simulation_trace_file', "simulation_trace.bin"))
+            return BinaryTraceSink(path,
+                                   chunk_records=self.config.get('simulation_trace_chunk_records', 65536),
+                                   background=self.config.get('simulation_trace_background', False))
+        else:
+            raise ValueError(f"Unsupported trace format: {trace_format}")
@@ -1,8 +1,10 @@
+from typing import List
+
 import numpy as np
 
 from cutsimulator.cluster.cluster import Cluster, Node
 from cutsimulator.workload.pod import Pod
-from cutsimulator.utils.utility import safe_ratio
+from cutsimulator.utils.utility import safe_ratio, safe_ratio_array
 
 # Returns the number of cluster features returned by build_cluster_features()
 def cluster_features_dimensions() -> int:
@@ -67,3 +69,26 @@ def build_node_features(cluster: Cluster, node: Node, pod: Pod) -> list:
     ]
 
     return features
+
+# Builds the node-related features of all nodes at once.
+# Row i equals build_node_features() for the i-th node of cluster.get_nodes().
+def build_node_features_matrix(cluster: Cluster, pod: Pod) -> np.ndarray:
+    return build_node_features_batch(cluster, [pod])[0]
+
+# Builds the node-related features of all nodes for each of the given pods
+# against the same cluster state. Returns an array of shape [pods, nodes, features].
+def build_node_features_batch(cluster: Cluster, pods: List[Pod]) -> np.ndarray:
+    cluster_state = cluster.get_cluster_state()
+    node_cpu_capacity, node_mem_capacity, node_cpu_available, node_mem_available = cluster.get_resource_arrays()
+    pod_cpus = np.array([pod.cpu for pod in pods], dtype=np.float64)[:, None]
+    pod_mems = np.array([pod.memory for pod in pods], dtype=np.float64)[:, None]
+
+    features = np.empty((len(pods), len(node_cpu_capacity), node_features_dimensions()), dtype=np.float64)
+    features[:, :, 0] = safe_ratio_array(node_cpu_available, node_cpu_capacity)
+    features[:, :, 1] = safe_ratio_array(node_mem_available, node_mem_capacity)
+    features[:, :, 2] = safe_ratio_array(node_cpu_capacity, cluster_state["total_cpu_capacity"])
+    features[:, :, 3] = safe_ratio_array(node_mem_capacity, cluster_state["total_mem_capacity"])
+    features[:, :, 4] = safe_ratio_array(pod_cpus, node_cpu_available)
+    features[:, :, 5] = safe_ratio_array(pod_mems, node_mem_available)
+
+    return features
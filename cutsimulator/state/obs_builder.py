@@ -1,3 +1,5 @@
+from typing import List
+
 import numpy as np
 
 import cutsimulator.state.feature_builder as fb
@@ -17,3 +19,20 @@ def build_node_obs(cluster: Cluster, node: Node, pod: Pod) -> np.ndarray:
     obs += fb.build_node_features(cluster, node, pod)
 
     return np.array(obs, dtype=np.float32)
+
+# Builds the observations of all nodes at once (one row per node of
+# cluster.get_nodes()). Row i equals build_node_obs() for the i-th node.
+def build_obs_matrix(cluster: Cluster, pod: Pod) -> np.ndarray:
+    return build_obs_batch(cluster, [pod])[0]
+
+# Builds the observation matrices of several pods against the same cluster
+# state. Returns an array of shape [pods, nodes, obs_dimensions()].
+def build_obs_batch(cluster: Cluster, pods: List[Pod]) -> np.ndarray:
+    node_features = fb.build_node_features_batch(cluster, pods)
+    cluster_features = np.array(fb.build_cluster_features(cluster), dtype=np.float64)
+
+    obs = np.empty(node_features.shape[:2] + (obs_dimensions(),), dtype=np.float32)
+    obs[:, :, :len(cluster_features)] = cluster_features
+    obs[:, :, len(cluster_features):] = node_features
+
+    return obs
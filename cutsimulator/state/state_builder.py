@@ -14,8 +14,6 @@ def state_dimensions(cluster: Cluster, num_max_agents: int = None) -> int:
 def build_cluster_state(cluster: Cluster, pod: Pod) -> np.ndarray:
     
     state = fb.build_cluster_features(cluster)
+    node_features = fb.build_node_features_matrix(cluster, pod)
 
-    for node in cluster.get_nodes():
-        state = state + fb.build_node_features(cluster, node, pod)
-
-    return np.array(state, dtype=np.float32)
+    return np.concatenate((np.array(state, dtype=np.float32), node_features.ravel().astype(np.float32)))
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of the cached arrays or the way they are generated changes
+SCENARIO_CACHE_VERSION = 2
+
+
+# On-disk cache of generated scenario arrays (e.g. node resources, task and pod
+# attributes). Entries are addressed by a hash of the generating config and seed
+# and stored as a directory of .npy files that are loaded memory-mapped.
+class ScenarioCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, component: str, params: dict, seed) -> str:
+        """
+        Returns the content address of a component generated from params and seed.
+        """
+        payload = json.dumps({"component": component, "params": params, "seed": seed,
+                              "version": SCENARIO_CACHE_VERSION}, sort_keys=True, default=str)
+        return f"{component}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def load(self, key) -> Optional[Dict[str, np.ndarray]]:
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isdir(path):
+            return None
+
+        arrays = {}
+        for filename in os.listdir(path):
+            if filename.endswith(".npy"):
+                arrays[filename[:-4]] = np.load(os.path.join(path, filename), mmap_mode='r')
+        logger.info(f"Loaded scenario {key} from cache")
+        return arrays
+
+    def store(self, key, arrays: Dict[str, np.ndarray]):
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isdir(path):
+            return
+
+        # Write into a temporary directory first so that concurrent runs never see partial entries
+        tmp_path = tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(array))
+            os.rename(tmp_path, path)
+            logger.info(f"Stored scenario {key} in cache")
+        except OSError:
+            # Another run stored the same entry in the meantime
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def create_scenario_cache(config) -> Optional[ScenarioCache]:
+    """
+    Returns the scenario cache configured with simulation_cache_dir, if any.
+    Caching requires a simulation_seed, as unseeded scenarios are not reproducible.
+    """
+    cache_dir = config.get('simulation_cache_dir')
+    if not cache_dir or config.get('simulation_seed') is None:
+        return None
+    return ScenarioCache(cache_dir)
@@ -1,6 +1,7 @@
 import numpy as np
 import csv
 import os
+import zlib
 import yaml
 from pathlib import Path
 import logging
@@ -32,7 +33,12 @@ def setup_logger(name=None, level=logging.INFO, log_file=None):
 
     return new_logger
 
-def generate_distribution_values(distribution, count):
+def create_rng(seed, component: str) -> np.random.Generator:
+    # Independent, reproducible random stream for one simulator component
+    # (e.g. "cluster" or "workload") derived from the simulation seed
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(zlib.crc32(component.encode()),)))
+
+def generate_distribution_values(distribution, count, rng: np.random.Generator = None):
     if distribution['type'] not in {"normal", "poisson", "uniform", "fixed"}:
         raise ValueError(f"Unsupported distribution {distribution['type']}")
 
@@ -56,6 +62,9 @@ def generate_distribution_values(distribution, count):
     roundVal = 0
     if 'round' in distribution:
         roundVal = distribution['round']
+
+    if rng is not None:
+        return _generate_distribution_values_rng(distribution, count, min, max, roundVal, rng)
         
     # Generate distributed numbers within the range
     sequence = []
@@ -72,6 +81,22 @@ def generate_distribution_values(distribution, count):
             sequence.append(int(round(sample, roundVal)))           
     return sequence
 
+def _generate_distribution_values_rng(distribution, count, min, max, roundVal, rng):
+    # Vectorized rejection sampling from a seeded generator
+    values = np.empty(0, dtype=np.int64)
+    while len(values) < count:
+        size = 2 * (count - len(values)) + 16
+        if distribution['type'] == 'normal':
+            samples = rng.normal(loc=distribution['mean'], scale=distribution['stdev'], size=size)
+        elif distribution['type'] == 'poisson':
+            samples = rng.poisson(lam=distribution['mean'], size=size)
+        elif distribution['type'] == 'uniform':
+            samples = rng.uniform(low=distribution['min'], high=distribution['max'], size=size)
+
+        samples = samples[(samples >= min) & (samples <= max)]
+        values = np.concatenate((values, np.round(samples, roundVal).astype(np.int64)))
+    return values[:count]
+
 def convert_cpu(cpu: str) -> int:
     # CPU conversion (convert to millicores)
     if cpu.endswith("m"):
@@ -99,7 +124,21 @@ def safe_ratio(numerator, denominator, default_if_zero=0):
     if denominator == 0:
         logger.warning(f"safe_ratio fallback: numerator={numerator}, denominator=0, returning {default_if_zero}")
     return ratio
+
+def safe_ratio_array(numerator, denominator, default_if_zero=0):
+    # Element-wise safe_ratio() for numpy arrays (no warnings are logged)
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    ratio = np.full(np.broadcast(numerator, denominator).shape, default_if_zero, dtype=np.float64)
+    np.divide(numerator, denominator, out=ratio, where=denominator > 0)
+    return ratio
     
+def output_path(config, filename):
+    # Returns the path of an output file inside the configured output directory
+    output_dir = config.get('simulation_output_dir', '.')
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, filename)
+
 def load_configs(yaml_files):
     config = {}
     yaml_paths = [Path(f) for f in yaml_files]
@@ -141,10 +180,36 @@ def log_rewards(pod_name, selected_node, valid_nodes, rewards, mark_end=False, l
             
             
 def log_statistics(metrics: dict, path: str):
-    is_new = not os.path.exists(path)
+    is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+    fieldnames = list(metrics.keys())
+    if not is_new:
+        with open(path, newline='') as f:
+            header = next(csv.reader(f), [])
+        if header[:len(fieldnames)] != fieldnames:
+            header = _rewrite_statistics(path, fieldnames)
+        fieldnames = header
+
     with open(path, mode='a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=metrics.keys())
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
         if is_new:
             writer.writeheader()
         writer.writerow(metrics)
-    logger.info(f"Logged statistics to {path}: {metrics}")
\ No newline at end of file
+    logger.info(f"Logged statistics to {path}: {metrics}")
+
+def _rewrite_statistics(path, fieldnames):
+    # Rewrites a statistics file with an older header in the columns of fieldnames,
+    # keeping the columns only the older rows have at the end (empty for new rows)
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        old_fieldnames = reader.fieldnames or []
+    fieldnames = fieldnames + [name for name in old_fieldnames if name not in fieldnames]
+    logger.warning(f"Columns of {path} changed - rewriting its header")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode='w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return fieldnames
\ No newline at end of file
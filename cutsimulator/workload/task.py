@@ -4,18 +4,39 @@ from cutsimulator.workload.pod import Pod, PodStatus
 from cutsimulator.utils.utility import generate_distribution_values
 
 class Task:
-    def __init__(self, name, num_pods, pod_config, arrival_time):
+    def __init__(self, name, num_pods, pod_config, arrival_time, rng: np.random.Generator = None):
         self.name = name
         self.arrival_time = arrival_time
         self.length = num_pods
         self.unsuccessful = False  # Becomes True if any pod exceeds restart limit
 
         # Generate pods for this task
-        self.pods = self._generate_pods(pod_config)
+        self.pods = self._generate_pods(pod_config, rng)
         
         # Create a DAG dependency matrix (lower triangular = backward dependencies)
-        self.dag = np.tril(np.random.randint(2, size=(self.length, self.length)), k=-1)
-
+        if rng is not None:
+            self.dag = np.tril(rng.integers(2, size=(self.length, self.length)), k=-1)
+        else:
+            self.dag = np.tril(np.random.randint(2, size=(self.length, self.length)), k=-1)
+
+        self._link_pods()
+
+    @classmethod
+    def from_arrays(cls, name, arrival_time, cpus, mems, durations, dag, max_restarts):
+        """
+        Creates a task from already generated pod attributes and DAG matrix.
+        """
+        task = cls.__new__(cls)
+        task.name = name
+        task.arrival_time = arrival_time
+        task.length = len(cpus)
+        task.unsuccessful = False
+        task.pods = task._create_pods(cpus, mems, durations, max_restarts)
+        task.dag = np.tril(dag, k=-1)
+        task._link_pods()
+        return task
+
+    def _link_pods(self):
         self.available_pods = {}
         self.terminated = False
         self.update_available_pods()
@@ -27,16 +48,19 @@ class Task:
         for pod in self.pods.values():
             pod.task = self
 
-    def _generate_pods(self, pod_config):
+    def _generate_pods(self, pod_config, rng=None):
         cpu_dist = pod_config['pods_cpu_dist']
         mem_dist = pod_config['pods_mem_dist']
         duration_dist = pod_config['pods_duration_dist']
         max_restarts = pod_config['max_restarts']
 
-        cpus = generate_distribution_values(cpu_dist, self.length)
-        mems = generate_distribution_values(mem_dist, self.length)
-        durations = generate_distribution_values(duration_dist, self.length)
+        cpus = generate_distribution_values(cpu_dist, self.length, rng)
+        mems = generate_distribution_values(mem_dist, self.length, rng)
+        durations = generate_distribution_values(duration_dist, self.length, rng)
+
+        return self._create_pods(cpus, mems, durations, max_restarts)
 
+    def _create_pods(self, cpus, mems, durations, max_restarts):
         pods = {}
         for i in range(self.length):
             pod_name = f"{self.name}-pod-{i}"
@@ -100,4 +124,20 @@ class Task:
         return f"Task(name={self.name}, pods={[p.name for p in self.pods.values()]})"
     
     def is_successful(self):
-        return not self.unsuccessful and self.terminated
\ No newline at end of file
+        return not self.unsuccessful and self.terminated
+
+    def is_settled(self):
+        # True once no pod of the task can run anymore
+        if self.terminated:
+            return True
+        return self.unsuccessful and not any(p.status in (PodStatus.PENDING, PodStatus.RUNNING) for p in self.pods.values())
+
+    def release(self):
+        # Breaks the task <-> pod references and drops the DAG so that a
+        # finished task can be freed while the simulation continues
+        for pod in self.pods.values():
+            pod.__dict__.pop('task', None)
+        self.pods.clear()
+        self.available_pods.clear()
+        self.pod_keys = []
+        self.dag = None
\ No newline at end of file
@@ -0,0 +1,229 @@
+import heapq
+import re
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from cutsimulator.workload.task import Task
+import logging
+logger = logging.getLogger(__name__)
+
+# Column layout of the Alibaba cluster-trace-v2018 batch_task.csv (no header)
+ALIBABA_BATCH_TASK_COLUMNS = ["task_name", "instance_num", "job_name", "task_type", "status",
+                              "start_time", "end_time", "plan_cpu", "plan_mem"]
+
+# Columns the replay needs, whatever the trace layout
+REQUIRED_TRACE_COLUMNS = ["job_name", "task_name", "instance_num", "start_time", "end_time", "plan_cpu", "plan_mem"]
+
+# Task names encode the DAG, e.g. "R5_2_3" is task 5 depending on tasks 2 and 3.
+# Names that do not match (e.g. "task_Nzg3...") are independent tasks.
+_TASK_NAME_PATTERN = re.compile(r"^[A-Za-z]+(\d+)((?:_\d+)*)$")
+
+
+def parse_task_name(task_name: str):
+    """
+    Returns the (id, dependency ids) encoded in an Alibaba-style task name,
+    or (None, []) for names without dependency information.
+    """
+    match = _TASK_NAME_PATTERN.match(task_name)
+    if match is None:
+        return None, []
+    deps = [int(dep) for dep in match.group(2).split("_") if dep]
+    return int(match.group(1)), deps
+
+
+def order_job_tasks(task_names: List[str]):
+    """
+    Orders the tasks of a job topologically (parents first) and returns the
+    order together with the parent positions of each task in that order.
+    Dependencies on unknown tasks and dependencies closing a cycle are dropped.
+    """
+    parsed = [parse_task_name(name) for name in task_names]
+    by_id = {task_id: i for i, (task_id, _) in enumerate(parsed) if task_id is not None}
+    parents = [sorted({by_id[dep] for dep in deps if dep in by_id and by_id[dep] != i})
+               for i, (_, deps) in enumerate(parsed)]
+
+    children = [[] for _ in task_names]
+    pending = [len(p) for p in parents]
+    for i, task_parents in enumerate(parents):
+        for parent in task_parents:
+            children[parent].append(i)
+
+    # Kahn's algorithm, preferring the original row order among ready tasks
+    ready = [i for i in range(len(task_names)) if pending[i] == 0]
+    heapq.heapify(ready)
+    order = []
+    while len(order) < len(task_names):
+        if not ready:
+            # Cycle: release the earliest blocked task and drop its remaining edges
+            blocked = min(i for i in range(len(task_names)) if pending[i] > 0)
+            logger.warning(f"Dropping cyclic dependencies of task {task_names[blocked]}")
+            placed = set(order)
+            parents[blocked] = [p for p in parents[blocked] if p in placed]
+            pending[blocked] = 0
+            heapq.heappush(ready, blocked)
+        i = heapq.heappop(ready)
+        order.append(i)
+        for child in children[i]:
+            if pending[child] > 0:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    heapq.heappush(ready, child)
+
+    position = {i: k for k, i in enumerate(order)}
+    return order, [sorted(position[p] for p in parents[i]) for i in order]
+
+
+# Replays the jobs of a production cluster trace (Alibaba batch_task style CSV)
+# as simulator tasks. Every job becomes a Task whose pods are the instances of
+# the job's tasks, with the instances of a trace task depending on all
+# instances of its parent tasks. The CSV is streamed in chunks; the rows of a
+# job are expected to be contiguous, and jobs arriving out of order are
+# re-ordered within a window of workload_trace_reorder_window seconds.
+class TraceReplayWorkload:
+    def __init__(self, config):
+        required_keys = ['workload_trace_file', 'workload_pods_max_restarts']
+        for key in required_keys:
+            if key not in config:
+                raise ValueError(f"Missing workload config key: {key}")
+
+        self.config = config
+        self.path = config['workload_trace_file']
+        self.columns = config.get('workload_trace_columns') or ALIBABA_BATCH_TASK_COLUMNS
+        missing = [column for column in REQUIRED_TRACE_COLUMNS if column not in self.columns]
+        if missing:
+            raise ValueError(f"workload_trace_columns is missing {missing}")
+
+        self.chunksize = config.get('workload_trace_chunksize', 100000)
+        self.cpu_scale = config.get('workload_trace_cpu_scale', 10)     # plan_cpu 100 = 1 core = 1000m
+        self.mem_scale = config.get('workload_trace_mem_scale', 100)    # Mi per plan_mem unit
+        self.max_instances = config.get('workload_trace_max_instances', 16)
+        self.max_jobs = config.get('workload_trace_max_jobs')
+        self.reorder_window = config.get('workload_trace_reorder_window', 0)
+        self.max_restarts = config['workload_pods_max_restarts']
+
+        self.skipped_rows = 0
+        self.reordered_jobs = 0
+
+    def create_workload(self) -> Iterator[Task]:
+        return self.iter_tasks()
+
+    def create_tasks(self) -> List[Task]:
+        return list(self.iter_tasks())
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """
+        Yields the jobs of the trace as tasks in arrival order, with arrival
+        times relative to the first job.
+        """
+        self.skipped_rows = 0
+        self.reordered_jobs = 0
+        pending = []  # heap of (arrival, sequence, job)
+        sequence = 0
+        latest_arrival = -np.inf
+        emitted = 0
+        start_time = None
+        last_arrival = 0
+
+        for job in self._iter_jobs():
+            if job is None:
+                continue
+            heapq.heappush(pending, (job[0], sequence, job))
+            sequence += 1
+            latest_arrival = max(latest_arrival, job[0])
+
+            # Jobs older than the window can no longer be preceded by a later row
+            while pending and pending[0][0] <= latest_arrival - self.reorder_window:
+                if self.max_jobs is not None and emitted >= self.max_jobs:
+                    break
+                _, _, ready_job = heapq.heappop(pending)
+                start_time, last_arrival, task = self._create_task(ready_job, start_time, last_arrival)
+                emitted += 1
+                yield task
+            if self.max_jobs is not None and emitted >= self.max_jobs:
+                break
+
+        while pending and (self.max_jobs is None or emitted < self.max_jobs):
+            _, _, ready_job = heapq.heappop(pending)
+            start_time, last_arrival, task = self._create_task(ready_job, start_time, last_arrival)
+            emitted += 1
+            yield task
+
+        if self.skipped_rows:
+            logger.warning(f"Skipped {self.skipped_rows} invalid rows of trace {self.path}")
+        if self.reordered_jobs:
+            logger.warning(f"{self.reordered_jobs} jobs arrived outside the reorder window and were delayed")
+
+    def _create_task(self, job, start_time, last_arrival):
+        arrival, job_name, cpus, mems, durations, dag = job
+        if start_time is None:
+            start_time = arrival
+
+        relative_arrival = int(arrival - start_time)
+        if relative_arrival < last_arrival:
+            # Time cannot move backwards in the simulation: delay the late job
+            self.reordered_jobs += 1
+            relative_arrival = last_arrival
+
+        task = Task.from_arrays(name=job_name, arrival_time=relative_arrival, cpus=cpus, mems=mems,
+                                durations=durations, dag=dag, max_restarts=self.max_restarts)
+        return start_time, relative_arrival, task
+
+    def _iter_chunks(self):
+        reader = pd.read_csv(self.path, header=None, names=self.columns,
+                             usecols=REQUIRED_TRACE_COLUMNS, chunksize=self.chunksize)
+        for chunk in reader:
+            yield chunk
+
+    def _iter_jobs(self):
+        # Groups the rows of each job, carrying the (possibly incomplete) last
+        # job of a chunk over to the next one
+        carry = None
+        for chunk in self._iter_chunks():
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            if chunk.empty:
+                continue
+
+            last_job = chunk["job_name"].iloc[-1]
+            is_last = (chunk["job_name"] == last_job).to_numpy()
+            carry = chunk[is_last]
+            for job_name, rows in chunk[~is_last].groupby("job_name", sort=False):
+                yield self._build_job(job_name, rows)
+
+        if carry is not None and not carry.empty:
+            yield self._build_job(carry["job_name"].iloc[0], carry)
+
+    def _build_job(self, job_name, rows: pd.DataFrame):
+        """
+        Converts the rows of a job into (arrival, name, cpus, mems, durations, dag),
+        or returns None if the job has no valid rows.
+        """
+        rows = rows.drop_duplicates(subset="task_name", keep="first")
+        numeric = rows[["instance_num", "start_time", "end_time", "plan_cpu", "plan_mem"]].apply(pd.to_numeric, errors="coerce")
+        valid = (numeric.notna().all(axis=1) & (numeric["end_time"] > numeric["start_time"])
+                 & (numeric["instance_num"] > 0) & (numeric["plan_cpu"] > 0) & (numeric["plan_mem"] > 0)).to_numpy()
+        self.skipped_rows += int((~valid).sum())
+        if not valid.any():
+            return None
+
+        numeric = numeric[valid]
+        task_names = rows["task_name"][valid].astype(str).tolist()
+        order, parents = order_job_tasks(task_names)
+
+        instances = np.minimum(numeric["instance_num"].to_numpy(dtype=np.int64)[order], self.max_instances)
+        cpus = np.maximum(np.round(numeric["plan_cpu"].to_numpy()[order] * self.cpu_scale), 1).astype(np.int64)
+        mems = np.maximum(np.round(numeric["plan_mem"].to_numpy()[order] * self.mem_scale), 1).astype(np.int64)
+        durations = (numeric["end_time"] - numeric["start_time"]).to_numpy(dtype=np.int64)[order]
+
+        # Pod level DAG: every instance depends on all instances of the parent tasks
+        offsets = np.concatenate(([0], np.cumsum(instances)))
+        dag = np.zeros((offsets[-1], offsets[-1]), dtype=np.int8)
+        for k, task_parents in enumerate(parents):
+            for parent in task_parents:
+                dag[offsets[k]:offsets[k + 1], offsets[parent]:offsets[parent + 1]] = 1
+
+        arrival = float(numeric["start_time"].min())
+        return (arrival, str(job_name), np.repeat(cpus, instances).tolist(), np.repeat(mems, instances).tolist(),
+                np.repeat(durations, instances).tolist(), dag)
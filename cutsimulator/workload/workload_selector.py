@@ -0,0 +1,21 @@
+from typing import Iterable
+
+from cutsimulator.workload.task import Task
+from cutsimulator.workload.trace_replay import TraceReplayWorkload
+from cutsimulator.workload.workload_synthesizer import WorkloadSynthesizer
+
+# Creates the workload of the source selected in the config: synthetic
+# distributions (default) or the replay of a cluster trace
+class WorkloadSelector:
+    def __init__(self, config):
+        self.config = config
+
+    def create_workload(self) -> Iterable[Task]:
+        workload_source = self.config.get('workload_source', 'synthetic')
+
+        if workload_source == 'synthetic':
+            return WorkloadSynthesizer(self.config).create_workload()
+        elif workload_source == 'trace':
+            return TraceReplayWorkload(self.config).create_workload()
+        else:
+            raise ValueError(f"Unsupported workload source: {workload_source}")
@@ -1,7 +1,26 @@
-from cutsimulator.utils.utility import generate_distribution_values
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from cutsimulator.utils.scenario_cache import create_scenario_cache
+from cutsimulator.utils.utility import create_rng, generate_distribution_values
 from cutsimulator.workload.pod import Pod
 from cutsimulator.workload.task import Task
 
+# Number of tasks generated per block on the seeded path. Fixed so that the
+# same seed yields the same workload whether it is streamed or materialized.
+WORKLOAD_BLOCK_TASKS = 4096
+
+# Config keys that determine the generated workload (and thus its cache entry)
+WORKLOAD_SCENARIO_KEYS = [
+    'workload_tasks',
+    'workload_pods_number_dist',
+    'workload_pods_cpu_dist',
+    'workload_pods_mem_dist',
+    'workload_pods_interarrival_dist',
+    'workload_pods_duration_dist',
+]
+
 
 class WorkloadSynthesizer:
     def __init__(self, config):
@@ -19,6 +38,11 @@ class WorkloadSynthesizer:
                 raise ValueError(f"Missing workload config key: {key}")
         self.config = config
 
+        # With a simulation_seed the workload is drawn from its own seeded stream
+        # (and may be cached), otherwise from the global numpy random state
+        self.seed = config.get('simulation_seed')
+        self.rng = create_rng(self.seed, "workload") if self.seed is not None else None
+
     # If we want pod-centric simulations, use this function
     def create_pods(self):  # → returns List[Pod]
         num_pods = self.config['workload_tasks'] # Assuming 1 pod per task for this specific case
@@ -27,10 +51,10 @@ class WorkloadSynthesizer:
         interarrival_dist = self.config['workload_pods_interarrival_dist']
         duration_dist = self.config['workload_pods_duration_dist']
 
-        cpus = generate_distribution_values(cpu_dist, num_pods)
-        memories = generate_distribution_values(mem_dist, num_pods)
-        interarrivals = generate_distribution_values(interarrival_dist, num_pods)
-        durations = generate_distribution_values(duration_dist, num_pods)
+        cpus = generate_distribution_values(cpu_dist, num_pods, self.rng)
+        memories = generate_distribution_values(mem_dist, num_pods, self.rng)
+        interarrivals = generate_distribution_values(interarrival_dist, num_pods, self.rng)
+        durations = generate_distribution_values(duration_dist, num_pods, self.rng)
 
         pods = []
         arrival_time = 0
@@ -42,41 +66,168 @@ class WorkloadSynthesizer:
     
     # For task-centric simulation   
     def create_tasks(self):  # → returns List[Task]
+        if self.rng is not None:
+            return list(self._tasks_from_arrays(self.load_task_arrays()))
+
         num_tasks = self.config['workload_tasks']
         pod_count_dist = self.config['workload_pods_number_dist']  # Now a distribution
         interarrival_dist = self.config['workload_pods_interarrival_dist']
-        
-        pod_cpu_dist = self.config['workload_pods_cpu_dist']
-        pod_mem_dist = self.config['workload_pods_mem_dist']
-        pod_duration_dist = self.config['workload_pods_duration_dist']
-        pod_max_restarts = self.config['workload_pods_max_restarts']
 
         interarrivals = generate_distribution_values(interarrival_dist, num_tasks)
         pod_counts = generate_distribution_values(pod_count_dist, num_tasks)
 
-        tasks = []
+        return list(self._generate_tasks(interarrivals, pod_counts))
+
+    def create_workload(self) -> Iterable[Task]:
+        """
+        Returns the tasks to simulate: a lazy iterator when workload_streaming
+        is enabled, otherwise the fully generated list.
+        """
+        if self.config.get('workload_streaming', False):
+            return self.iter_tasks()
+        return self.create_tasks()
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """
+        Yields the tasks in arrival order, generating them in chunks of
+        workload_stream_chunk tasks so that memory stays flat for long runs.
+        """
+        if self.rng is not None:
+            cache = create_scenario_cache(self.config)
+            if cache is not None:
+                # The (memory-mapped) cache entry is read lazily while iterating
+                yield from self._tasks_from_arrays(self.load_task_arrays())
+            else:
+                first_task = 0
+                for block in self._iter_task_blocks():
+                    yield from self._tasks_from_arrays(block, first_task)
+                    first_task += len(block["task_arrival"])
+            return
+
+        num_tasks = self.config['workload_tasks']
+        chunk = self.config.get('workload_stream_chunk', 1024)
         arrival_time = 0
+        for first_task in range(0, num_tasks, chunk):
+            count = min(chunk, num_tasks - first_task)
+            interarrivals = generate_distribution_values(self.config['workload_pods_interarrival_dist'], count)
+            pod_counts = generate_distribution_values(self.config['workload_pods_number_dist'], count)
+            for task in self._generate_tasks(interarrivals, pod_counts, first_task, arrival_time):
+                arrival_time = task.arrival_time
+                yield task
+
+    def _generate_tasks(self, interarrivals, pod_counts, first_task=0, arrival_time=0):
+        # Generates tasks with the global numpy random state
+        task_args = {
+            "pods_cpu_dist": self.config['workload_pods_cpu_dist'],
+            "pods_mem_dist": self.config['workload_pods_mem_dist'],
+            "pods_duration_dist": self.config['workload_pods_duration_dist'],
+            "max_restarts": self.config['workload_pods_max_restarts']
+        }
 
-        for i in range(num_tasks):
-            task_name = f"task-{i+1}"
+        for i in range(len(interarrivals)):
+            task_name = f"task-{first_task+i+1}"
             arrival_time += interarrivals[i]
             num_pods = int(pod_counts[i])  # Ensure it's an integer
-            
-            task_args = {
-                "pods_cpu_dist": pod_cpu_dist,
-                "pods_mem_dist": pod_mem_dist,
-                "pods_duration_dist": pod_duration_dist,
-                "max_restarts": pod_max_restarts
-            }
-            
-            task = Task(
+
+            yield Task(
                 name=task_name,
                 num_pods=num_pods,
                 pod_config=task_args,
                 arrival_time=arrival_time
             )
-            tasks.append(task)
 
-        return tasks
+    def _iter_task_blocks(self):
+        """
+        Yields the seeded workload in blocks of flat arrays: per task arrival
+        times and offsets into the per pod attributes and the concatenated
+        DAG matrices.
+        """
+        num_tasks = self.config['workload_tasks']
+        arrival_time = 0
+        for first_task in range(0, num_tasks, WORKLOAD_BLOCK_TASKS):
+            count = min(WORKLOAD_BLOCK_TASKS, num_tasks - first_task)
+            interarrivals = generate_distribution_values(self.config['workload_pods_interarrival_dist'], count, self.rng)
+            pod_counts = np.asarray(generate_distribution_values(self.config['workload_pods_number_dist'], count, self.rng), dtype=np.int64)
+            num_pods = int(pod_counts.sum())
+            dag_sizes = pod_counts ** 2
+
+            arrivals = arrival_time + np.cumsum(interarrivals, dtype=np.int64)
+            arrival_time = int(arrivals[-1])
+            yield {
+                "task_arrival": arrivals,
+                "task_pod_offsets": np.concatenate(([0], np.cumsum(pod_counts))),
+                "pod_cpu": np.asarray(generate_distribution_values(self.config['workload_pods_cpu_dist'], num_pods, self.rng), dtype=np.int64),
+                "pod_mem": np.asarray(generate_distribution_values(self.config['workload_pods_mem_dist'], num_pods, self.rng), dtype=np.int64),
+                "pod_duration": np.asarray(generate_distribution_values(self.config['workload_pods_duration_dist'], num_pods, self.rng), dtype=np.int64),
+                "task_dag_offsets": np.concatenate(([0], np.cumsum(dag_sizes))),
+                "task_dag": self.rng.integers(2, size=int(dag_sizes.sum()), dtype=np.uint8),
+            }
+
+    def generate_task_arrays(self):
+        """
+        Generates the whole seeded workload as one set of flat arrays.
+        """
+        blocks = list(self._iter_task_blocks())
+        if not blocks:
+            blocks = [{"task_arrival": np.zeros(0, dtype=np.int64), "task_pod_offsets": np.zeros(1, dtype=np.int64),
+                       "pod_cpu": np.zeros(0, dtype=np.int64), "pod_mem": np.zeros(0, dtype=np.int64),
+                       "pod_duration": np.zeros(0, dtype=np.int64), "task_dag_offsets": np.zeros(1, dtype=np.int64),
+                       "task_dag": np.zeros(0, dtype=np.uint8)}]
+
+        arrays = {key: np.concatenate([block[key] for block in blocks])
+                  for key in ["task_arrival", "pod_cpu", "pod_mem", "pod_duration", "task_dag"]}
+        # Shift the per block offsets so that they index the concatenated arrays
+        for key in ["task_pod_offsets", "task_dag_offsets"]:
+            offsets = [blocks[0][key]]
+            for block in blocks[1:]:
+                offsets.append(block[key][1:] + offsets[-1][-1])
+            arrays[key] = np.concatenate(offsets)
+        return arrays
+
+    def load_task_arrays(self):
+        """
+        Returns the seeded workload arrays, from the scenario cache when available.
+        """
+        cache = create_scenario_cache(self.config)
+        if cache is None:
+            return self.generate_task_arrays()
+
+        key = cache.key("workload", {k: self.config[k] for k in WORKLOAD_SCENARIO_KEYS}, self.seed)
+        arrays = cache.load(key)
+        if arrays is None:
+            arrays = self.generate_task_arrays()
+            cache.store(key, arrays)
+        return arrays
+
+    def _tasks_from_arrays(self, arrays, first_task=0):
+        max_restarts = self.config['workload_pods_max_restarts']
+        pod_offsets = arrays["task_pod_offsets"]
+        dag_offsets = arrays["task_dag_offsets"]
+        num_tasks = len(arrays["task_arrival"])
+
+        for chunk_start in range(0, num_tasks, WORKLOAD_BLOCK_TASKS):
+            chunk_end = min(chunk_start + WORKLOAD_BLOCK_TASKS, num_tasks)
 
+            # Element access on (memory-mapped) arrays is slow, so convert a chunk at a time
+            pod_start, pod_end = int(pod_offsets[chunk_start]), int(pod_offsets[chunk_end])
+            dag_start, dag_end = int(dag_offsets[chunk_start]), int(dag_offsets[chunk_end])
+            arrivals = arrays["task_arrival"][chunk_start:chunk_end].tolist()
+            task_pods = (pod_offsets[chunk_start:chunk_end + 1] - pod_start).tolist()
+            task_dags = (dag_offsets[chunk_start:chunk_end + 1] - dag_start).tolist()
+            cpus = arrays["pod_cpu"][pod_start:pod_end].tolist()
+            mems = arrays["pod_mem"][pod_start:pod_end].tolist()
+            durations = arrays["pod_duration"][pod_start:pod_end].tolist()
+            dags = np.asarray(arrays["task_dag"][dag_start:dag_end])
 
+            for i in range(chunk_end - chunk_start):
+                start, end = task_pods[i], task_pods[i + 1]
+                num_pods = end - start
+                yield Task.from_arrays(
+                    name=f"task-{first_task+chunk_start+i+1}",
+                    arrival_time=arrivals[i],
+                    cpus=cpus[start:end],
+                    mems=mems[start:end],
+                    durations=durations[start:end],
+                    dag=dags[task_dags[i]:task_dags[i + 1]].reshape(num_pods, num_pods),
+                    max_restarts=max_restarts
+                )
@@ -4,7 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
 from cutsimulator.scheduler.scheduler_selector import SchedulerSelector
-from cutsimulator.workload.workload_synthesizer import WorkloadSynthesizer
+from cutsimulator.workload.workload_selector import WorkloadSelector
 from cutsimulator.utils.utility import load_configs, setup_logger
 from cutsimulator.simulator.simulator import Simulator
 
@@ -20,10 +20,13 @@ def main():
 
     cluster = ClusterSynthesizer(config).create_cluster()
     scheduler = SchedulerSelector(config).create_scheduler(cluster)
-    tasks = WorkloadSynthesizer(config).create_tasks()
+    tasks = WorkloadSelector(config).create_workload()
 
-    simulator = Simulator(config)
-    simulator.run_simulation(cluster, scheduler, tasks)
+    try:
+        simulator = Simulator(config)
+        simulator.run_simulation(cluster, scheduler, tasks)
+    finally:
+        scheduler.close()
 
 
 if __name__ == "__main__":
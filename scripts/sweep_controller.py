@@ -0,0 +1,22 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cutsimulator.simulator.sweep import run_sweep
+from cutsimulator.utils.utility import load_configs, setup_logger
+
+def main():
+    """Run a sweep of simulations over a config grid and a list of seeds."""
+    if len(sys.argv) < 2:
+        print("Usage: sweep-controller <config.yaml> [sweep.yaml ...]")
+        sys.exit(1)
+
+    setup_logger(level="INFO", log_file="sweep.log")
+    yaml_files = sys.argv[1:]
+    config = load_configs(yaml_files)
+
+    run_sweep(config)
+
+
+if __name__ == "__main__":
+    main()
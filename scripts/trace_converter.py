@@ -0,0 +1,19 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cutsimulator.simulator.trace_sink import convert_binary_trace
+
+def main():
+    """Convert a binary simulation trace into the human-readable text format."""
+    if len(sys.argv) not in (2, 3):
+        print("Usage: trace-converter <simulation_trace.bin> [simulation_trace.txt]")
+        sys.exit(1)
+
+    input_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) == 3 else os.path.splitext(input_path)[0] + ".txt"
+    convert_binary_trace(input_path, output_path)
+
+
+if __name__ == "__main__":
+    main()
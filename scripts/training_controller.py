@@ -1,13 +1,11 @@
-import random
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from cutsimulator.cluster.cluster_synthesizer import ClusterSynthesizer
 from cutsimulator.scheduler.scheduler_selector import SchedulerSelector
-from cutsimulator.workload.workload_synthesizer import WorkloadSynthesizer
+from cutsimulator.simulator.actor_learner import create_episode, run_actor_learner
 from cutsimulator.simulator.simulator import Simulator
-from cutsimulator.utils.utility import log_rewards, load_configs, setup_logger
+from cutsimulator.utils.utility import log_rewards, load_configs, output_path, setup_logger
 import logging
 logger = logging.getLogger(__name__)
 
@@ -21,31 +19,34 @@ def main():
     yaml_files = sys.argv[1:]
     config = load_configs(yaml_files)
 
+    if config.get("training_actors", 1) > 1:
+        run_actor_learner(config)
+        logger.info("\n=== Training Completed ===")
+        return
+
     scheduler = None
     controller = Simulator(config)
 
     episodes = config["training_episodes"]
+    base_seed = config.get("simulation_seed")
 
-    for episode in range(episodes):
-        logger.info(f"\n=== Starting Episode {episode + 1}/{episodes} ===")
-
-        num_nodes = random.randint(config["training_nodes_per_episode_min"], config["training_nodes_per_episode_max"])
-        num_tasks = random.randint(config["training_tasks_per_episode_min"], config["training_tasks_per_episode_max"])
-
-        config["cluster_nodes"] = num_nodes
-        cluster = ClusterSynthesizer(config).create_cluster()
+    try:
+        for episode in range(episodes):
+            logger.info(f"\n=== Starting Episode {episode + 1}/{episodes} ===")
 
-        config["workload_tasks"] = num_tasks
-        tasks = WorkloadSynthesizer(config).create_tasks()
+            cluster, tasks = create_episode(config, episode, base_seed)
 
-        if scheduler is None:
-            config["cluster_nodes"] = config["training_nodes_per_episode_max"]
-            scheduler = SchedulerSelector(config).create_scheduler(cluster)
-        else:
-            scheduler.onClusterReset(cluster)
+            if scheduler is None:
+                config["cluster_nodes"] = config["training_nodes_per_episode_max"]
+                scheduler = SchedulerSelector(config).create_scheduler(cluster)
+            else:
+                scheduler.onClusterReset(cluster)
 
-        controller.run_simulation(cluster, scheduler, tasks)
-        log_rewards(None, None, None, None, mark_end=True)
+            controller.run_simulation(cluster, scheduler, tasks)
+            log_rewards(None, None, None, None, mark_end=True, log_file=output_path(config, "reward_trace.csv"))
+    finally:
+        if scheduler is not None:
+            scheduler.close()
 
     logger.info("\n=== Training Completed ===")
 
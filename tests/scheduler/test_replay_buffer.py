@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pickle
+
+import numpy as np
+
+from cutsimulator.scheduler.replay_buffer import ReplayBuffer
+
+
+# Only the buffer that created the memmap subdirectory removes it; copies
+# passed to other processes read the same files and just detach on close
+def test_close_removes_the_memmap_directory_of_its_creator(tmp_path):
+    buffer = ReplayBuffer(8, 2, 3, memmap_dir=str(tmp_path))
+    buffer.add(np.ones((2, 3)), [1, 0], 0.5, np.zeros((2, 3)))
+    assert os.path.dirname(buffer.memmap_dir) == str(tmp_path)
+
+    copy = pickle.loads(pickle.dumps(buffer))
+    assert copy.memmap_dir == buffer.memmap_dir
+    assert copy.rewards[0] == 0.5
+
+    copy.close()
+    assert copy.rewards is None
+    assert os.path.isdir(buffer.memmap_dir)
+    assert buffer.rewards[0] == 0.5
+
+    buffer.close()
+    assert not os.path.exists(buffer.memmap_dir)
+    assert os.listdir(tmp_path) == []
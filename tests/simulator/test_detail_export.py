@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import logging
+
+from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.python_cluster import PythonCluster
+from cutsimulator.evaluation.detail_exporter import load_detail_table
+from cutsimulator.scheduler.round_robin_scheduler import RoundRobinScheduler
+from cutsimulator.simulator.simulator import Simulator
+from cutsimulator.workload.task import Task
+
+
+def run(config, task_name):
+    cluster = PythonCluster()
+    cluster.deploy_nodes([Node("node-0", 4000, 4000)])
+    tasks = [Task.from_arrays(task_name, 0, [1000, 1000], [1000, 1000], [2, 3], [[0, 0], [1, 0]], 0)]
+    Simulator(config).run_simulation(cluster, RoundRobinScheduler(config, cluster), tasks)
+
+
+# Repeated runs into the same output directory keep their own pod tables,
+# and names too long for the records are truncated with a warning
+def test_runs_write_separate_detail_tables(tmp_path, caplog):
+    config = {
+        'simulation_speedup': 0,
+        'simulation_save_trace': False,
+        'simulation_detail_statistics': True,
+        'simulation_detail_format': 'npy',
+        'simulation_output_dir': str(tmp_path),
+    }
+    long_name = "job-" + "x" * 80
+    run(config, "job-a")
+    with caplog.at_level(logging.WARNING):
+        run(config, long_name)
+
+    detail = tmp_path / "simulation_detail"
+    assert sorted(os.listdir(detail)) == ["run-00000", "run-00001"]
+    first = load_detail_table(str(detail / "run-00000" / "pods"))
+    second = load_detail_table(str(detail / "run-00001" / "pods"))
+    assert len(first) == len(second) == 2
+    assert set(first["task"]) == {"job-a"}
+    assert set(second["task"]) == {long_name[:64]}
+    assert "truncated" in caplog.text
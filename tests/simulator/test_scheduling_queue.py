@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.python_cluster import PythonCluster
+from cutsimulator.scheduler.round_robin_scheduler import RoundRobinScheduler
+from cutsimulator.simulator.scheduling_queue import UnschedulablePods
+from cutsimulator.simulator.simulator import Simulator
+from cutsimulator.workload.pod import Pod
+from cutsimulator.workload.task import Task
+
+
+def make_task(name, arrival_time, cpus, duration):
+    return Task.from_arrays(name, arrival_time, cpus, [100] * len(cpus), [duration] * len(cpus),
+                            np.zeros((len(cpus), len(cpus)), dtype=int), max_restarts=10)
+
+
+# A release wakes every waiting pod that fits the node on its own
+def test_pop_fitting_wakes_each_fitting_pod():
+    pods = UnschedulablePods()
+    first, second, large = Pod("p1", 3000, 100, 1, 0, 10), Pod("p2", 3000, 100, 1, 0, 10), Pod("p3", 5000, 100, 1, 0, 10)
+    pods.add(second, 2)
+    pods.add(first, 1)
+    pods.add(large, 1)
+
+    assert [pod for _, pod in pods.pop_fitting(4000, 1000)] == [first, second]
+    assert len(pods) == 1
+
+
+# Pods waiting behind a running pod are retried one after another, none of
+# them is failed while another one can still release the node
+def test_waiting_pods_run_after_each_other(tmp_path):
+    config = {
+        'simulation_speedup': 0,
+        'simulation_save_trace': False,
+        'simulation_detail_statistics': False,
+        'simulation_output_dir': str(tmp_path),
+    }
+    cluster = PythonCluster()
+    cluster.deploy_nodes([Node("node-0", 4000, 1000)])
+    tasks = [make_task("running", 0, [4000], 10), make_task("waiting", 1, [3000, 3000], 10)]
+
+    simulator = Simulator(config)
+    simulator.run_simulation(cluster, RoundRobinScheduler(config, cluster), tasks)
+
+    assert simulator.stats.total_pods == 3
+    assert simulator.stats.completed_pods == 3
@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.python_cluster import PythonCluster
+from cutsimulator.scheduler.round_robin_scheduler import RoundRobinScheduler
+from cutsimulator.simulator.simulator import Simulator
+from cutsimulator.workload.pod import PodStatus
+from cutsimulator.workload.workload_synthesizer import WorkloadSynthesizer
+
+
+def workload_config(tmp_path, tasks):
+    return {
+        'simulation_speedup': 0,
+        'simulation_save_trace': False,
+        'simulation_detail_statistics': False,
+        'simulation_output_dir': str(tmp_path),
+        'simulation_seed': 7,
+        'workload_tasks': tasks,
+        'workload_streaming': True,
+        'workload_pods_number_dist': {'type': 'uniform', 'min': 2, 'max': 6},
+        'workload_pods_cpu_dist': {'type': 'fixed', 'value': 1000},
+        'workload_pods_mem_dist': {'type': 'fixed', 'value': 1000},
+        'workload_pods_interarrival_dist': {'type': 'poisson', 'mean': 5, 'min': 3, 'max': 6},
+        'workload_pods_duration_dist': {'type': 'poisson', 'mean': 4, 'min': 2, 'max': 9},
+        'workload_pods_max_restarts': 5,
+    }
+
+
+# Streamed tasks run every pod of their DAG (dependent pods after their
+# parents) and are released once they are settled
+def test_streamed_tasks_run_all_pods_and_are_released(tmp_path):
+    config = workload_config(tmp_path, 100)
+    cluster = PythonCluster()
+    cluster.deploy_nodes([Node(f"node-{i}", 8000, 8000) for i in range(4)])
+
+    tasks, pods = [], []
+
+    def stream():
+        for task in WorkloadSynthesizer(config).iter_tasks():
+            tasks.append((task, task.dag.copy(), list(task.pods.values())))
+            pods.extend(task.pods.values())
+            yield task
+
+    simulator = Simulator(config)
+    simulator.run_simulation(cluster, RoundRobinScheduler(config, cluster), stream())
+
+    assert len(tasks) == 100
+    assert any(dag.any() for _, dag, _ in tasks)
+    assert all(pod.status == PodStatus.COMPLETED for pod in pods)
+    assert simulator.stats.total_pods == simulator.stats.completed_pods == len(pods)
+    assert all(task.dag is None for task, _, _ in tasks)
+
+    for _, dag, task_pods in tasks:
+        for child, parent in zip(*np.nonzero(dag)):
+            assert task_pods[child].start_time >= task_pods[parent].end_time
@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import csv
+
+from cutsimulator.utils.utility import log_statistics
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+# A summary with new columns rewrites the header of an older file instead of
+# appending rows that do not match it
+def test_changed_columns_rewrite_the_header(tmp_path):
+    path = str(tmp_path / "simulation_statistics.csv")
+    log_statistics({"num_nodes": 4, "avg_latency": 2.5, "old_metric": 1}, path)
+    log_statistics({"num_nodes": 4, "avg_latency": 3.0, "p99_latency": 7}, path)
+    log_statistics({"num_nodes": 8, "avg_latency": 1.0, "p99_latency": 2}, path)
+
+    with open(path, newline='') as f:
+        header = next(csv.reader(f))
+    assert header == ["num_nodes", "avg_latency", "p99_latency", "old_metric"]
+    assert read_rows(path) == [
+        {"num_nodes": "4", "avg_latency": "2.5", "p99_latency": "", "old_metric": "1"},
+        {"num_nodes": "4", "avg_latency": "3.0", "p99_latency": "7", "old_metric": ""},
+        {"num_nodes": "8", "avg_latency": "1.0", "p99_latency": "2", "old_metric": ""},
+    ]
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from cutsimulator.cluster.node import Node
+from cutsimulator.cluster.python_cluster import PythonCluster
+from cutsimulator.scheduler.round_robin_scheduler import RoundRobinScheduler
+from cutsimulator.simulator.simulator import Simulator
+from cutsimulator.workload.pod import PodStatus
+from cutsimulator.workload.trace_replay import TraceReplayWorkload, order_job_tasks, parse_task_name
+
+
+def test_parse_task_name():
+    assert parse_task_name("M1") == (1, [])
+    assert parse_task_name("R5_2_3") == (5, [2, 3])
+    assert parse_task_name("J12_11") == (12, [11])
+    assert parse_task_name("task_Nzg3ODAwNDgzMTAwNTc2NTQ2Mw==") == (None, [])
+    assert parse_task_name("MergeTask") == (None, [])
+
+
+def test_order_job_tasks_puts_parents_first():
+    order, parents = order_job_tasks(["R3_1_2", "M2_1", "M1", "task_abc"])
+    assert order == [2, 1, 0, 3]
+    assert parents == [[], [0], [0, 1], []]
+
+
+def test_order_job_tasks_drops_unknown_parents():
+    order, parents = order_job_tasks(["M2_7", "R3_2_9"])
+    assert order == [0, 1]
+    assert parents == [[], [0]]
+
+
+def test_order_job_tasks_breaks_cycles():
+    order, parents = order_job_tasks(["M1_3", "M2_1", "M3_2", "M4"])
+    assert sorted(order) == [0, 1, 2, 3]
+    for k, task_parents in enumerate(parents):
+        assert all(parent < k for parent in task_parents)
+    # Only the edge closing the cycle is dropped
+    assert sum(len(task_parents) for task_parents in parents) == 2
+
+
+def write_trace(path):
+    rows = [
+        # task_name, instance_num, job_name, task_type, status, start_time, end_time, plan_cpu, plan_mem
+        "M1,2,j_1,1,Terminated,100,110,100,0.5",
+        "M2_1,1,j_1,1,Terminated,110,115,100,0.5",
+        "R3_1_2,2,j_1,1,Terminated,115,125,50,0.5",
+        "task_x,3,j_2,1,Terminated,105,112,100,0.5",
+        "M1,1,j_3,1,Terminated,120,,100,0.5",
+        "R2_1,1,j_4,1,Terminated,130,140,100,0.5",
+        "M1,1,j_4,1,Terminated,125,130,100,0.5",
+    ]
+    path.write_text("\n".join(rows) + "\n")
+
+
+# Replays a small trace: children start only once all instances of their
+# parent tasks have finished, and every instance runs
+def test_replayed_children_start_after_their_parents(tmp_path):
+    trace = tmp_path / "batch_task.csv"
+    write_trace(trace)
+    config = {
+        'simulation_speedup': 0,
+        'simulation_save_trace': False,
+        'simulation_detail_statistics': False,
+        'simulation_output_dir': str(tmp_path),
+        'workload_trace_file': str(trace),
+        'workload_trace_chunksize': 2,
+        'workload_pods_max_restarts': 0,
+    }
+    workload = TraceReplayWorkload(config)
+    tasks = workload.create_tasks()
+    assert [task.name for task in tasks] == ["j_1", "j_2", "j_4"]
+    assert workload.skipped_rows == 1
+
+    dags = [task.dag.copy() for task in tasks]
+    pods = [list(task.pods.values()) for task in tasks]
+    assert [len(task_pods) for task_pods in pods] == [5, 3, 2]
+    assert dags[1].sum() == 0
+
+    cluster = PythonCluster()
+    cluster.deploy_nodes([Node(f"node-{i}", 8000, 8000) for i in range(2)])
+    simulator = Simulator(config)
+    simulator.run_simulation(cluster, RoundRobinScheduler(config, cluster), tasks)
+
+    assert all(pod.status == PodStatus.COMPLETED for task_pods in pods for pod in task_pods)
+    for dag, task_pods in zip(dags, pods):
+        for child, parent in zip(*np.nonzero(dag)):
+            assert task_pods[child].start_time >= task_pods[parent].end_time
+
+    # j_1: both M1 instances before M2, and M1 and M2 before both R3 instances
+    assert dags[0][2, :2].all() and dags[0][3:, :3].all() and dags[0][3:, 3:].sum() == 0
+    # j_4 rows are out of order in the trace: M1 runs before R2
+    assert dags[2][1, 0] == 1 and pods[2][1].start_time >= pods[2][0].end_time